@@ -145,27 +145,14 @@ def show_home():
     
     col1, col2 = st.columns([2, 1])
     with col1:
+        from utils.ingest_jobs import FETCH_MILESTONES
+        jobs = get_ingestion_jobs()
+        job_key = ingestion_job_key()
         if st.button("🔄 Fetch & Store Data from API", type="primary", use_container_width=True):
-            with st.spinner("Fetching data from Cricbuzz API... This may take a minute."):
-                try:
-                    import subprocess
-                    import sys
-                    result = subprocess.run(
-                        [sys.executable, "fetch_api_data.py"],
-                        capture_output=True,
-                        text=True,
-                        cwd=os.path.dirname(os.path.abspath(__file__))
-                    )
-                    if result.returncode == 0:
-                        st.success("✅ Data fetched and stored successfully!")
-                        st.code(result.stdout, language="text")
-                        st.session_state['data_fetched'] = True
-                    else:
-                        st.error("❌ Error fetching data. Check the output below:")
-                        st.code(result.stderr, language="text")
-                except Exception as e:
-                    st.error(f"❌ Error: {e}")
-                    st.info("💡 You can also run `python fetch_api_data.py` in your terminal.")
+            job, started = jobs.submit(job_key, run_fetch_job, FETCH_MILESTONES)
+            if not started:
+                st.info("ℹ️ A fetch for this database is already running; showing its progress.")
+        show_ingestion_job(jobs.get(job_key))
     
     with col2:
         # Check if data exists in database
@@ -180,13 +167,16 @@ def show_home():
                 os.getenv("DB_NAME", "cricket_db")
             )
             if conn:
-                cur = conn.cursor()
-                cur.execute("SELECT COUNT(*) FROM players")
-                player_count = cur.fetchone()[0]
-                cur.execute("SELECT COUNT(*) FROM combined_matches")
-                match_count = cur.fetchone()[0]
-                cur.close()
-                conn.close()
+                try:
+                    cur = conn.cursor()
+                    cur.execute("SELECT COUNT(*) FROM players")
+                    player_count = cur.fetchone()[0]
+                    cur.execute("SELECT COUNT(*) FROM combined_matches")
+                    match_count = cur.fetchone()[0]
+                    cur.close()
+                finally:
+                    # Returns the connection to the shared pool
+                    conn.close()
                 st.metric("Players", player_count)
                 st.metric("Matches", match_count)
                 if player_count > 0 or match_count > 0:
@@ -196,6 +186,8 @@ def show_home():
         except Exception as e:
             st.warning("⚠️ Could not check database")
     
+    show_last_run_summary()
+    
     st.markdown("---")
     
     # Feature cards section
@@ -255,5 +247,93 @@ CREATE TABLE matches (
     with col4:
         st.markdown('<div class="metric-card"><div class="metric-value">14</div><div class="metric-label">🗄️ Database Tables</div></div>', unsafe_allow_html=True)
 
+@st.cache_resource
+def get_ingestion_jobs():
+    """Background fetch jobs shared by every browser session of this server"""
+    from utils.ingest_jobs import JobRegistry
+    return JobRegistry()
+
+
+def ingestion_job_key():
+    """One fetch job at a time per database"""
+    from dotenv import load_dotenv
+    load_dotenv()
+    return f"{os.getenv('DB_HOST', 'localhost')}/{os.getenv('DB_NAME', 'cricket_db')}"
+
+
+def run_fetch_job():
+    """Run fetch_api_data.main() in this process, reusing its warm HTTP pool, cache and rate limiter"""
+    import fetch_api_data
+    return fetch_api_data.main(fetch_api_data.parse_args([]))
+
+
+def show_ingestion_job(job):
+    """Progress and log of the current (or last) fetch job, refreshed while it runs"""
+    if job is None:
+        return
+    
+    def render():
+        if job.running:
+            st.progress(job.progress, text=f"⏳ {job.phase}... ({job.elapsed():.0f}s)")
+            st.session_state['ingest_job_watched'] = True
+        elif job.state == "succeeded":
+            st.success(f"✅ Data fetched and stored successfully! ({job.elapsed():.0f}s)")
+            st.session_state['data_fetched'] = True
+        else:
+            st.error(f"❌ Error fetching data ({job.error}). Check the output below:")
+            st.info("💡 You can also run `python fetch_api_data.py` in your terminal.")
+        with st.expander("📜 Fetch log", expanded=job.running):
+            st.code(job.log(tail=200) or "Starting...", language="text")
+        # Once the job we were watching finishes, refresh the counts and run summary
+        if not job.running and st.session_state.pop('ingest_job_watched', False):
+            st.rerun()
+    
+    st.fragment(render, run_every=2 if job.running else None)()
+
+
+def show_last_run_summary():
+    """Summary of the last fetch_api_data.py run, read from its JSON report"""
+    from utils.telemetry import load_last_report
+    report = load_last_report()
+    if not report:
+        st.caption("No data refresh has been recorded yet.")
+        return
+    
+    with st.expander(f"📈 Last data refresh: {report.get('finished_at', '')} "
+                     f"({report.get('duration_seconds', 0)}s, {report.get('mode', 'run')})"):
+        api = report.get("api", {})
+        cache = report.get("cache", {})
+        lookups = cache.get("hits", 0) + cache.get("misses", 0)
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Rows written", sum(t.get("items", 0) for t in report.get("tables", {}).values()))
+        col2.metric("API requests", sum(e.get("count", 0) for e in api.values()))
+        col3.metric("Cache hit rate", f"{100 * cache.get('hits', 0) / lookups:.0f}%" if lookups else "n/a")
+        col4.metric("Retries", report.get("retries", {}).get("retries", 0))
+        
+        st.write("**Pipeline stages**")
+        st.dataframe([
+            {"Stage": name, "Items": s["items"], "Seconds": s["seconds"], "Per second": s["per_second"]}
+            for name, s in report.get("stages", {}).items()
+        ], use_container_width=True)
+        
+        st.write("**Rows written per table**")
+        st.dataframe([
+            {"Table": name, "Rows": t["items"], "Inserted": t.get("inserted"), "Updated": t.get("updated"),
+             "Rows/sec": t["per_second"]}
+            for name, t in report.get("tables", {}).items()
+        ], use_container_width=True)
+        
+        st.write("**API latency by endpoint**")
+        st.dataframe([
+            {"Endpoint": name, "Requests": e["count"], "Avg ms": e["avg_ms"], "p95 ms": e["p95_ms"],
+             "Max ms": e["max_ms"], "Retries": e.get("retries", 0),
+             "Cache hits": e.get("cache", {}).get("hits", 0)}
+            for name, e in api.items()
+        ], use_container_width=True)
+        
+        if report.get("failed_flushes") or report.get("dead_letters"):
+            st.warning(f"⚠️ {report.get('failed_flushes', 0)} rolled-back flushes, "
+                       f"{report.get('dead_letters', 0)} calls queued for retry")
+
 if __name__ == "__main__":
     main()
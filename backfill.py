@@ -0,0 +1,347 @@
+"""
+Backfill historical matches, scorecards and players from Cricbuzz, series by series.
+
+Lists every series of the requested years and types into backfill_checkpoints,
+then works through the unfinished ones in shards on a pool of worker
+processes. Every worker draws from one shared rate budget (RAPIDAPI_RPS and
+RAPIDAPI_MONTHLY_QUOTA), and each series is checkpointed when it finishes, so
+an interrupted run picks up where it stopped when started again.
+
+    python backfill.py --from-year 2015 --to-year 2024 --workers 4
+"""
+import argparse
+import glob
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+from fetch_api_data import (
+    AsyncCricbuzzAPIClient,
+    CricbuzzAPIClient,
+    DatabaseManager,
+    default_dead_letters,
+    fetch_and_store_players,
+    fetch_and_store_scorecards,
+    iter_series,
+    iter_series_matches,
+    new_write_buffer,
+    retry_dead_letters,
+    store_match_feed,
+)
+from utils.rate_limiter import SharedBudget, share_budget
+from utils.resilience import DeadLetterQueue
+from utils.response_cache import PROJECT_ROOT
+
+SERIES_TYPES = ("international", "league", "domestic", "women")
+WORKER_DIR = os.path.join(PROJECT_ROOT, ".cache", "backfill")
+
+
+def plan_series(api_client, db_manager, years, series_types):
+    """List the series of every (year, type) and register them in backfill_checkpoints"""
+    rows = []
+    for year in years:
+        for series_type in series_types:
+            archive = api_client.get_series_archive(series_type, year)
+            found = [
+                (int(series['id']), series.get('name', '')[:255], series_type, year)
+                for series in iter_series(archive)
+            ]
+            print(f"[INFO] {year} {series_type}: {len(found)} series")
+            rows.extend(found)
+    inserted, _ = db_manager.save_backfill_plan(rows)
+    print(f"[OK] Planned {len(rows)} series ({inserted} new)")
+    return len(rows)
+
+
+def worker_dead_letter_file(pid):
+    return os.path.join(WORKER_DIR, f"dead_letters-{pid}.json")
+
+
+def collect_dead_letters(shared):
+    """Move the entries of every worker's dead-letter file into the `shared` queue.
+
+    Workers hand theirs over after each series; this picks up what a worker
+    that crashed or was killed left behind. Returns the number of entries moved.
+    """
+    moved = 0
+    for path in glob.glob(worker_dead_letter_file("*")):
+        entries = DeadLetterQueue(path).drain()
+        shared.extend(entries)
+        moved += len(entries)
+        for leftover in (path, path + ".lock"):
+            try:
+                os.remove(leftover)
+            except OSError:
+                pass
+    return moved
+
+
+def make_shards(series, shard_size):
+    """Split (series_id, series_name) rows into shards of at most shard_size series"""
+    shard_size = max(1, int(shard_size))
+    return [series[i:i + shard_size] for i in range(0, len(series), shard_size)]
+
+
+class BackfillWorker:
+    """API clients, database connection and write buffer of one pool process"""
+
+    def __init__(self, stop_event, batch_size=None, flush_interval=None, fetch_players=True,
+                 bulk_load=None):
+        self.stop_event = stop_event
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        # A queue file per process counts one series' failed calls; they are then
+        # moved to the shared queue that the next run replays first
+        dead_letters = DeadLetterQueue(worker_dead_letter_file(os.getpid()))
+        self.api_client = CricbuzzAPIClient(dead_letters=dead_letters)
+        self.shared_dead_letters = default_dead_letters()
+        self.async_client = AsyncCricbuzzAPIClient(self.api_client)
+        self.db_manager = DatabaseManager(bulk_load=bulk_load)
+        self.db_manager.connect()
+        self.buffer = new_write_buffer(self.db_manager, batch_size, flush_interval)
+        self.fetch_players = fetch_players
+        self.seen_player_ids = set()
+
+    def run_series(self, series_id, series_name):
+        """Backfill one series and checkpoint it. Returns (status, matches_total, matches_done)."""
+        db_manager = self.db_manager
+        db_manager.update_backfill_checkpoint(series_id, "running", worker=self.name)
+        self.hand_over_dead_letters()
+        failed_flushes = self.buffer.failed_flushes
+
+        print(f"\n[INFO] [{self.name}] Series {series_id}: {series_name}")
+        payload = self.api_client.get_series_matches(series_id)
+        if payload is None:
+            db_manager.update_backfill_checkpoint(series_id, "failed",
+                                                  error="series matches unavailable")
+            return "failed", 0, 0
+
+        cricbuzz_ids = sorted({
+            int(match['matchInfo']['matchId']) for match in iter_series_matches(payload)
+            if match.get('matchInfo', {}).get('matchId')
+        })
+        store_match_feed(db_manager, payload, self.buffer, iter_series_matches)
+        discovered = fetch_and_store_scorecards(self.async_client, db_manager,
+                                                buffer=self.buffer, cricbuzz_ids=cricbuzz_ids)
+        if self.fetch_players:
+            fetch_and_store_players(self.async_client, db_manager, discovered,
+                                    self.buffer, self.seen_player_ids)
+        self.buffer.flush()
+
+        # Matches without a scorecard (abandoned, no play) stay pending but do not fail the series
+        matches_done = len(cricbuzz_ids) - len(db_manager.get_pending_scorecards(cricbuzz_ids=cricbuzz_ids))
+        failed_calls = self.hand_over_dead_letters()
+        error = None
+        if failed_calls:
+            error = f"{failed_calls} calls failed after retries"
+        elif self.buffer.failed_flushes > failed_flushes:
+            error = "a write was rolled back"
+        status = "failed" if error else "done"
+        db_manager.update_backfill_checkpoint(series_id, status, len(cricbuzz_ids),
+                                              matches_done, error)
+        return status, len(cricbuzz_ids), matches_done
+
+    def hand_over_dead_letters(self):
+        """Move this worker's dead letters to the shared queue; returns how many there were."""
+        entries = self.api_client.dead_letters.drain()
+        self.shared_dead_letters.extend(entries)
+        return len(entries)
+
+    def run_shard(self, shard_no, series):
+        """Backfill the series of one shard in order, stopping early on shutdown or quota"""
+        summary = {"shard": shard_no, "done": 0, "failed": 0, "skipped": 0,
+                   "matches": 0, "quota_exhausted": False}
+        if not self.db_manager.ensure_connected():
+            summary["skipped"] = len(series)
+            return summary
+
+        for series_id, series_name in series:
+            if self.stop_event.is_set():
+                summary["skipped"] += 1
+                continue
+            if self.api_client.limiter.quota_exhausted():
+                summary["quota_exhausted"] = True
+                summary["skipped"] += 1
+                continue
+            try:
+                status, _, matches_done = self.run_series(series_id, series_name)
+            except Exception as e:
+                print(f"[ERROR] [{self.name}] Series {series_id} failed: {e}")
+                self.db_manager.update_backfill_checkpoint(series_id, "failed", error=e)
+                status, matches_done = "failed", 0
+            summary[status] += 1
+            summary["matches"] += matches_done
+        return summary
+
+
+_worker = None
+
+
+def _init_worker(budget, stop_event, batch_size, flush_interval, fetch_players, bulk_load):
+    """Pool initializer: join the shared rate budget and open this process's connections"""
+    global _worker
+    # The parent handles Ctrl+C and asks workers to stop between series
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    share_budget(budget)
+    _worker = BackfillWorker(stop_event, batch_size, flush_interval, fetch_players, bulk_load)
+
+
+def _run_shard(shard_no, series):
+    return _worker.run_shard(shard_no, series)
+
+
+def parse_args(argv=None):
+    load_dotenv()
+    this_year = datetime.now().year
+    parser = argparse.ArgumentParser(description="Backfill historical Cricbuzz series into MySQL")
+    parser.add_argument("--from-year", type=int, default=this_year - 1,
+                        help="first season to backfill")
+    parser.add_argument("--to-year", type=int, default=this_year,
+                        help="last season to backfill")
+    parser.add_argument("--series-types", default=os.getenv("BACKFILL_SERIES_TYPES") or "international",
+                        help=f"comma-separated series types ({', '.join(SERIES_TYPES)})")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("BACKFILL_WORKERS") or 4),
+                        help="worker processes sharing the API rate budget")
+    parser.add_argument("--shard-size", type=int,
+                        default=int(os.getenv("BACKFILL_SHARD_SIZE") or 5),
+                        help="series handed to a worker at a time")
+    parser.add_argument("--max-series", type=int, default=None,
+                        help="stop after this many series (useful for a trial run)")
+    parser.add_argument("--skip-planning", action="store_true",
+                        help="work on series already in backfill_checkpoints without listing again")
+    parser.add_argument("--skip-players", action="store_true",
+                        help="do not fetch profiles for players found in the scorecards")
+    parser.add_argument("--batch-size", type=int,
+                        default=int(os.getenv("INGEST_BATCH_SIZE") or 5000),
+                        help="buffered rows per table that trigger a flush")
+    parser.add_argument("--flush-interval", type=float,
+                        default=float(os.getenv("INGEST_FLUSH_INTERVAL") or 5),
+                        help="seconds after which buffered rows are flushed regardless of size")
+    parser.add_argument("--bulk-load", action="store_true", default=None,
+                        help="write large batches with LOAD DATA LOCAL INFILE (or set DB_BULK_LOAD=1)")
+    return parser.parse_args(argv)
+
+
+def print_progress(db_manager):
+    progress = db_manager.get_backfill_progress()
+    for status in ("done", "failed", "running", "pending"):
+        series, total, done = progress.get(status, (0, 0, 0))
+        if series:
+            print(f"   {status:<8} {series:>6} series, {done}/{total} matches with scorecards")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    series_types = [t.strip().lower() for t in args.series_types.split(",") if t.strip()]
+    unknown = sorted(set(series_types) - set(SERIES_TYPES))
+    if unknown or args.from_year > args.to_year:
+        print(f"[ERROR] Invalid scope: types {unknown or series_types}, "
+              f"years {args.from_year}-{args.to_year}")
+        return 2
+    years = list(range(args.from_year, args.to_year + 1))
+    started_at = time.time()
+
+    print("=" * 60)
+    print(f"Cricbuzz Backfill: {args.from_year}-{args.to_year}, {', '.join(series_types)}")
+    print("=" * 60)
+
+    # Spawned (not forked) workers, so no process inherits this one's sockets
+    context = multiprocessing.get_context("spawn")
+    budget = SharedBudget.from_env(context)
+    share_budget(budget)
+    stop_event = context.Event()
+
+    db_manager = DatabaseManager()
+    if not db_manager.connect():
+        print("[ERROR] Failed to connect to database. Exiting.")
+        return 1
+
+    dead_letters = default_dead_letters()
+    try:
+        # Calls that failed in earlier runs (including workers that died) are
+        # replayed first; what they fetch is served from the response cache later
+        collect_dead_letters(dead_letters)
+        api_client = CricbuzzAPIClient(dead_letters=dead_letters)
+        async_client = AsyncCricbuzzAPIClient(api_client)
+        retry_dead_letters(async_client)
+        if not args.skip_planning:
+            plan_series(api_client, db_manager, years, series_types)
+        async_client.close()
+        api_client.transport.close()
+
+        series = db_manager.get_backfill_series(years, series_types)
+        if args.max_series:
+            series = series[:args.max_series]
+        if not series:
+            print("[OK] Nothing left to backfill")
+            print_progress(db_manager)
+            return 0
+
+        shards = make_shards(series, args.shard_size)
+        workers = max(1, min(args.workers, len(shards)))
+        print(f"[INFO] {len(series)} series to backfill in {len(shards)} shards on {workers} workers "
+              f"({budget.requests_per_second:g} requests/s shared)")
+
+        totals = {"done": 0, "failed": 0, "matches": 0}
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(budget, stop_event, args.batch_size, args.flush_interval,
+                      not args.skip_players, args.bulk_load),
+        )
+        try:
+            futures = [executor.submit(_run_shard, shard_no, shard)
+                       for shard_no, shard in enumerate(shards, 1)]
+            for completed, future in enumerate(as_completed(futures), 1):
+                try:
+                    summary = future.result()
+                except Exception as e:
+                    print(f"[ERROR] Shard failed: {e}")
+                    continue
+                for key in totals:
+                    totals[key] += summary[key]
+                # Record the month's usage as we go, so an interrupted run still counts
+                budget.save()
+                elapsed = time.time() - started_at
+                print(f"[OK] Shard {summary['shard']} ({completed}/{len(shards)}): "
+                      f"{summary['done']} series done, {summary['failed']} failed; "
+                      f"{budget.run_requests()} API calls in {elapsed:.0f}s "
+                      f"({budget.run_requests() / elapsed:.1f}/s)")
+                if summary["quota_exhausted"] and not stop_event.is_set():
+                    print("[WARNING] Monthly API quota exhausted; stopping after the current series")
+                    stop_event.set()
+        except KeyboardInterrupt:
+            print("\n[INFO] Interrupted; waiting for the series in progress to be checkpointed...")
+            stop_event.set()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            collect_dead_letters(dead_letters)
+
+        elapsed = time.time() - started_at
+        month_used = budget.save()
+        print("\n" + "=" * 60)
+        remaining = len(series) - totals["done"] - totals["failed"]
+        print(f"[OK] Backfill run finished in {elapsed:.0f}s: {totals['done']} series done, "
+              f"{totals['failed']} failed, {remaining} left for the next run")
+        print(f"[INFO] {totals['matches']} matches with scorecards, "
+              f"{budget.run_requests()} API calls ({budget.run_requests() / max(elapsed, 1):.1f}/s "
+              f"of {budget.requests_per_second:g}/s); "
+              f"{month_used} used this month")
+        print("[INFO] Checkpoints:")
+        print_progress(db_manager)
+        print("=" * 60)
+        return 0
+    finally:
+        budget.save()
+        db_manager.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
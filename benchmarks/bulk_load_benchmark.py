@@ -0,0 +1,138 @@
+"""
+Compare write throughput of the three ways DatabaseManager can upsert rows:
+row-by-row statements, multi-row executemany batches and LOAD DATA LOCAL INFILE
+into a staging table followed by one set-based merge.
+
+Runs against a scratch copy of batting_data (created with CREATE TABLE ... LIKE,
+so without foreign keys) in the configured database and drops it afterwards.
+The server needs local_infile=ON for the LOAD DATA mode.
+
+    python benchmarks/bulk_load_benchmark.py --rows 50000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fetch_api_data import DatabaseManager  # noqa: E402
+from utils.records import BattingInnings, ColumnBatch  # noqa: E402
+
+TABLE = "bench_batting_data"
+COLUMNS = ["match_id", "player_id", "innings_no", "player_name", "runs", "balls",
+           "strike_rate", "dismissal", "team"]
+KEY_COLUMNS = ["match_id", "player_id", "innings_no"]
+UPDATE_COLUMNS = ["player_name", "runs", "balls", "strike_rate", "dismissal", "team"]
+MODES = ("row", "executemany", "load_data")
+
+
+def make_rows(count, seed):
+    """`count` BattingInnings params with distinct keys; a different seed changes only the values"""
+    rng = random.Random(seed)
+    batch = ColumnBatch(BattingInnings)
+    for i in range(count):
+        runs = rng.randint(0, 150)
+        balls = rng.randint(1, 120)
+        batch.append(BattingInnings(
+            match_id=1 + i // 22, player_id=1 + i % 11, player_name=f"Player {i % 11}",
+            runs=runs, balls=balls, strike_rate=round(100 * runs / balls, 2),
+            dismissal=rng.choice(["c Smith b Starc", "b Cummins", "lbw b Lyon", "not out",
+                                  "run out (Carey)\tdirect hit"]),
+            team=rng.choice(["India", "Australia"]), innings_no=1 + (i // 11) % 2,
+        ))
+    return batch.params(COLUMNS)
+
+
+def row_by_row(db_manager, rows):
+    """One INSERT ... ON DUPLICATE KEY UPDATE and one autocommit per row"""
+    sql = (f"INSERT INTO {TABLE} ({', '.join(COLUMNS)}) VALUES ({', '.join(['%s'] * len(COLUMNS))}) "
+           f"ON DUPLICATE KEY UPDATE {', '.join(f'{c} = VALUES({c})' for c in UPDATE_COLUMNS)}")
+    cur = db_manager._cursor()
+    try:
+        for row in rows:
+            cur.execute(sql, row)
+    finally:
+        cur.close()
+
+
+def executemany(db_manager, rows):
+    db_manager.bulk_load = False
+    with db_manager.transaction():
+        db_manager._bulk_upsert(TABLE, COLUMNS, KEY_COLUMNS, UPDATE_COLUMNS, rows,
+                                db_manager.bulk_batch_size)
+
+
+def load_data(db_manager, rows):
+    with db_manager.transaction():
+        if db_manager._load_data_upsert(TABLE, COLUMNS, KEY_COLUMNS, UPDATE_COLUMNS, rows) is None:
+            raise RuntimeError("LOAD DATA LOCAL INFILE is disabled (set local_infile=ON on the server)")
+
+
+RUNNERS = {"row": row_by_row, "executemany": executemany, "load_data": load_data}
+
+
+def run_mode(db_manager, mode, inserts, updates):
+    """(insert_seconds, update_seconds) for one mode on an empty table"""
+    cur = db_manager._cursor()
+    cur.execute(f"TRUNCATE TABLE {TABLE}")
+    cur.close()
+    timings = []
+    for rows in (inserts, updates):
+        started = time.perf_counter()
+        RUNNERS[mode](db_manager, rows)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark row-by-row, executemany and LOAD DATA upserts")
+    parser.add_argument("--rows", type=int, default=50000, help="rows per pass")
+    parser.add_argument("--row-by-row-rows", type=int, default=5000,
+                        help="rows for the (slow) row-by-row mode; its rate is extrapolated")
+    parser.add_argument("--modes", default=",".join(MODES), help=f"comma-separated ({', '.join(MODES)})")
+    parser.add_argument("--keep", action="store_true", help=f"keep the {TABLE} table afterwards")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    unknown = sorted(set(modes) - set(MODES))
+    if unknown:
+        print(f"[ERROR] Unknown modes: {', '.join(unknown)}")
+        return 2
+
+    db_manager = DatabaseManager(bulk_load=True)
+    if not db_manager.connect():
+        print("[ERROR] Failed to connect to database. Exiting.")
+        return 1
+
+    cur = db_manager._cursor()
+    cur.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    cur.execute(f"CREATE TABLE {TABLE} LIKE batting_data")
+    cur.close()
+
+    print(f"{'mode':<12} {'rows':>8} {'insert rows/s':>14} {'update rows/s':>14}")
+    try:
+        for mode in modes:
+            count = min(args.rows, args.row_by_row_rows) if mode == "row" else args.rows
+            inserts, updates = make_rows(count, seed=1), make_rows(count, seed=2)
+            try:
+                insert_s, update_s = run_mode(db_manager, mode, inserts, updates)
+            except Exception as e:
+                print(f"{mode:<12} [ERROR] {e}")
+                continue
+            print(f"{mode:<12} {count:>8} {count / insert_s:>14,.0f} {count / update_s:>14,.0f}")
+    finally:
+        if not args.keep:
+            cur = db_manager._cursor()
+            cur.execute(f"DROP TABLE IF EXISTS {TABLE}")
+            cur.close()
+        db_manager.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
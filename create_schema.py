@@ -17,6 +17,95 @@ def create_table(conn, table_name, create_sql):
         cur.close()
 
 
+def column_exists(conn, table_name, column_name):
+    """Check INFORMATION_SCHEMA for a column in the current database"""
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            SELECT COUNT(*) FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+        """, (table_name, column_name))
+        return cur.fetchone()[0] > 0
+    finally:
+        cur.close()
+
+
+def index_exists(conn, table_name, index_name):
+    """Check INFORMATION_SCHEMA for an index in the current database"""
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            SELECT COUNT(*) FROM INFORMATION_SCHEMA.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+        """, (table_name, index_name))
+        return cur.fetchone()[0] > 0
+    finally:
+        cur.close()
+
+
+def alter_table(conn, description, alter_sql):
+    """Helper function to run a migration statement"""
+    cur = conn.cursor()
+    try:
+        cur.execute(alter_sql)
+        conn.commit()
+        print(f"[OK] Migrated: {description}")
+    except Error as e:
+        print(f"[ERROR] Error migrating {description}: {e}")
+    finally:
+        cur.close()
+
+
+def add_column_if_missing(conn, table_name, column_name, definition):
+    """Add a column to a table created by an older version of this script"""
+    if not column_exists(conn, table_name, column_name):
+        alter_table(conn, f"{table_name}.{column_name}",
+                    f"ALTER TABLE {table_name} ADD COLUMN {column_name} {definition}")
+
+
+def add_index_if_missing(conn, table_name, index_name, definition):
+    """Add an index to a table created by an older version of this script"""
+    if not index_exists(conn, table_name, index_name):
+        alter_table(conn, f"{table_name} index {index_name}",
+                    f"ALTER TABLE {table_name} ADD {definition}")
+
+
+def drop_index_if_exists(conn, table_name, index_name):
+    """Drop an index that newer versions of the schema no longer use"""
+    if index_exists(conn, table_name, index_name):
+        alter_table(conn, f"drop {table_name} index {index_name}",
+                    f"ALTER TABLE {table_name} DROP INDEX {index_name}")
+
+
+def migrate_existing_tables(conn):
+    """Bring tables created by earlier versions of this script up to date"""
+    add_column_if_missing(conn, "players", "cricbuzz_player_id", "INT NULL")
+    add_index_if_missing(conn, "players", "unique_cricbuzz_player",
+                         "UNIQUE KEY unique_cricbuzz_player (cricbuzz_player_id)")
+
+    # Incremental ingestion watermarks
+    add_column_if_missing(conn, "combined_matches", "cricbuzz_match_id", "INT NULL")
+    add_column_if_missing(conn, "combined_matches", "match_state", "VARCHAR(50)")
+    add_column_if_missing(conn, "combined_matches", "match_status", "VARCHAR(500)")
+    add_column_if_missing(conn, "combined_matches", "scorecard_status", "VARCHAR(500)")
+    add_column_if_missing(conn, "combined_matches", "scorecard_ingested_at", "DATETIME NULL")
+
+    # Cricbuzz matchId is the natural key; (team1, team2, date) collides on double-headers
+    add_column_if_missing(conn, "recent_matches", "cricbuzz_match_id", "INT NULL")
+    add_index_if_missing(conn, "recent_matches", "unique_cricbuzz_match",
+                         "UNIQUE KEY unique_cricbuzz_match (cricbuzz_match_id)")
+    drop_index_if_exists(conn, "recent_matches", "unique_match")
+    add_index_if_missing(conn, "combined_matches", "unique_cricbuzz_match",
+                         "UNIQUE KEY unique_cricbuzz_match (cricbuzz_match_id)")
+    add_index_if_missing(conn, "combined_matches", "idx_teams_date",
+                         "KEY idx_teams_date (team1, team2, match_date)")
+    drop_index_if_exists(conn, "combined_matches", "idx_cricbuzz_match")
+    drop_index_if_exists(conn, "combined_matches", "unique_match")
+
+    # Payload fingerprints used to skip unchanged writes
+    add_column_if_missing(conn, "combined_matches", "payload_hash", "CHAR(40) NULL")
+
+
 def create_players_table(conn):
     """Create players table"""
     create_sql = """
@@ -30,7 +119,9 @@ def create_players_table(conn):
         bowling_style VARCHAR(100),
         total_runs INT DEFAULT 0,
         total_wickets INT DEFAULT 0,
-        team_id INT
+        team_id INT,
+        cricbuzz_player_id INT NULL,
+        UNIQUE KEY unique_cricbuzz_player (cricbuzz_player_id)
     );
     """
     create_table(conn, "players", create_sql)
@@ -49,7 +140,8 @@ def create_recent_matches_table(conn):
         start_date DATE,
         status VARCHAR(500),
         state VARCHAR(50),
-        UNIQUE KEY unique_match (team1, team2, start_date)
+        cricbuzz_match_id INT NULL,
+        UNIQUE KEY unique_cricbuzz_match (cricbuzz_match_id)
     );
     """
     create_table(conn, "recent_matches", create_sql)
@@ -97,7 +189,14 @@ def create_combined_matches_table(conn):
         match_date DATE,
         toss_winner VARCHAR(100),
         toss_decision VARCHAR(50),
-        UNIQUE KEY unique_match (team1, team2, match_date)
+        cricbuzz_match_id INT NULL,
+        match_state VARCHAR(50),
+        match_status VARCHAR(500),
+        scorecard_status VARCHAR(500),
+        scorecard_ingested_at DATETIME NULL,
+        payload_hash CHAR(40) NULL,
+        UNIQUE KEY unique_cricbuzz_match (cricbuzz_match_id),
+        KEY idx_teams_date (team1, team2, match_date)
     );
     """
     create_table(conn, "combined_matches", create_sql)
@@ -253,6 +352,42 @@ def create_fielding_data_table(conn):
     create_table(conn, "fielding_data", create_sql)
 
 
+def create_scorecard_innings_hashes_table(conn):
+    """Create scorecard_innings_hashes table (payload fingerprints per innings)"""
+    create_sql = """
+    CREATE TABLE IF NOT EXISTS scorecard_innings_hashes (
+        match_id INT NOT NULL,
+        innings_no INT NOT NULL,
+        payload_hash CHAR(40) NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        PRIMARY KEY (match_id, innings_no),
+        FOREIGN KEY (match_id) REFERENCES combined_matches(match_id) ON DELETE CASCADE
+    );
+    """
+    create_table(conn, "scorecard_innings_hashes", create_sql)
+
+
+def create_backfill_checkpoints_table(conn):
+    """Create backfill_checkpoints table (per-series progress of backfill.py)"""
+    create_sql = """
+    CREATE TABLE IF NOT EXISTS backfill_checkpoints (
+        series_id INT PRIMARY KEY,
+        series_name VARCHAR(255),
+        series_type VARCHAR(50),
+        series_year INT,
+        status VARCHAR(20) NOT NULL DEFAULT 'pending',
+        matches_total INT NOT NULL DEFAULT 0,
+        matches_done INT NOT NULL DEFAULT 0,
+        attempts INT NOT NULL DEFAULT 0,
+        worker VARCHAR(100),
+        last_error VARCHAR(500),
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        KEY idx_backfill_scope (series_year, series_type, status)
+    );
+    """
+    create_table(conn, "backfill_checkpoints", create_sql)
+
+
 def main():
     load_dotenv()
     host = os.getenv("DB_HOST") or "localhost"
@@ -290,6 +425,11 @@ def main():
             create_batters_batting_data_table(conn)
             create_bowling_data_table(conn)
             create_fielding_data_table(conn)
+            create_scorecard_innings_hashes_table(conn)
+            create_backfill_checkpoints_table(conn)
+            
+            # Upgrade tables created by older versions of this script
+            migrate_existing_tables(conn)
             
             print("=" * 60)
             print("[OK] All tables created successfully!")
@@ -3,35 +3,72 @@ Fetch real cricket data from Cricbuzz API and populate MySQL database.
 This script fetches live data from the API and stores it in the database.
 """
 import os
+import sys
+import argparse
+import asyncio
+import hashlib
+import json
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
 from dotenv import load_dotenv
 import mysql.connector
 from mysql.connector import Error
-import requests
 from datetime import datetime
-import time
+from utils.bulk_load import BULK_LOAD_DIR, load_data_sql, tsv_file
+from utils.cricbuzz_api import get_transport
+from utils.ingest_jobs import inherit_output
+from utils.ingest_pipeline import PipelineMetrics, WriteBuffer
+from utils.player_resolver import PlayerResolver
+from utils.query_cache import get_query_cache
+from utils.records import BattingInnings, BowlingSpell, ColumnBatch, Match, MatchReplaceBatch
+from utils.resilience import DeadLetterQueue, TransientAPIError
+from utils.response_cache import PROJECT_ROOT, is_completed_scorecard
+from utils.scorecard_tables import DERIVED_TABLES, derive_match_tables
+from utils.telemetry import TimedCursor, get_telemetry, prometheus_gauges, write_report
+
+
+DEFAULT_DEAD_LETTER_FILE = os.path.join(PROJECT_ROOT, ".cache", "dead_letters.json")
+
+# Client and server errors meaning LOAD DATA LOCAL INFILE is not allowed on this connection
+LOCAL_INFILE_REFUSED = {1148, 2068, 3948}
+
+
+def default_dead_letters():
+    """The dead-letter queue every run replays first (CRICBUZZ_DEAD_LETTER_FILE)"""
+    load_dotenv()
+    return DeadLetterQueue(os.getenv("CRICBUZZ_DEAD_LETTER_FILE") or DEFAULT_DEAD_LETTER_FILE)
 
 
 class CricbuzzAPIClient:
     """Client for Cricbuzz API"""
     
-    def __init__(self):
+    # Calls worth replaying on the next run when they fail transiently
+    DEAD_LETTER_METHODS = ("get_scorecard", "search_players", "get_player_details")
+    
+    def __init__(self, transport=None, dead_letters=None):
         load_dotenv()
-        self.api_key = os.getenv("RAPIDAPI_KEY")
-        self.base_url = "https://cricbuzz-cricket.p.rapidapi.com"
-        self.headers = {
-            "x-rapidapi-key": self.api_key,
-            "x-rapidapi-host": "cricbuzz-cricket.p.rapidapi.com"
-        }
+        self.transport = transport or get_transport()
+        self.limiter = self.transport.limiter
+        self.cache = self.transport.cache
+        self.dead_letters = dead_letters or default_dead_letters()
+    
+    def _dead_letter(self, method, args, error):
+        """Remember a call that failed after retries so the next run tries it first"""
+        print(f"[ERROR] {method}({', '.join(map(str, args))}) failed after retries: {error}")
+        self.dead_letters.add(method, args, error)
     
     def get_live_matches(self):
         """Fetch live matches"""
         try:
-            url = f"{self.base_url}/matches/v1/live"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            if response.status_code == 200:
-                return response.json()
+            status, data = self.transport.get_json("live_matches", "/matches/v1/live")
+            if status == 200:
+                return data
             else:
-                print(f"[ERROR] API Error: {response.status_code}")
+                print(f"[ERROR] API Error: {status}")
                 return None
         except Exception as e:
             print(f"[ERROR] Error fetching live matches: {e}")
@@ -40,38 +77,77 @@ class CricbuzzAPIClient:
     def get_recent_matches(self):
         """Fetch recent matches"""
         try:
-            url = f"{self.base_url}/matches/v1/recent"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            if response.status_code == 200:
-                return response.json()
+            status, data = self.transport.get_json("recent_matches", "/matches/v1/recent")
+            if status == 200:
+                return data
             else:
-                print(f"[ERROR] API Error: {response.status_code}")
+                print(f"[ERROR] API Error: {status}")
                 return None
         except Exception as e:
             print(f"[ERROR] Error fetching recent matches: {e}")
             return None
     
-    def get_scorecard(self, match_id):
-        """Fetch detailed scorecard for a match"""
+    def get_scorecard(self, match_id, fresh=False):
+        """Fetch detailed scorecard for a match
+        
+        With `fresh`, a cached scorecard is only reused once its match has
+        finished; an in-progress one is fetched again.
+        """
         try:
-            url = f"{self.base_url}/mcenter/v1/{match_id}/scard"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            if response.status_code == 200:
-                return response.json()
+            status, data = self.transport.get_json(
+                "scorecard", f"/mcenter/v1/{match_id}/scard",
+                cache_params={"match_id": str(match_id)},
+                cached_if=is_completed_scorecard if fresh else None
+            )
+            if status == 200:
+                return data
             else:
                 return None
+        except TransientAPIError as e:
+            self._dead_letter("get_scorecard", [match_id], e)
+            return None
         except Exception as e:
             print(f"[ERROR] Error fetching scorecard for {match_id}: {e}")
             return None
     
+    def get_series_archive(self, series_type, year):
+        """Fetch the series of one type (international, league, domestic, women) in a year"""
+        try:
+            status, data = self.transport.get_json(
+                "series_archive", f"/series/v1/archives/{series_type}", params={"year": str(year)}
+            )
+            if status == 200:
+                return data
+            return None
+        except Exception as e:
+            print(f"[ERROR] Error fetching {series_type} series for {year}: {e}")
+            return None
+    
+    def get_series_matches(self, series_id):
+        """Fetch every match of a series"""
+        try:
+            status, data = self.transport.get_json(
+                "series_matches", f"/series/v1/{series_id}",
+                cache_params={"series_id": str(series_id)}
+            )
+            if status == 200:
+                return data
+            return None
+        except Exception as e:
+            print(f"[ERROR] Error fetching matches of series {series_id}: {e}")
+            return None
+    
     def search_players(self, query):
         """Search for players"""
         try:
-            url = f"{self.base_url}/stats/v1/player/search"
-            params = {"plrN": query}
-            response = requests.get(url, headers=self.headers, params=params, timeout=10)
-            if response.status_code == 200:
-                return response.json()
+            status, data = self.transport.get_json(
+                "player_search", "/stats/v1/player/search", params={"plrN": query}
+            )
+            if status == 200:
+                return data
+            return None
+        except TransientAPIError as e:
+            self._dead_letter("search_players", [query], e)
             return None
         except Exception as e:
             print(f"[ERROR] Error searching players: {e}")
@@ -80,36 +156,123 @@ class CricbuzzAPIClient:
     def get_player_details(self, player_id):
         """Get player details"""
         try:
-            url = f"{self.base_url}/stats/v1/player/{player_id}"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            if response.status_code == 200:
-                return response.json()
+            status, data = self.transport.get_json(
+                "player_details", f"/stats/v1/player/{player_id}",
+                cache_params={"player_id": str(player_id)}
+            )
+            if status == 200:
+                return data
+            return None
+        except TransientAPIError as e:
+            self._dead_letter("get_player_details", [player_id], e)
             return None
         except Exception as e:
             print(f"[ERROR] Error fetching player {player_id}: {e}")
             return None
 
 
+class AsyncCricbuzzAPIClient:
+    """Asyncio front-end for CricbuzzAPIClient with a bounded number of in-flight requests"""
+    
+    def __init__(self, api_client=None, max_concurrency=None):
+        load_dotenv()
+        self.api_client = api_client or CricbuzzAPIClient()
+        if max_concurrency is None:
+            max_concurrency = int(os.getenv("API_MAX_CONCURRENCY") or 8)
+        self.max_concurrency = max(1, int(max_concurrency))
+        # The executor size is the concurrency limit: at most max_concurrency
+        # blocking calls are on the wire at any time, the rest queue up.
+        # Workers print into the same log as the creating thread (e.g. a Home page job).
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="cricbuzz-api",
+            initializer=inherit_output()
+        )
+    
+    async def _call(self, method, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(method, *args))
+    
+    async def get_live_matches(self):
+        """Fetch live matches"""
+        return await self._call(self.api_client.get_live_matches)
+    
+    async def get_recent_matches(self):
+        """Fetch recent matches"""
+        return await self._call(self.api_client.get_recent_matches)
+    
+    async def get_scorecard(self, match_id):
+        """Fetch detailed scorecard for a match"""
+        return await self._call(self.api_client.get_scorecard, match_id)
+    
+    async def get_fresh_scorecard(self, match_id):
+        """Fetch a scorecard, skipping cached in-progress copies"""
+        return await self._call(self.api_client.get_scorecard, match_id, True)
+    
+    async def search_players(self, query):
+        """Search for players"""
+        return await self._call(self.api_client.search_players, query)
+    
+    async def get_player_details(self, player_id):
+        """Get player details"""
+        return await self._call(self.api_client.get_player_details, player_id)
+    
+    async def gather(self, method_name, args_list):
+        """Run one client method for every argument concurrently, preserving order"""
+        method = getattr(self, method_name)
+        return await asyncio.gather(*(method(arg) for arg in args_list))
+    
+    def run(self, method_name, args_list):
+        """Blocking helper around gather() for synchronous callers"""
+        return asyncio.run(self.gather(method_name, list(args_list)))
+    
+    def close(self):
+        """Shut down the worker threads"""
+        self._executor.shutdown(wait=True)
+
+
+def as_async_client(api_client):
+    """Wrap a synchronous client so callers can fan out requests"""
+    if isinstance(api_client, AsyncCricbuzzAPIClient):
+        return api_client
+    return AsyncCricbuzzAPIClient(api_client)
+
+
 class DatabaseManager:
     """Manages database operations"""
     
-    def __init__(self):
+    def __init__(self, bulk_load=None):
         load_dotenv()
         self.host = os.getenv("DB_HOST") or "localhost"
         self.user = os.getenv("DB_USER") or "root"
         self.password = os.getenv("DB_PASSWORD") or ""
         self.database = os.getenv("DB_NAME") or "cricket_db"
+        self.bulk_batch_size = int(os.getenv("DB_BULK_BATCH_SIZE") or 2000)
+        # LOAD DATA mode for large batches (historical backfills)
+        if bulk_load is None:
+            bulk_load = (os.getenv("DB_BULK_LOAD") or "").lower() in ("1", "true", "yes")
+        self.bulk_load = bulk_load
+        self.bulk_load_min_rows = int(os.getenv("DB_BULK_LOAD_MIN_ROWS") or 5000)
         self.conn = None
+        self._in_transaction = False
+        self._written_tables = set()
+        self.telemetry = get_telemetry()
     
     def connect(self):
         """Connect to database"""
+        options = {}
+        if self.bulk_load:
+            # LOCAL INFILE is only allowed for the files the bulk loader writes
+            os.makedirs(BULK_LOAD_DIR, exist_ok=True)
+            options["allow_local_infile_in_path"] = BULK_LOAD_DIR
         try:
             self.conn = mysql.connector.connect(
                 host=self.host,
                 user=self.user,
                 password=self.password,
                 database=self.database,
-                autocommit=True
+                autocommit=True,
+                **options
             )
             return True
         except Error as e:
@@ -121,236 +284,531 @@ class DatabaseManager:
         if self.conn and self.conn.is_connected():
             self.conn.close()
     
-    def insert_or_update_player(self, player_data):
-        """Insert or update player in database"""
-        cur = self.conn.cursor()
+    def ensure_connected(self):
+        """Reconnect if the server dropped the connection (long-running daemon mode)"""
+        if self.conn is None:
+            return self.connect()
         try:
-            # Check if player exists
-            check_sql = "SELECT player_id FROM players WHERE name = %s OR full_name = %s"
-            cur.execute(check_sql, (player_data.get('name', ''), player_data.get('full_name', '')))
-            existing = cur.fetchone()
-            
-            if existing:
-                # Update existing player
-                update_sql = """
-                UPDATE players SET 
-                    full_name = %s, name = %s, country = %s, playing_role = %s,
-                    batting_style = %s, bowling_style = %s
-                WHERE player_id = %s
-                """
-                cur.execute(update_sql, (
-                    player_data.get('full_name', ''),
-                    player_data.get('name', ''),
-                    player_data.get('country', ''),
-                    player_data.get('playing_role', ''),
-                    player_data.get('batting_style', ''),
-                    player_data.get('bowling_style', ''),
-                    existing[0]
-                ))
-                return existing[0]
-            else:
-                # Insert new player
-                insert_sql = """
-                INSERT INTO players (full_name, name, country, playing_role, batting_style, bowling_style, total_runs, total_wickets)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                """
-                cur.execute(insert_sql, (
-                    player_data.get('full_name', ''),
-                    player_data.get('name', ''),
-                    player_data.get('country', ''),
-                    player_data.get('playing_role', ''),
-                    player_data.get('batting_style', ''),
-                    player_data.get('bowling_style', ''),
-                    player_data.get('total_runs', 0),
-                    player_data.get('total_wickets', 0)
-                ))
-                return cur.lastrowid
+            self.conn.ping(reconnect=True, attempts=3, delay=2)
+            return True
         except Error as e:
-            print(f"[ERROR] Error inserting player: {e}")
+            print(f"[ERROR] Database reconnect failed: {e}")
+            return False
+    
+    def _cursor(self):
+        """Cursor whose statements are timed into the run's telemetry"""
+        return TimedCursor(self.conn.cursor(), self.telemetry, on_write=self._table_written)
+    
+    def _table_written(self, table):
+        """Invalidate cached dashboard queries on `table` once the write is committed"""
+        if self._in_transaction:
+            self._written_tables.add(table)
+        else:
+            get_query_cache().bump(self.host, self.database, [table])
+    
+    @contextmanager
+    def transaction(self):
+        """Run a block of writes as one explicit transaction (one commit instead of one per statement).
+        
+        Inside the block the write helpers re-raise database errors instead of
+        swallowing them, so the whole block is rolled back.
+        """
+        self.conn.start_transaction()
+        self._in_transaction = True
+        try:
+            yield
+            self.conn.commit()
+            get_query_cache().bump(self.host, self.database, self._written_tables)
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            self._in_transaction = False
+            self._written_tables = set()
+    
+    def upsert_players(self, players):
+        """Bulk upsert player profile dicts keyed on the Cricbuzz player id.
+        
+        One INSERT ... ON DUPLICATE KEY UPDATE per batch on the
+        `unique_cricbuzz_player` index; run totals are left untouched on
+        update. Profiles without a Cricbuzz id are skipped. Returns
+        (inserted, updated).
+        """
+        columns = ["cricbuzz_player_id", "full_name", "name", "country", "playing_role",
+                   "batting_style", "bowling_style", "total_runs", "total_wickets"]
+        defaults = {"total_runs": 0, "total_wickets": 0}
+        rows = [
+            tuple(player_data.get(col, defaults.get(col, '')) for col in columns)
+            for player_data in players if player_data.get('cricbuzz_player_id')
+        ]
+        if not rows:
+            return 0, 0
+        return self._bulk_upsert(
+            "players", columns, ["cricbuzz_player_id"],
+            ["full_name", "name", "country", "playing_role", "batting_style", "bowling_style"],
+            rows, self.bulk_batch_size
+        )
+    
+    def insert_match(self, match_data):
+        """Insert or update a single match; returns its combined_matches.match_id"""
+        if not match_data.cricbuzz_match_id:
             return None
+        ids = self.upsert_matches([match_data], return_ids=True)
+        return ids.get(match_data.cricbuzz_match_id)
+    
+    def upsert_matches(self, matches, return_ids=False):
+        """Bulk upsert parsed matches into recent_matches and combined_matches.
+        
+        Both tables are keyed on the Cricbuzz matchId, so each batch is one
+        INSERT ... ON DUPLICATE KEY UPDATE per table with no lookup beforehand.
+        Scorecard watermark columns are never touched here. Matches without a
+        matchId are skipped. Returns {cricbuzz_match_id: match_id} when
+        `return_ids` is set, otherwise the number of matches written.
+        """
+        batch = ColumnBatch(Match, (m for m in matches if m.cricbuzz_match_id))
+        if not len(batch):
+            return {} if return_ids else 0
+        
+        self._bulk_upsert(
+            "recent_matches",
+            ["cricbuzz_match_id", "match_desc", "team1", "team2", "venue", "venue_city",
+             "start_date", "status", "state"],
+            ["cricbuzz_match_id"],
+            ["match_desc", "team1", "team2", "venue", "venue_city", "start_date", "status", "state"],
+            batch.params(["cricbuzz_match_id", "match_desc", "team1", "team2", "venue",
+                          "venue_city", "start_date", "status", "state"]),
+            self.bulk_batch_size
+        )
+        
+        # Record fields in combined_matches column order (start_date -> match_date,
+        # status -> match_status)
+        combined_rows = batch.params([
+            "cricbuzz_match_id", "team1", "team2", "match_winner", "win_margin", "format",
+            "venue", "start_date", "toss_winner", "toss_decision", "match_state", "status",
+            "payload_hash"
+        ])
+        self._bulk_upsert(
+            "combined_matches",
+            ["cricbuzz_match_id", "team1", "team2", "match_winner", "win_margin", "format",
+             "venue", "match_date", "toss_winner", "toss_decision", "match_state", "match_status",
+             "payload_hash"],
+            ["cricbuzz_match_id"],
+            ["team1", "team2", "match_winner", "win_margin", "format", "venue", "match_date",
+             "toss_winner", "toss_decision", "match_state", "match_status", "payload_hash"],
+            combined_rows,
+            self.bulk_batch_size
+        )
+        
+        if not return_ids:
+            return len(combined_rows)
+        
+        cricbuzz_ids = sorted({row[0] for row in combined_rows})
+        placeholders = ", ".join(["%s"] * len(cricbuzz_ids))
+        cur = self._cursor()
+        try:
+            cur.execute(
+                f"SELECT cricbuzz_match_id, match_id FROM combined_matches "
+                f"WHERE cricbuzz_match_id IN ({placeholders})", cricbuzz_ids
+            )
+            return {cb_id: match_id for cb_id, match_id in cur.fetchall()}
+        except Error as e:
+            print(f"[ERROR] Error reading match ids: {e}")
+            return {}
         finally:
             cur.close()
     
-    def insert_match(self, match_data):
-        """Insert match into recent_matches and combined_matches"""
-        cur = self.conn.cursor()
+    def get_pending_scorecards(self, limit=None, cricbuzz_ids=None):
+        """Return (match_id, cricbuzz_match_id, match_status) for matches whose scorecard is stale.
+        
+        A scorecard is stale when it was never ingested or the match status has
+        changed since it was. Completed matches stop changing status, so once
+        their final scorecard is stored they are never selected again. Matches
+        that have not started yet have no scorecard and are skipped.
+        `cricbuzz_ids` restricts the check to those matches (e.g. one series).
+        """
+        params = []
+        id_filter = ""
+        if cricbuzz_ids is not None:
+            params = sorted({int(cb_id) for cb_id in cricbuzz_ids})
+            if not params:
+                return []
+            id_filter = f"AND cricbuzz_match_id IN ({', '.join(['%s'] * len(params))})"
+        sql = f"""
+        SELECT match_id, cricbuzz_match_id, match_status
+        FROM combined_matches
+        WHERE cricbuzz_match_id IS NOT NULL
+          AND COALESCE(match_state, '') NOT IN ('Preview', 'Upcoming')
+          AND (scorecard_ingested_at IS NULL OR NOT (scorecard_status <=> match_status))
+          {id_filter}
+        ORDER BY scorecard_ingested_at IS NOT NULL, match_date DESC
+        """
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        cur = self._cursor()
         try:
-            # Check if match already exists in recent_matches
-            check_sql = """
-            SELECT match_id FROM recent_matches 
-            WHERE team1 = %s AND team2 = %s AND start_date = %s
-            """
-            cur.execute(check_sql, (
-                match_data.get('team1', ''),
-                match_data.get('team2', ''),
-                match_data.get('start_date')
-            ))
-            existing = cur.fetchone()
-            
-            if existing:
-                match_id = existing[0]
-                # Update existing match
-                update_sql = """
-                UPDATE recent_matches SET 
-                    status = %s, state = %s, venue = %s, venue_city = %s
-                WHERE match_id = %s
-                """
-                cur.execute(update_sql, (
-                    match_data.get('status', ''),
-                    match_data.get('state', ''),
-                    match_data.get('venue', ''),
-                    match_data.get('venue_city', ''),
-                    match_id
-                ))
-            else:
-                # Insert new match
-                match_sql = """
-                INSERT INTO recent_matches (match_desc, team1, team2, venue, venue_city, start_date, status, state)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                """
-                cur.execute(match_sql, (
-                    match_data.get('match_desc', ''),
-                    match_data.get('team1', ''),
-                    match_data.get('team2', ''),
-                    match_data.get('venue', ''),
-                    match_data.get('venue_city', ''),
-                    match_data.get('start_date'),
-                    match_data.get('status', ''),
-                    match_data.get('state', '')
-                ))
-                match_id = cur.lastrowid
-            
-            # Insert or update in combined_matches
-            check_combined_sql = """
-            SELECT match_id FROM combined_matches 
-            WHERE team1 = %s AND team2 = %s AND match_date = %s
-            """
-            cur.execute(check_combined_sql, (
-                match_data.get('team1', ''),
-                match_data.get('team2', ''),
-                match_data.get('start_date')
-            ))
-            existing_combined = cur.fetchone()
-            
-            if existing_combined:
-                update_combined_sql = """
-                UPDATE combined_matches SET 
-                    match_winner = %s, win_margin = %s, format = %s, venue = %s,
-                    toss_winner = %s, toss_decision = %s
-                WHERE match_id = %s
-                """
-                cur.execute(update_combined_sql, (
-                    match_data.get('match_winner', ''),
-                    match_data.get('win_margin', ''),
-                    match_data.get('format', ''),
-                    match_data.get('venue', ''),
-                    match_data.get('toss_winner', ''),
-                    match_data.get('toss_decision', ''),
-                    existing_combined[0]
-                ))
-            else:
-                combined_sql = """
-                INSERT INTO combined_matches (team1, team2, match_winner, win_margin, format, venue, match_date, toss_winner, toss_decision)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """
-                cur.execute(combined_sql, (
-                    match_data.get('team1', ''),
-                    match_data.get('team2', ''),
-                    match_data.get('match_winner', ''),
-                    match_data.get('win_margin', ''),
-                    match_data.get('format', ''),
-                    match_data.get('venue', ''),
-                    match_data.get('start_date'),
-                    match_data.get('toss_winner', ''),
-                    match_data.get('toss_decision', '')
-                ))
-            
-            return match_id
+            cur.execute(sql, params)
+            return cur.fetchall()
         except Error as e:
-            print(f"[ERROR] Error inserting match: {e}")
-            return None
+            print(f"[ERROR] Error reading scorecard watermarks: {e}")
+            return []
         finally:
             cur.close()
     
-    def insert_batting_data(self, batting_records):
-        """Insert batting data"""
-        if not batting_records:
-            return 0
+    def mark_scorecards_ingested(self, watermarks):
+        """Record the match status each scorecard was ingested at.
         
-        cur = self.conn.cursor()
-        inserted = 0
+        `watermarks` is a list of (match_id, match_status) pairs.
+        """
+        if not watermarks:
+            return 0
+        cur = self._cursor()
         try:
-            for record in batting_records:
-                # Check if record exists
-                check_sql = """
-                SELECT batting_id FROM batting_data 
-                WHERE match_id = %s AND player_id = %s AND innings_no = %s
-                """
-                cur.execute(check_sql, (record[0], record[1], record[8]))
-                existing = cur.fetchone()
-                
-                if existing:
-                    # Update existing
-                    update_sql = """
-                    UPDATE batting_data SET 
-                        runs = %s, balls = %s, strike_rate = %s, dismissal = %s, team = %s
-                    WHERE batting_id = %s
-                    """
-                    cur.execute(update_sql, (record[3], record[4], record[5], record[6], record[7], existing[0]))
-                else:
-                    # Insert new
-                    insert_sql = """
-                    INSERT INTO batting_data (match_id, player_id, player_name, runs, balls, strike_rate, dismissal, team, innings_no)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    """
-                    cur.execute(insert_sql, record)
-                    inserted += 1
-            return inserted
+            cur.executemany("""
+                UPDATE combined_matches
+                SET scorecard_ingested_at = NOW(), scorecard_status = %s
+                WHERE match_id = %s
+            """, [(status, match_id) for match_id, status in watermarks])
+            return len(watermarks)
         except Error as e:
-            print(f"[ERROR] Error inserting batting data: {e}")
+            if self._in_transaction:
+                raise
+            print(f"[ERROR] Error updating scorecard watermarks: {e}")
             return 0
         finally:
             cur.close()
     
-    def insert_bowling_data(self, bowling_records):
-        """Insert bowling data"""
-        if not bowling_records:
-            return 0
+    def _select_in(self, sql_prefix, values):
+        """Run `sql_prefix IN (...)` for a list of values and return all rows"""
+        if not values:
+            return []
+        placeholders = ", ".join(["%s"] * len(values))
+        cur = self._cursor()
+        try:
+            cur.execute(f"{sql_prefix} IN ({placeholders})", list(values))
+            return cur.fetchall()
+        except Error as e:
+            print(f"[ERROR] Error running lookup: {e}")
+            return []
+        finally:
+            cur.close()
+    
+    def get_match_hashes(self, cricbuzz_ids):
+        """Return {cricbuzz_match_id: payload_hash} for matches already stored"""
+        rows = self._select_in(
+            "SELECT cricbuzz_match_id, payload_hash FROM combined_matches WHERE cricbuzz_match_id",
+            sorted({int(cb_id) for cb_id in cricbuzz_ids})
+        )
+        return {cb_id: payload_hash for cb_id, payload_hash in rows}
+    
+    def get_players_with_details(self, cricbuzz_ids):
+        """Return the subset of Cricbuzz player ids whose profile (role) is already stored"""
+        rows = self._select_in(
+            "SELECT cricbuzz_player_id FROM players "
+            "WHERE COALESCE(playing_role, '') <> '' AND cricbuzz_player_id",
+            sorted({int(cb_id) for cb_id in cricbuzz_ids})
+        )
+        return {row[0] for row in rows}
+    
+    def get_match_context(self, match_ids):
+        """Return {match_id: (format, venue, match_date)} for stored matches"""
+        rows = self._select_in(
+            "SELECT match_id, format, venue, match_date FROM combined_matches WHERE match_id",
+            sorted(set(match_ids))
+        )
+        return {match_id: (match_format or '', venue or '', match_date)
+                for match_id, match_format, venue, match_date in rows}
+    
+    def get_innings_hashes(self, match_ids):
+        """Return {(match_id, innings_no): payload_hash} for stored scorecard innings"""
+        rows = self._select_in(
+            "SELECT match_id, innings_no, payload_hash FROM scorecard_innings_hashes WHERE match_id",
+            sorted(set(match_ids))
+        )
+        return {(match_id, innings_no): payload_hash for match_id, innings_no, payload_hash in rows}
+    
+    def save_innings_hashes(self, hashes):
+        """Store fingerprints for innings written in this run as (match_id, innings_no, hash) rows."""
+        if not hashes:
+            return 0, 0
+        return self._bulk_upsert(
+            "scorecard_innings_hashes",
+            ["match_id", "innings_no", "payload_hash"],
+            ["match_id", "innings_no"],
+            ["payload_hash"],
+            hashes,
+            self.bulk_batch_size
+        )
+    
+    def save_backfill_plan(self, series_rows):
+        """Register series for the backfill as (series_id, name, type, year) rows.
+        
+        New series start as 'pending'; series planned by an earlier run keep
+        their status, so planning again never repeats finished work.
+        """
+        if not series_rows:
+            return 0, 0
+        return self._bulk_upsert(
+            "backfill_checkpoints",
+            ["series_id", "series_name", "series_type", "series_year"],
+            ["series_id"],
+            ["series_name"],
+            series_rows,
+            self.bulk_batch_size
+        )
+    
+    def get_backfill_series(self, years, series_types):
+        """Return (series_id, series_name) for planned series that are not done yet.
+        
+        'running' rows were left behind by an interrupted run and are picked up
+        again, as are 'failed' ones.
+        """
+        years = sorted({int(year) for year in years})
+        series_types = sorted(set(series_types))
+        if not years or not series_types:
+            return []
+        cur = self._cursor()
+        try:
+            cur.execute(f"""
+                SELECT series_id, series_name
+                FROM backfill_checkpoints
+                WHERE status <> 'done'
+                  AND series_year IN ({', '.join(['%s'] * len(years))})
+                  AND series_type IN ({', '.join(['%s'] * len(series_types))})
+                ORDER BY series_year DESC, series_id
+            """, years + series_types)
+            return cur.fetchall()
+        except Error as e:
+            print(f"[ERROR] Error reading backfill checkpoints: {e}")
+            return []
+        finally:
+            cur.close()
+    
+    def update_backfill_checkpoint(self, series_id, status, matches_total=None,
+                                   matches_done=None, error=None, worker=None):
+        """Move one series to 'running', 'done' or 'failed' and record its progress"""
+        cur = self._cursor()
+        try:
+            cur.execute("""
+                UPDATE backfill_checkpoints
+                SET status = %s,
+                    matches_total = COALESCE(%s, matches_total),
+                    matches_done = COALESCE(%s, matches_done),
+                    last_error = %s,
+                    worker = COALESCE(%s, worker),
+                    attempts = attempts + %s
+                WHERE series_id = %s
+            """, (status, matches_total, matches_done, (str(error)[:500] if error else None),
+                  worker, 1 if status == "running" else 0, series_id))
+            return True
+        except Error as e:
+            print(f"[ERROR] Error updating backfill checkpoint for series {series_id}: {e}")
+            return False
+        finally:
+            cur.close()
+    
+    def get_backfill_progress(self):
+        """Return {status: (series, matches_total, matches_done)} over every planned series"""
+        cur = self._cursor()
+        try:
+            cur.execute("""
+                SELECT status, COUNT(*), COALESCE(SUM(matches_total), 0), COALESCE(SUM(matches_done), 0)
+                FROM backfill_checkpoints
+                GROUP BY status
+            """)
+            return {status: (int(series), int(total), int(done))
+                    for status, series, total, done in cur.fetchall()}
+        except Error as e:
+            print(f"[ERROR] Error reading backfill progress: {e}")
+            return {}
+        finally:
+            cur.close()
+    
+    def _bulk_upsert(self, table, columns, key_columns, update_columns, records, batch_size):
+        """Write records with multi-row INSERT ... ON DUPLICATE KEY UPDATE.
+        
+        Returns (inserted, updated) where updated counts existing rows whose
+        values actually changed. Each batch costs two statements: a keyed
+        COUNT of rows that already exist and the upsert itself. In bulk-load
+        mode, batches of at least `bulk_load_min_rows` go through
+        `_load_data_upsert` instead.
+        """
+        key_len = len(key_columns)
+        # Last record wins when the same key appears twice in one run
+        deduped = {}
+        for record in records:
+            deduped[tuple(record[:key_len])] = tuple(record)
+        rows = list(deduped.values())
+        
+        if self.bulk_load and len(rows) >= self.bulk_load_min_rows:
+            result = self._load_data_upsert(table, columns, key_columns, update_columns, rows)
+            if result is not None:
+                return result
+        
+        col_list = ", ".join(columns)
+        placeholders = ", ".join(["%s"] * len(columns))
+        updates = ", ".join(f"{col} = VALUES({col})" for col in update_columns)
+        upsert_sql = f"""
+        INSERT INTO {table} ({col_list})
+        VALUES ({placeholders})
+        ON DUPLICATE KEY UPDATE {updates}
+        """
+        key_tuple = "(" + ", ".join(["%s"] * key_len) + ")"
         
-        cur = self.conn.cursor()
         inserted = 0
+        updated = 0
+        cur = self._cursor()
         try:
-            for record in bowling_records:
-                # Check if record exists
-                check_sql = """
-                SELECT bowling_id FROM bowling_data 
-                WHERE match_id = %s AND player_id = %s
-                """
-                cur.execute(check_sql, (record[0], record[1]))
-                existing = cur.fetchone()
+            for start in range(0, len(rows), batch_size):
+                chunk = rows[start:start + batch_size]
+                count_sql = (
+                    f"SELECT COUNT(*) FROM {table} "
+                    f"WHERE ({', '.join(key_columns)}) IN ({', '.join([key_tuple] * len(chunk))})"
+                )
+                cur.execute(count_sql, [value for row in chunk for value in row[:key_len]])
+                existing = cur.fetchone()[0]
                 
-                if existing:
-                    # Update existing
-                    update_sql = """
-                    UPDATE bowling_data SET 
-                        overs = %s, runs_conceded = %s, wickets = %s, economy_rate = %s, format = %s
-                    WHERE bowling_id = %s
-                    """
-                    cur.execute(update_sql, (record[3], record[4], record[5], record[6], record[7], existing[0]))
-                else:
-                    # Insert new
-                    insert_sql = """
-                    INSERT INTO bowling_data (match_id, player_id, player_name, overs, runs_conceded, wickets, economy_rate, format)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                    """
-                    cur.execute(insert_sql, record)
-                    inserted += 1
-            return inserted
+                cur.executemany(upsert_sql, chunk)
+                affected = cur.rowcount
+                batch_inserted = len(chunk) - existing
+                inserted += batch_inserted
+                # MySQL reports 1 per inserted row and 2 per changed row
+                updated += max(0, affected - batch_inserted) // 2
+            return inserted, updated
+        except Error as e:
+            if self._in_transaction:
+                raise
+            print(f"[ERROR] Error upserting into {table}: {e}")
+            return inserted, updated
+        finally:
+            cur.close()
+    
+    def _load_data_upsert(self, table, columns, key_columns, update_columns, rows):
+        """Upsert rows through a staging table loaded with LOAD DATA LOCAL INFILE.
+        
+        The rows are streamed to a temporary TSV file, loaded into a TEMPORARY
+        table holding just `columns` (private to this connection) and merged
+        into `table` with one set-based INSERT ... SELECT ... ON DUPLICATE KEY
+        UPDATE. Returns (inserted, updated) like `_bulk_upsert`, or None when
+        the client or server refuses LOCAL INFILE; bulk-load mode is then
+        switched off and the caller falls back to executemany.
+        """
+        staging = f"staging_{table}"
+        col_list = ", ".join(columns)
+        updates = ", ".join(f"{table}.{col} = s.{col}" for col in update_columns)
+        cur = self._cursor()
+        try:
+            # TEMPORARY tables do not commit an open transaction when created or dropped
+            cur.execute(f"DROP TEMPORARY TABLE IF EXISTS {staging}")
+            cur.execute(f"CREATE TEMPORARY TABLE {staging} SELECT {col_list} FROM {table} LIMIT 0")
+            with tsv_file(rows) as (path, count):
+                try:
+                    cur.execute(load_data_sql(staging, columns), (path,))
+                except Error as e:
+                    if e.errno not in LOCAL_INFILE_REFUSED:
+                        raise
+                    print(f"[WARNING] LOAD DATA LOCAL INFILE refused ({e}); "
+                          f"using multi-row inserts (enable local_infile on the server)")
+                    self.bulk_load = False
+                    return None
+            
+            cur.execute(f"SELECT COUNT(*) FROM {staging} JOIN {table} USING ({', '.join(key_columns)})")
+            existing = cur.fetchone()[0]
+            cur.execute(
+                f"INSERT INTO {table} ({col_list}) SELECT {col_list} FROM {staging} AS s "
+                f"ON DUPLICATE KEY UPDATE {updates}"
+            )
+            inserted = count - existing
+            # MySQL reports 1 per inserted row and 2 per changed row
+            return inserted, max(0, cur.rowcount - inserted) // 2
         except Error as e:
-            print(f"[ERROR] Error inserting bowling data: {e}")
+            if self._in_transaction:
+                raise
+            print(f"[ERROR] Error bulk loading into {table}: {e}")
+            return 0, 0
+        finally:
+            try:
+                cur.execute(f"DROP TEMPORARY TABLE IF EXISTS {staging}")
+            except Error:
+                pass
+            cur.close()
+    
+    def replace_match_rows(self, table, batch, batch_size=None):
+        """Replace all rows of `table` for the matches in a MatchReplaceBatch.
+        
+        For the scorecard-derived tables, which have no natural key to upsert
+        on: one DELETE for every match in the batch, then multi-row INSERTs of
+        the new rows (columns named after the record fields). Returns the
+        number of rows inserted.
+        """
+        match_ids = sorted(batch.match_ids)
+        if not match_ids:
+            return 0
+        columns = batch.rows.names
+        rows = batch.rows.params()
+        batch_size = batch_size or self.bulk_batch_size
+        insert_sql = (f"INSERT INTO {table} ({', '.join(columns)}) "
+                      f"VALUES ({', '.join(['%s'] * len(columns))})")
+        cur = self._cursor()
+        try:
+            cur.execute(f"DELETE FROM {table} WHERE match_id IN ({', '.join(['%s'] * len(match_ids))})",
+                        match_ids)
+            for start in range(0, len(rows), batch_size):
+                cur.executemany(insert_sql, rows[start:start + batch_size])
+            return len(rows)
+        except Error as e:
+            if self._in_transaction:
+                raise
+            print(f"[ERROR] Error replacing rows in {table}: {e}")
             return 0
         finally:
             cur.close()
+    
+    def upsert_batting_data(self, batting_records, batch_size=None):
+        """Bulk upsert BattingInnings keyed on unique_batting (match_id, player_id, innings_no).
+        
+        Accepts a ColumnBatch or any iterable of records. Returns (inserted, updated).
+        """
+        if not isinstance(batting_records, ColumnBatch):
+            batting_records = ColumnBatch(BattingInnings, batting_records)
+        if not len(batting_records):
+            return 0, 0
+        # (match_id, player_id, innings_no) first so the key is a prefix
+        columns = ["match_id", "player_id", "innings_no", "player_name", "runs", "balls",
+                   "strike_rate", "dismissal", "team"]
+        return self._bulk_upsert(
+            "batting_data",
+            columns,
+            ["match_id", "player_id", "innings_no"],
+            ["player_name", "runs", "balls", "strike_rate", "dismissal", "team"],
+            batting_records.params(columns),
+            batch_size or self.bulk_batch_size
+        )
+    
+    def upsert_bowling_data(self, bowling_records, batch_size=None):
+        """Bulk upsert BowlingSpells keyed on unique_bowling (match_id, player_id).
+        
+        Accepts a ColumnBatch or any iterable of records. Returns (inserted, updated).
+        """
+        if not isinstance(bowling_records, ColumnBatch):
+            bowling_records = ColumnBatch(BowlingSpell, bowling_records)
+        if not len(bowling_records):
+            return 0, 0
+        columns = ["match_id", "player_id", "player_name", "overs", "runs_conceded",
+                   "wickets", "economy_rate", "format"]
+        return self._bulk_upsert(
+            "bowling_data",
+            columns,
+            ["match_id", "player_id"],
+            ["player_name", "overs", "runs_conceded", "wickets", "economy_rate", "format"],
+            bowling_records.params(columns),
+            batch_size or self.bulk_batch_size
+        )
+
+
+def payload_fingerprint(payload):
+    """Stable SHA-1 of a JSON payload, independent of key order"""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
 
 
 def parse_match_data(api_match):
@@ -381,224 +839,742 @@ def parse_match_data(api_match):
             match_winner = parts[0].strip()
             win_margin = parts[1].strip()
     
-    return {
-        'match_desc': match_info.get('matchDesc', ''),
-        'team1': team1.get('teamName', ''),
-        'team2': team2.get('teamName', ''),
-        'venue': venue_info.get('ground', ''),
-        'venue_city': venue_info.get('city', ''),
-        'start_date': start_date,
-        'status': status,
-        'state': match_info.get('stateTitle', ''),
-        'match_winner': match_winner,
-        'win_margin': win_margin,
-        'format': match_info.get('matchFormat', ''),
-        'toss_winner': match_info.get('tossResults', {}).get('tossWinnerName', ''),
-        'toss_decision': match_info.get('tossResults', {}).get('decision', '')
-    }
+    cricbuzz_id = match_info.get('matchId')
+    return Match(
+        cricbuzz_match_id=int(cricbuzz_id) if cricbuzz_id else None,
+        match_desc=match_info.get('matchDesc', ''),
+        team1=team1.get('teamName', ''),
+        team2=team2.get('teamName', ''),
+        venue=venue_info.get('ground', ''),
+        venue_city=venue_info.get('city', ''),
+        start_date=start_date,
+        status=status,
+        state=match_info.get('stateTitle', ''),
+        match_winner=match_winner,
+        win_margin=win_margin,
+        format=match_info.get('matchFormat', ''),
+        toss_winner=match_info.get('tossResults', {}).get('tossWinnerName', ''),
+        toss_decision=match_info.get('tossResults', {}).get('decision', ''),
+        match_state=match_info.get('state', '')
+    )
 
 
-def fetch_and_store_matches(api_client, db_manager):
-    """Fetch matches from API and store in database"""
-    print("\n[INFO] Fetching live matches from API...")
-    live_data = api_client.get_live_matches()
+def retry_dead_letters(api_client):
+    """Replay calls that failed transiently in earlier runs before anything else.
     
-    if not live_data:
-        print("[WARNING] No live matches data received")
+    Successful replays land in the response cache, so the regular stages that
+    follow pick them up without another request. Calls that fail again are
+    dead-lettered again by the client.
+    """
+    async_client = as_async_client(api_client)
+    entries = async_client.api_client.dead_letters.drain()
+    if not entries:
         return
+    print(f"\n[INFO] Retrying {len(entries)} calls that failed in earlier runs...")
+    
+    by_method = {}
+    for entry in entries:
+        if entry["method"] in CricbuzzAPIClient.DEAD_LETTER_METHODS and entry["args"]:
+            by_method.setdefault(entry["method"], []).append(entry["args"][0])
     
-    matches_count = 0
-    for type_match in live_data.get('typeMatches', []):
+    recovered = 0
+    for method, args in by_method.items():
+        results = async_client.run(method, args)
+        recovered += sum(1 for result in results if result)
+    print(f"[OK] Recovered {recovered} of {len(entries)} dead-lettered calls")
+
+
+def iter_feed_matches(feed):
+    """Yield raw match entries from a /matches/v1/live or /recent payload"""
+    for type_match in (feed or {}).get('typeMatches', []):
         for series in type_match.get('seriesMatches', []):
             series_info = series.get('seriesAdWrapper', {})
-            matches = series_info.get('matches', [])
-            
-            for match in matches:
-                match_data = parse_match_data(match)
-                match_id = db_manager.insert_match(match_data)
-                if match_id:
-                    matches_count += 1
-                    print(f"[OK] Inserted match: {match_data['team1']} vs {match_data['team2']}")
+            for match in series_info.get('matches', []):
+                yield match
+
+
+def iter_series(archive):
+    """Yield {'id', 'name', 'startDt', 'endDt'} entries from a /series/v1/archives payload"""
+    for month in (archive or {}).get('seriesMapProto', []):
+        for series in month.get('series', []):
+            if series.get('id'):
+                yield series
+
+
+def iter_series_matches(payload):
+    """Yield raw match entries from a /series/v1/{series_id} payload"""
+    for detail in (payload or {}).get('matchDetails', []):
+        for match in detail.get('matchDetailsMap', {}).get('match', []):
+            yield match
+
+
+def column_match_ids(batch):
+    """Match ids of the records in a ColumnBatch"""
+    return set(batch.columns["match_id"])
+
+
+def new_write_buffer(db_manager, batch_size=None, flush_interval=None, metrics=None):
+    """Create the write-behind buffer shared by the ingestion stages.
+    
+    Tables flush in dependency order: matches, players, batting, bowling, the
+    tables derived from whole scorecards, innings fingerprints and finally the
+    scorecard watermarks.
+    """
+    if batch_size is None:
+        batch_size = int(os.getenv("INGEST_BATCH_SIZE") or 5000)
+    if flush_interval is None:
+        flush_interval = float(os.getenv("INGEST_FLUSH_INTERVAL") or 5)
+    buffer = WriteBuffer(db_manager, batch_size, flush_interval, metrics or PipelineMetrics())
+    buffer.register("matches", db_manager.upsert_matches, partial(ColumnBatch, Match))
+    buffer.register("players", db_manager.upsert_players)
+    buffer.register("batting_data", db_manager.upsert_batting_data,
+                    partial(ColumnBatch, BattingInnings), match_ids=column_match_ids)
+    buffer.register("bowling_data", db_manager.upsert_bowling_data,
+                    partial(ColumnBatch, BowlingSpell), match_ids=column_match_ids)
+    for table, record_type in DERIVED_TABLES:
+        buffer.register(table, partial(db_manager.replace_match_rows, table),
+                        partial(MatchReplaceBatch, record_type),
+                        match_ids=lambda batch: batch.match_ids)
+    # Fingerprints and watermarks mark matches done; a match with lost rows keeps neither
+    buffer.register("scorecard_innings_hashes", db_manager.save_innings_hashes, progress=True)
+    buffer.register("scorecard_watermarks", db_manager.mark_scorecards_ingested, progress=True)
+    return buffer
+
+
+def parse_changed_matches(db_manager, feed, metrics=None, iter_matches=iter_feed_matches):
+    """Parse only the matches in a feed whose payload differs from what is stored.
     
-    print(f"[OK] Total matches inserted: {matches_count}")
+    `iter_matches` extracts the match entries (iter_series_matches for a
+    series payload). Returns (changed_matches, skipped_count).
+    """
+    metrics = metrics or PipelineMetrics()
+    with metrics.stage("parse") as counter:
+        raw_matches = list(iter_matches(feed))
+        stored_hashes = db_manager.get_match_hashes(
+            m.get('matchInfo', {}).get('matchId') for m in raw_matches
+            if m.get('matchInfo', {}).get('matchId')
+        )
+        
+        changed = []
+        skipped = 0
+        for match in raw_matches:
+            fingerprint = payload_fingerprint(match)
+            cricbuzz_id = match.get('matchInfo', {}).get('matchId')
+            if cricbuzz_id and stored_hashes.get(int(cricbuzz_id)) == fingerprint:
+                skipped += 1
+                continue
+            match_data = parse_match_data(match)
+            match_data.payload_hash = fingerprint
+            changed.append(match_data)
+        counter.count(len(raw_matches))
+    return changed, skipped
+
+
+def store_match_feed(db_manager, feed, buffer=None, iter_matches=iter_feed_matches):
+    """Upsert the changed matches of one feed. Returns (changed_matches, skipped_count)."""
+    buffer = buffer or new_write_buffer(db_manager)
+    matches, skipped = parse_changed_matches(db_manager, feed, buffer.metrics, iter_matches)
+    buffer.add("matches", matches)
+    # Scorecard watermarks are read back from combined_matches, so write matches now
+    buffer.flush()
+    return matches, skipped
+
+
+def fetch_and_store_matches(api_client, db_manager, buffer=None):
+    """Fetch matches from API and store in database"""
+    buffer = buffer or new_write_buffer(db_manager)
     
-    # Also fetch recent matches
-    print("\n[INFO] Fetching recent matches from API...")
-    recent_data = api_client.get_recent_matches()
+    print("\n[INFO] Fetching live and recent matches from API...")
+    with buffer.metrics.stage("fetch") as counter:
+        live_data = api_client.get_live_matches()
+        recent_data = api_client.get_recent_matches()
+        counter.count(sum(1 for feed in (live_data, recent_data) if feed))
+    
+    if live_data:
+        live_matches, skipped = parse_changed_matches(db_manager, live_data, buffer.metrics)
+        buffer.add("matches", live_matches)
+        for match_data in live_matches:
+            print(f"[OK] Live match: {match_data.team1} vs {match_data.team2}")
+        print(f"[OK] Live matches changed: {len(live_matches)} (skipped {skipped} unchanged)")
+    else:
+        print("[WARNING] No live matches data received")
     
     if recent_data:
-        recent_count = 0
-        for type_match in recent_data.get('typeMatches', []):
-            for series in type_match.get('seriesMatches', []):
-                series_info = series.get('seriesAdWrapper', {})
-                matches = series_info.get('matches', [])
-                
-                for match in matches:
-                    match_data = parse_match_data(match)
-                    match_id = db_manager.insert_match(match_data)
-                    if match_id:
-                        recent_count += 1
-        
-        print(f"[OK] Total recent matches inserted: {recent_count}")
+        recent_matches, skipped = parse_changed_matches(db_manager, recent_data, buffer.metrics)
+        buffer.add("matches", recent_matches)
+        print(f"[OK] Recent matches changed: {len(recent_matches)} (skipped {skipped} unchanged)")
+    
+    # Scorecard watermarks are read back from combined_matches, so write matches now
+    buffer.flush()
 
 
-def fetch_and_store_players(api_client, db_manager):
-    """Fetch popular players and store in database"""
-    print("\n[INFO] Fetching player data from API...")
+def fetch_and_store_players(api_client, db_manager, discovered, buffer=None, seen=None):
+    """Fetch profiles for players seen in scorecards that the database has no details for.
     
-    # List of popular players to fetch
-    popular_players = [
-        "Virat Kohli", "Rohit Sharma", "MS Dhoni", "Jasprit Bumrah",
-        "Ravindra Jadeja", "Steve Smith", "Pat Cummins", "Ben Stokes",
-        "Kane Williamson", "Babar Azam", "Joe Root", "David Warner"
-    ]
+    `discovered` maps Cricbuzz player id -> scorecard name. Ids whose profile
+    is already stored, or that were already looked up by this process (pass
+    the same `seen` set across daemon cycles), cost no API call; the rest are
+    fetched concurrently, and the responses are cached for a day.
+    """
+    buffer = buffer or new_write_buffer(db_manager)
+    seen = seen if seen is not None else set()
     
-    players_inserted = 0
-    for player_name in popular_players:
-        try:
-            search_results = api_client.search_players(player_name)
-            if search_results and 'player' in search_results:
-                for player in search_results['player'][:1]:  # Take first result
-                    player_id = player.get('id')
-                    if player_id:
-                        # Get full player details
-                        player_details = api_client.get_player_details(player_id)
-                        if player_details:
-                            player_data = {
-                                'name': player.get('name', ''),
-                                'full_name': player_details.get('name', player.get('name', '')),
-                                'country': player.get('teamName', ''),
-                                'playing_role': player_details.get('role', ''),
-                                'batting_style': player_details.get('bat', ''),
-                                'bowling_style': player_details.get('bowl', ''),
-                                'total_runs': 0,  # Will be updated from stats
-                                'total_wickets': 0
-                            }
-                            
-                            db_id = db_manager.insert_or_update_player(player_data)
-                            if db_id:
-                                players_inserted += 1
-                                print(f"[OK] Inserted/Updated player: {player_data['name']}")
-                        
-                        # Rate limiting
-                        time.sleep(0.5)
-        except Exception as e:
-            print(f"[ERROR] Error fetching player {player_name}: {e}")
-            continue
+    candidate_ids = sorted(set(discovered) - seen)
+    if not candidate_ids:
+        return 0
+    have_details = db_manager.get_players_with_details(candidate_ids)
+    missing_ids = [cb_id for cb_id in candidate_ids if cb_id not in have_details]
+    seen.update(candidate_ids)
+    if not missing_ids:
+        return 0
+    
+    print(f"\n[INFO] Fetching profiles for {len(missing_ids)} new players from API...")
+    async_client = as_async_client(api_client)
+    with buffer.metrics.stage("fetch") as counter:
+        details_list = async_client.run("get_player_details", missing_ids)
+        counter.count(sum(1 for details in details_list if details))
     
-    print(f"[OK] Total players inserted/updated: {players_inserted}")
+    players = []
+    with buffer.metrics.stage("parse") as counter:
+        for cb_id, player_details in zip(missing_ids, details_list):
+            if not player_details:
+                continue
+            players.append({
+                'name': discovered.get(cb_id) or player_details.get('name', ''),
+                'full_name': player_details.get('name', discovered.get(cb_id, '')),
+                'country': player_details.get('intlTeam', ''),
+                'playing_role': player_details.get('role', ''),
+                'batting_style': player_details.get('bat', ''),
+                'bowling_style': player_details.get('bowl', ''),
+                'total_runs': 0,  # Will be updated from stats
+                'total_wickets': 0,
+                'cricbuzz_player_id': cb_id
+            })
+        counter.count(len(players))
+    
+    inserted_before, updated_before = buffer.results.get("players") or (0, 0)
+    buffer.add("players", players)
+    buffer.flush()
+    inserted, updated = buffer.results.get("players") or (0, 0)
+    written = inserted - inserted_before + updated - updated_before
+    print(f"[OK] Player profiles inserted/updated: {written} "
+          f"({len(candidate_ids) - len(missing_ids)} already known)")
+    return written
 
 
-def fetch_and_store_scorecards(api_client, db_manager):
-    """Fetch scorecards for matches and store batting/bowling data"""
+def fetch_and_store_scorecards(api_client, db_manager, max_matches=None, buffer=None,
+                               cricbuzz_ids=None):
+    """Fetch new or changed scorecards and store batting/bowling data.
+    
+    `cricbuzz_ids` limits the run to those matches (the backfill passes one
+    series at a time). Returns {cricbuzz_player_id: name} for every player in
+    the changed innings, for fetch_and_store_players to complete their profiles.
+    """
+    buffer = buffer or new_write_buffer(db_manager)
+    metrics = buffer.metrics
     print("\n[INFO] Fetching scorecard data from API...")
     
-    # Get match IDs from database
-    cur = db_manager.conn.cursor()
-    cur.execute("SELECT match_id FROM combined_matches LIMIT 10")
-    match_ids = [row[0] for row in cur.fetchall()]
-    cur.close()
+    # Only matches never ingested or whose status moved on since the last run
+    pending = db_manager.get_pending_scorecards(limit=max_matches, cricbuzz_ids=cricbuzz_ids)
     
-    if not match_ids:
-        print("[WARNING] No matches found in database to fetch scorecards")
-        return
+    if not pending:
+        print("[OK] All stored scorecards are up to date")
+        return {}
+    print(f"[INFO] {len(pending)} scorecards are new or changed")
     
-    batting_records = []
-    bowling_records = []
+    match_ids = [match_id for match_id, _, _ in pending]
     
-    for match_id in match_ids[:5]:  # Limit to 5 to avoid rate limits
+    # Download all scorecards concurrently before touching the database. A
+    # cached in-progress scorecard may predate the status the watermark will
+    # record, so only finished ones are taken from the cache.
+    async_client = as_async_client(api_client)
+    with metrics.stage("fetch") as counter:
+        scorecards = async_client.run("get_fresh_scorecard", [str(cb_id) for _, cb_id, _ in pending])
+        counter.count(sum(1 for scorecard in scorecards if scorecard))
+    
+    # Fingerprint each innings and keep only those that differ from the last write
+    with metrics.stage("parse") as counter:
+        stored_hashes = db_manager.get_innings_hashes(match_ids)
+        changed_innings = []
+        changed_scorecards = {}
+        skipped_innings = 0
+        for match_id, scorecard in zip(match_ids, scorecards):
+            for innings in (scorecard or {}).get('scorecard', []):
+                counter.count()
+                fingerprint = payload_fingerprint(innings)
+                if stored_hashes.get((match_id, innings.get('inningsId', 1))) == fingerprint:
+                    skipped_innings += 1
+                    continue
+                changed_innings.append((match_id, innings, fingerprint))
+                changed_scorecards[match_id] = scorecard
+    if skipped_innings:
+        print(f"[INFO] Skipped {skipped_innings} unchanged innings")
+    
+    # Load the players table once; every name lookup below is in memory
+    resolver = PlayerResolver(db_manager.conn, telemetry=db_manager.telemetry,
+                              on_write=db_manager._table_written)
+    with metrics.stage("resolve") as counter:
+        if changed_innings:
+            known_players = resolver.load()
+            print(f"[INFO] Indexed {known_players} known players")
+        
+        # First pass: queue every player we have never seen, then write them in one batch.
+        # Whole scorecards are walked because the derived tables are rebuilt per match.
+        discovered = {}
+        entries = (
+            entry
+            for scorecard in changed_scorecards.values()
+            for innings in scorecard.get('scorecard', [])
+            for entry in innings.get('batsman', []) + innings.get('bowler', [])
+        )
+        for entry in entries:
+            resolver.resolve_or_add(entry.get('name', ''), entry.get('id'))
+            counter.count()
+            if str(entry.get('id') or '').isdigit():
+                discovered.setdefault(int(entry['id']), entry.get('name', ''))
         try:
-            scorecard = api_client.get_scorecard(str(match_id))
-            if not scorecard or 'scorecard' not in scorecard:
-                continue
-            
-            for innings in scorecard.get('scorecard', []):
-                innings_no = innings.get('inningsId', 1)
-                team_name = innings.get('batteamname', '')
-                
-                # Process batting data
-                for batsman in innings.get('batsman', []):
-                    # Find player in database
-                    cur = db_manager.conn.cursor()
-                    cur.execute("SELECT player_id FROM players WHERE name LIKE %s LIMIT 1", 
-                              (f"%{batsman.get('name', '')}%",))
-                    player_row = cur.fetchone()
-                    player_id = player_row[0] if player_row else None
-                    cur.close()
+            with db_manager.transaction():
+                added = resolver.flush()
+        except Error:
+            # Rows of unknown players would be dropped, so leave these scorecards for the next run
+            print("[ERROR] New players could not be saved; scorecards will be processed next run")
+            return discovered
+    if added:
+        print(f"[OK] Added {added} new players found in scorecards")
+    
+    # Second pass, one match at a time: batting/bowling rows for the changed
+    # innings plus the derived tables rebuilt from the whole scorecard go to the
+    # write buffer (which flushes whenever a batch fills up). Fingerprints are
+    # added last, so no flush records an innings before the rows built from it.
+    context = db_manager.get_match_context(list(changed_scorecards))
+    innings_by_match = {}
+    for match_id, innings, fingerprint in changed_innings:
+        innings_by_match.setdefault(match_id, []).append((innings, fingerprint))
+    
+    failed = set()
+    for match_id, match_innings in innings_by_match.items():
+        match_format, venue, match_date = context.get(match_id, ('', '', None))
+        try:
+            with metrics.stage("resolve") as counter:
+                batting_records = []
+                bowling_records = []
+                hashes = []
+                for innings, fingerprint in match_innings:
+                    innings_no = innings.get('inningsId', 1)
+                    team_name = innings.get('batteamname', '')
                     
-                    if player_id:
-                        batting_records.append((
-                            match_id,
-                            player_id,
-                            batsman.get('name', ''),
-                            batsman.get('runs', 0),
-                            batsman.get('balls', 0),
-                            batsman.get('strkrate', 0.0),
-                            batsman.get('outdec', ''),
-                            team_name,
-                            innings_no
-                        ))
-                
-                # Process bowling data
-                for bowler in innings.get('bowler', []):
-                    cur = db_manager.conn.cursor()
-                    cur.execute("SELECT player_id FROM players WHERE name LIKE %s LIMIT 1",
-                              (f"%{bowler.get('name', '')}%",))
-                    player_row = cur.fetchone()
-                    player_id = player_row[0] if player_row else None
-                    cur.close()
+                    # Process batting data
+                    for batsman in innings.get('batsman', []):
+                        player_id = resolver.resolve(batsman.get('name', ''), batsman.get('id'))
+                        
+                        if player_id:
+                            batting_records.append(BattingInnings.from_api(
+                                match_id, player_id, batsman, team_name, innings_no
+                            ))
                     
-                    if player_id:
-                        bowling_records.append((
-                            match_id,
-                            player_id,
-                            bowler.get('name', ''),
-                            float(bowler.get('overs', 0)),
-                            bowler.get('runs', 0),
-                            bowler.get('wickets', 0),
-                            float(bowler.get('economy', 0.0)),
-                            'ODI'  # Default format
-                        ))
-            
-            time.sleep(1)  # Rate limiting
-            
+                    # Process bowling data
+                    for bowler in innings.get('bowler', []):
+                        player_id = resolver.resolve(bowler.get('name', ''), bowler.get('id'))
+                        
+                        if player_id:
+                            bowling_records.append(BowlingSpell.from_api(
+                                match_id, player_id, bowler, match_format or 'ODI'
+                            ))
+                    
+                    hashes.append((match_id, innings_no, fingerprint))
+                
+                # Partnerships, fielding, dated batting and venue bowling in one pass
+                derived = derive_match_tables(match_id, changed_scorecards[match_id], resolver.resolve,
+                                              match_format, venue, match_date)
+                counter.count(len(batting_records) + len(bowling_records)
+                              + sum(len(records) for records in derived.values()))
         except Exception as e:
-            print(f"[ERROR] Error fetching scorecard for match {match_id}: {e}")
+            print(f"[ERROR] Error processing scorecard for match {match_id}: {e}")
+            failed.add(match_id)
             continue
+        
+        buffer.add("batting_data", batting_records)
+        buffer.add("bowling_data", bowling_records)
+        for table, records in derived.items():
+            buffer.add(table, [(match_id, records)])
+        # Remember what was written so identical innings are skipped next time
+        buffer.add("scorecard_innings_hashes", hashes)
+    
+    # Persist Cricbuzz ids learned from name matches; they are learned again next
+    # run if this fails, so the scorecards themselves still count as processed
+    try:
+        with db_manager.transaction():
+            resolver.flush()
+    except Error:
+        print("[WARNING] Cricbuzz ids learned from name matches were not saved")
+    
+    # Advance the watermark only for scorecards we received and processed
+    # without error, so failed matches are retried; the buffer writes it after
+    # the rows it covers
+    buffer.add("scorecard_watermarks", [
+        (match_id, status)
+        for (match_id, _, status), scorecard in zip(pending, scorecards)
+        if scorecard and 'scorecard' in scorecard and match_id not in failed
+    ])
+    buffer.flush()
+    return discovered
+
+
+def print_pipeline_report(buffer):
+    """Print per-stage throughput and per-table write totals for a run"""
+    print("\n[INFO] Pipeline throughput:")
+    for line in buffer.metrics.report():
+        print(f"   {line}")
+    for table, result in buffer.results.items():
+        if isinstance(result, tuple):
+            print(f"[OK] {table}: {result[0]} inserted, {result[1]} updated")
+        else:
+            print(f"[OK] {table}: {result} rows written")
+    print(f"[INFO] {buffer.flushes} flushes, {buffer.failed_flushes} rolled back")
+
+
+# Cumulative counters in the stats() of the retry policy, response cache,
+# rate limiter and HTTP pool; everything else there is a current value
+RUN_COUNTERS = {
+    "retries": ("requests", "retries"),
+    "cache": ("hits", "misses", "writes", "evictions", "errors"),
+    "rate_limiter": ("tokens_used", "wait_time", "throttled_calls", "rate_limited_responses"),
+    "http_pool": ("connections_opened", "requests_sent"),
+}
+
+
+def run_counters(api_client):
+    """Process-wide counters as they stand now, for a run report to count from.
+    
+    Telemetry, retries, cache and limiter counters live as long as the process,
+    which for a fetch started from the Home page is the Streamlit server.
+    """
+    transport = api_client.transport
+    return {
+        "telemetry": get_telemetry().checkpoint(),
+        "retries": transport.retry_policy.stats(),
+        "cache": api_client.cache.stats(),
+        "rate_limiter": api_client.limiter.stats()["totals"],
+        "http_pool": transport.connection_stats(),
+    }
+
+
+def counters_since(section, current, baseline):
+    """`current` stats of a RUN_COUNTERS section with the `baseline` values subtracted"""
+    if not baseline:
+        return current
+    delta = dict(current)
+    for key in RUN_COUNTERS[section]:
+        if key in current:
+            delta[key] = round(current[key] - baseline.get(key, 0), 3)
+    return delta
+
+
+def build_run_report(api_client, buffer, started_at, mode="run", baseline=None):
+    """Collect pipeline, API, database, retry and cache telemetry for one run.
+    
+    `baseline` (from run_counters() when the run started) limits the report to
+    what happened since. Returns (report_dict, prometheus_lines).
+    """
+    transport = api_client.transport
+    baseline = baseline or {}
+    since = baseline.get("telemetry")
+    telemetry = get_telemetry().snapshot(since=since)
+    current = run_counters(api_client)
+    counters = {section: counters_since(section, current[section], baseline.get(section))
+                for section in RUN_COUNTERS}
+    counters["http_pool"]["connections_reused"] = max(
+        0, counters["http_pool"]["requests_sent"] - counters["http_pool"]["connections_opened"])
+    pipeline = buffer.metrics.as_dict()
+    for table, stats in pipeline["tables"].items():
+        result = buffer.results.get(table)
+        if isinstance(result, tuple):
+            stats["inserted"], stats["updated"] = result[0], result[1]
+    finished_at = time.time()
+    
+    report = {
+        "mode": mode,
+        "started_at": datetime.fromtimestamp(started_at).isoformat(timespec="seconds"),
+        "finished_at": datetime.fromtimestamp(finished_at).isoformat(timespec="seconds"),
+        "duration_seconds": round(finished_at - started_at, 2),
+        "stages": pipeline["stages"],
+        "tables": pipeline["tables"],
+        "flushes": buffer.flushes,
+        "failed_flushes": buffer.failed_flushes,
+        "api": telemetry["api"],
+        "db": telemetry["db"],
+        "retries": counters["retries"],
+        "dead_letters": len(api_client.dead_letters),
+        "cache": counters["cache"],
+        "rate_limiter": counters["rate_limiter"],
+        "http_pool": counters["http_pool"],
+    }
+    
+    lines = get_telemetry().prometheus_histograms(since=since)
+    lines += prometheus_gauges(
+        "cricbuzz_ingest_stage_seconds", "Wall time spent per pipeline stage",
+        [({"stage": name}, s["seconds"]) for name, s in report["stages"].items()])
+    lines += prometheus_gauges(
+        "cricbuzz_ingest_stage_items", "Items handled per pipeline stage",
+        [({"stage": name}, s["items"]) for name, s in report["stages"].items()])
+    lines += prometheus_gauges(
+        "cricbuzz_ingest_table_rows", "Rows flushed per table",
+        [({"table": name}, s["items"]) for name, s in report["tables"].items()])
+    lines += prometheus_gauges(
+        "cricbuzz_ingest_table_rows_per_second", "Flush throughput per table",
+        [({"table": name}, s["per_second"]) for name, s in report["tables"].items()])
+    lines += prometheus_gauges(
+        "cricbuzz_api_cache_lookups", "Response cache lookups per endpoint",
+        [({"endpoint": endpoint, "result": result}, count)
+         for endpoint, counts in telemetry["cache"].items() for result, count in counts.items()])
+    lines += prometheus_gauges(
+        "cricbuzz_api_retries", "Retried API attempts per endpoint",
+        [({"endpoint": endpoint}, api["retries"]) for endpoint, api in telemetry["api"].items()])
+    lines += prometheus_gauges(
+        "cricbuzz_api_dead_letters", "Calls queued for replay on the next run",
+        [({}, report["dead_letters"])])
+    lines += prometheus_gauges(
+        "cricbuzz_ingest_last_run_timestamp_seconds", "When the last run finished",
+        [({"mode": mode}, round(finished_at, 3))])
+    lines += prometheus_gauges(
+        "cricbuzz_ingest_last_run_duration_seconds", "How long the last run took",
+        [({"mode": mode}, report["duration_seconds"])])
+    return report, lines
+
+
+def write_run_report(api_client, buffer, started_at, mode="run", baseline=None):
+    """Write the JSON run report and Prometheus metrics file; returns the report"""
+    report, lines = build_run_report(api_client, buffer, started_at, mode, baseline)
+    try:
+        json_path, prom_path = write_report(report, lines)
+        print(f"[INFO] Run report: {json_path}, metrics: {prom_path}")
+    except OSError as e:
+        print(f"[WARNING] Could not write run report: {e}")
+    return report
+
+
+# Match states reported by Cricbuzz in matchInfo.state
+COMPLETED_MATCH_STATES = {"complete", "abandon", "abandoned", "no result", "cancelled"}
+SCHEDULED_MATCH_STATES = {"preview", "upcoming", "stumps", "delay"}
+
+
+def classify_match_state(state):
+    """Map a Cricbuzz match state to 'live', 'scheduled' or 'complete'"""
+    state = (state or "").strip().lower()
+    if state in COMPLETED_MATCH_STATES:
+        return "complete"
+    if state in SCHEDULED_MATCH_STATES:
+        return "scheduled"
+    return "live"
+
+
+class IngestionDaemon:
+    """Long-running poller for /matches/v1/live.
+    
+    Reuses one database connection and the process-wide HTTP pool across
+    cycles. The sleep between cycles follows the most active match in the
+    feed: short while anything is in progress, long when matches are only
+    scheduled, and the idle interval when everything is complete.
+    """
     
-    # Bulk insert batting and bowling data
-    if batting_records:
-        count = db_manager.insert_batting_data(batting_records)
-        print(f"[OK] Inserted {count} batting records")
+    def __init__(self, api_client, async_client, db_manager,
+                 live_interval=15, scheduled_interval=300, idle_interval=900, buffer=None):
+        self.api_client = api_client
+        self.async_client = async_client
+        self.db_manager = db_manager
+        self.buffer = buffer or new_write_buffer(db_manager)
+        # Player ids already looked up, so each profile costs one call per process
+        self.seen_player_ids = set()
+        self.intervals = {
+            "live": live_interval,
+            "scheduled": scheduled_interval,
+            "idle": idle_interval,
+        }
+        self._stop = threading.Event()
+        self.cycles = 0
+        self.started_at = time.time()
+        self.baseline = run_counters(api_client)
     
-    if bowling_records:
-        count = db_manager.insert_bowling_data(bowling_records)
-        print(f"[OK] Inserted {count} bowling records")
+    def stop(self, signum=None, frame=None):
+        """Request a graceful shutdown; the current cycle is allowed to finish"""
+        if signum is not None:
+            print(f"\n[INFO] Received signal {signum}, shutting down after this cycle...")
+        self._stop.set()
+    
+    def next_interval(self, live_data):
+        """Seconds until the next poll, based on the states in the live feed"""
+        states = {
+            classify_match_state(match.get('matchInfo', {}).get('state'))
+            for match in iter_feed_matches(live_data)
+        }
+        if "live" in states:
+            return self.intervals["live"]
+        if "scheduled" in states:
+            return self.intervals["scheduled"]
+        return self.intervals["idle"]
+    
+    def run_cycle(self):
+        """Poll the live feed once and ingest whatever changed. Returns the next interval."""
+        if not self.db_manager.ensure_connected():
+            return self.intervals["live"]
+        
+        with self.buffer.metrics.stage("fetch") as counter:
+            live_data = self.api_client.get_live_matches()
+            counter.count(1 if live_data else 0)
+        if not live_data:
+            return self.intervals["scheduled"]
+        
+        changed, skipped = store_match_feed(self.db_manager, live_data, self.buffer)
+        if changed:
+            # Watermarks make this pick up only matches whose status moved on
+            discovered = fetch_and_store_scorecards(self.async_client, self.db_manager,
+                                                    buffer=self.buffer)
+            fetch_and_store_players(self.async_client, self.db_manager, discovered,
+                                    self.buffer, self.seen_player_ids)
+        
+        interval = self.next_interval(live_data)
+        print(f"[OK] Cycle {self.cycles}: {len(changed)} matches changed, "
+              f"{skipped} unchanged; next poll in {interval}s")
+        # Totals since the daemon started, so the Home page shows current numbers
+        write_run_report(self.api_client, self.buffer, self.started_at, mode="daemon",
+                         baseline=self.baseline)
+        return interval
+    
+    def run(self):
+        """Poll until stopped by SIGINT/SIGTERM"""
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGINT, self.stop)
+            signal.signal(signal.SIGTERM, self.stop)
+        
+        print(f"[INFO] Daemon started (live {self.intervals['live']}s, "
+              f"scheduled {self.intervals['scheduled']}s, idle {self.intervals['idle']}s)")
+        while not self._stop.is_set():
+            self.cycles += 1
+            started = time.monotonic()
+            try:
+                interval = self.run_cycle()
+            except Exception as e:
+                print(f"[ERROR] Cycle {self.cycles} failed: {e}")
+                interval = self.intervals["live"]
+            # Wait for the remainder of the interval, waking immediately on shutdown
+            self._stop.wait(max(0.0, interval - (time.monotonic() - started)))
+        self.buffer.flush()
+        print(f"[OK] Daemon stopped after {self.cycles} cycles")
+        print_pipeline_report(self.buffer)
+
+
+def parse_args(argv=None):
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Fetch Cricbuzz data into MySQL")
+    parser.add_argument("--daemon", action="store_true",
+                        help="keep running and poll live matches on an adaptive schedule")
+    parser.add_argument("--live-interval", type=float,
+                        default=float(os.getenv("DAEMON_LIVE_INTERVAL") or 15),
+                        help="seconds between polls while a match is in progress")
+    parser.add_argument("--scheduled-interval", type=float,
+                        default=float(os.getenv("DAEMON_SCHEDULED_INTERVAL") or 300),
+                        help="seconds between polls when matches are only scheduled")
+    parser.add_argument("--idle-interval", type=float,
+                        default=float(os.getenv("DAEMON_IDLE_INTERVAL") or 900),
+                        help="seconds between polls when every match is complete")
+    parser.add_argument("--batch-size", type=int,
+                        default=int(os.getenv("INGEST_BATCH_SIZE") or 5000),
+                        help="buffered rows per table that trigger a flush")
+    parser.add_argument("--flush-interval", type=float,
+                        default=float(os.getenv("INGEST_FLUSH_INTERVAL") or 5),
+                        help="seconds after which buffered rows are flushed regardless of size")
+    parser.add_argument("--bulk-load", action="store_true", default=None,
+                        help="write large batches with LOAD DATA LOCAL INFILE (or set DB_BULK_LOAD=1)")
+    return parser.parse_args(argv)
 
 
-def main():
-    """Main function to fetch and store API data"""
+def run_daemon(args):
+    """Run the polling daemon with warm DB and HTTP connections"""
+    print("=" * 60)
+    print("Cricbuzz API Data Fetcher (daemon mode)")
+    print("=" * 60)
+    
+    api_client = CricbuzzAPIClient()
+    async_client = AsyncCricbuzzAPIClient(api_client)
+    db_manager = DatabaseManager(bulk_load=args.bulk_load)
+    
+    if not db_manager.connect():
+        print("[ERROR] Failed to connect to database. Exiting.")
+        return 1
+    
+    daemon = IngestionDaemon(
+        api_client, async_client, db_manager,
+        live_interval=args.live_interval,
+        scheduled_interval=args.scheduled_interval,
+        idle_interval=args.idle_interval,
+        buffer=new_write_buffer(db_manager, args.batch_size, args.flush_interval),
+    )
+    try:
+        daemon.run()
+    finally:
+        async_client.close()
+        api_client.transport.close()
+        db_manager.close()
+    return 0
+
+
+def main(args=None):
+    """Main function to fetch and store API data. Returns the process exit status."""
+    args = args or parse_args([])
+    started_at = time.time()
     print("=" * 60)
     print("Cricbuzz API Data Fetcher")
     print("=" * 60)
     
     # Initialize clients
     api_client = CricbuzzAPIClient()
-    db_manager = DatabaseManager()
+    # Counters are process-wide (shared with the app when run from the Home
+    # page), so this run reports only what happened after this point
+    baseline = run_counters(api_client)
+    async_client = AsyncCricbuzzAPIClient(api_client)
+    db_manager = DatabaseManager(bulk_load=args.bulk_load)
     
     if not db_manager.connect():
         print("[ERROR] Failed to connect to database. Exiting.")
-        return
+        async_client.close()
+        return 1
+    
+    # Parsed rows are buffered per table and written in large transactions
+    buffer = new_write_buffer(db_manager, args.batch_size, args.flush_interval)
     
     try:
-        # Fetch and store matches
-        fetch_and_store_matches(api_client, db_manager)
+        # Replay calls that failed last time first
+        retry_dead_letters(async_client)
         
-        # Fetch and store players
-        fetch_and_store_players(api_client, db_manager)
+        # Fetch and store matches
+        fetch_and_store_matches(api_client, db_manager, buffer)
         
         # Fetch and store scorecards (batting/bowling data)
-        fetch_and_store_scorecards(api_client, db_manager)
+        max_scorecards = int(os.getenv("SCORECARD_MAX_PER_RUN") or 0) or None
+        discovered = fetch_and_store_scorecards(async_client, db_manager,
+                                                max_matches=max_scorecards, buffer=buffer)
+        
+        # Complete the profiles of players who appeared in those scorecards
+        fetch_and_store_players(async_client, db_manager, discovered, buffer)
+        
+        print_pipeline_report(buffer)
+        report = write_run_report(api_client, buffer, started_at, baseline=baseline)
+        
+        totals = report["rate_limiter"]
+        print(f"\n[INFO] API calls: {totals['tokens_used']}, "
+              f"throttled: {totals['throttled_calls']}, "
+              f"waited: {totals['wait_time']:.1f}s, "
+              f"429 responses: {totals['rate_limited_responses']}")
+        cache_stats = report["cache"]
+        print(f"[INFO] Response cache: {cache_stats['hits']} hits, "
+              f"{cache_stats['misses']} misses, {cache_stats['evictions']} evictions")
+        retry_stats = report["retries"]
+        print(f"[INFO] Retries: {retry_stats['retries']}, "
+              f"dead-lettered for next run: {report['dead_letters']}")
+        conn_stats = report["http_pool"]
+        print(f"[INFO] HTTP pool: {conn_stats['requests_sent']} requests over "
+              f"{conn_stats['connections_opened']} connections "
+              f"({conn_stats['connections_reused']} reused)")
         
         print("\n" + "=" * 60)
         print("[OK] Data fetching completed!")
@@ -607,13 +1583,19 @@ def main():
         print("  1. Run SQL queries in the SQL Analytics page")
         print("  2. View data in the CRUD Operations page")
         print("  3. Test all 25 SQL queries with real data")
+        return 0
         
     except Exception as e:
         print(f"[ERROR] Unexpected error: {e}")
+        return 1
     finally:
+        async_client.close()
         db_manager.close()
 
 
 if __name__ == '__main__':
-    main()
+    cli_args = parse_args()
+    if cli_args.daemon:
+        sys.exit(run_daemon(cli_args))
+    sys.exit(main(cli_args))
 
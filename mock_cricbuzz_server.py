@@ -0,0 +1,515 @@
+"""
+Local stand-in for the Cricbuzz RapidAPI, for offline benchmarks and load tests.
+
+Replays responses recorded with CRICBUZZ_RECORD=<archive.zip> on the same paths
+the app calls, and synthesizes payloads for anything that was not recorded.
+
+    python mock_cricbuzz_server.py --fixtures fixtures.zip --scale 500 --latency-ms 80
+    CRICBUZZ_BASE_URL=http://127.0.0.1:8765 python fetch_api_data.py
+
+    python mock_cricbuzz_server.py --history 10000
+    CRICBUZZ_BASE_URL=http://127.0.0.1:8765 python backfill.py --from-year 2021
+"""
+import argparse
+import gzip
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from utils.fixtures import FixtureArchive
+
+SYNTHETIC_MATCH_ID_BASE = 900000
+SYNTHETIC_PLAYER_ID_BASE = 50000
+# Ids given to the players and teams of a recorded scorecard reused for a synthetic match
+TEMPLATE_PLAYER_ID_BASE = 10000000
+TEMPLATE_TEAM_ID_BASE = 5000
+HISTORY_MATCH_ID_BASE = 100000
+HISTORY_SERIES_ID_BASE = 20000
+HISTORY_YEARS = 5
+MATCHES_PER_SERIES = 10
+
+TEAMS = [
+    ("India", "IND"), ("Australia", "AUS"), ("England", "ENG"), ("Pakistan", "PAK"),
+    ("South Africa", "RSA"), ("New Zealand", "NZ"), ("Sri Lanka", "SL"),
+    ("Bangladesh", "BAN"), ("Afghanistan", "AFG"), ("West Indies", "WI"),
+]
+VENUES = [
+    ("Wankhede Stadium", "Mumbai"), ("Eden Gardens", "Kolkata"), ("Lord's", "London"),
+    ("Melbourne Cricket Ground", "Melbourne"), ("Gaddafi Stadium", "Lahore"),
+    ("Newlands", "Cape Town"), ("Eden Park", "Auckland"), ("R Premadasa Stadium", "Colombo"),
+]
+FIRST_NAMES = ["Arjun", "Ben", "Chris", "Dinesh", "Ethan", "Faheem", "Glenn", "Hasan",
+               "Imran", "Jos", "Kane", "Liam", "Mitchell", "Nathan", "Ollie", "Pat",
+               "Quinton", "Rashid", "Shubman", "Travis", "Usman", "Virat", "Wanindu", "Yash"]
+LAST_NAMES = ["Agarwal", "Broad", "Cummins", "de Kock", "Elgar", "Ferguson", "Gill",
+              "Hazlewood", "Iyer", "Jadeja", "Khan", "Latham", "Marsh", "Nortje", "Pope",
+              "Rabada", "Smith", "Thakur", "Umesh", "Vihari", "Warner", "Zampa"]
+FORMATS = ["T20", "ODI", "TEST"]
+
+SCORECARD_PATH = re.compile(r"^/mcenter/v1/(\d+)/scard$")
+PLAYER_PATH = re.compile(r"^/stats/v1/player/(\d+)(?:/([a-z]+))?$")
+SERIES_ARCHIVE_PATH = re.compile(r"^/series/v1/archives/([a-z]+)$")
+SERIES_PATH = re.compile(r"^/series/v1/(\d+)$")
+TEAM_ID_KEY = re.compile(r"^\w*teamid$", re.IGNORECASE)
+PLAYER_ID_KEY = re.compile(r"^(id|(bat|bowl|player|fielder|keeper|captain)\w*id\d*)$", re.IGNORECASE)
+
+
+def rebase_scorecard(template, match_id):
+    """Copy of a recorded scorecard that belongs to `match_id`.
+
+    The match id is replaced and every distinct team and player id is mapped to
+    one derived from `match_id`, so each synthesized match has its own players
+    (consistently across innings, partnerships and dismissals) instead of
+    repeating the recorded match's.
+    """
+    teams, players = {}, {}
+
+    def rebase(ids, old, base, stride):
+        new = ids.setdefault(str(old), base + match_id * stride + len(ids))
+        return str(new) if isinstance(old, str) else new
+
+    def walk(node, team_context=False):
+        if isinstance(node, list):
+            return [walk(item, team_context) for item in node]
+        if not isinstance(node, dict):
+            return node
+        copy = {}
+        for key, value in node.items():
+            is_id = isinstance(value, (int, str)) and not isinstance(value, bool) and str(value).isdigit()
+            if is_id and key.lower() == "matchid":
+                value = str(match_id) if isinstance(value, str) else match_id
+            elif is_id and (TEAM_ID_KEY.match(key) or (key == "id" and team_context)):
+                value = rebase(teams, value, TEMPLATE_TEAM_ID_BASE, 2)
+            elif is_id and PLAYER_ID_KEY.match(key):
+                value = rebase(players, value, TEMPLATE_PLAYER_ID_BASE, 100)
+            else:
+                value = walk(value, "team" in key.lower())
+            copy[key] = value
+        return copy
+
+    return walk(template)
+
+
+def player_name(player_id):
+    """Deterministic, distinct name for a synthetic player id."""
+    n = player_id - SYNTHETIC_PLAYER_ID_BASE
+    return f"{FIRST_NAMES[n % len(FIRST_NAMES)]} {LAST_NAMES[(n // len(FIRST_NAMES)) % len(LAST_NAMES)]}"
+
+
+class SyntheticData:
+    """Generates live feeds, scorecards and player payloads in the Cricbuzz shape.
+
+    `version` of a match advances when it is "churned", so repeated polls see
+    some matches change and the rest stay byte-identical.
+    """
+
+    def __init__(self, live_matches=0, churn=0.1, seed=None, history_matches=0):
+        self.live_matches = live_matches
+        self.history_matches = history_matches
+        self.churn = churn
+        self.random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.versions = {SYNTHETIC_MATCH_ID_BASE + i: 0 for i in range(live_matches)}
+        recent = max(live_matches // 2, MATCHES_PER_SERIES) if live_matches else 0
+        self.recent_ids = [SYNTHETIC_MATCH_ID_BASE - 1 - i for i in range(recent)]
+
+    def is_synthetic_match(self, match_id):
+        return (match_id in self.versions or match_id in self.recent_ids
+                or 0 <= match_id - HISTORY_MATCH_ID_BASE < self.history_matches)
+
+    def _teams(self, match_id):
+        n = match_id - SYNTHETIC_MATCH_ID_BASE
+        home = n % len(TEAMS)
+        away = (home + 1 + n // len(TEAMS)) % len(TEAMS)
+        if away == home:
+            away = (home + 1) % len(TEAMS)
+        return TEAMS[home], TEAMS[away]
+
+    def _squad(self, match_id, side):
+        """Eleven stable player ids per team per match."""
+        start = SYNTHETIC_PLAYER_ID_BASE + ((match_id * 2 + side) * 11) % 5000
+        return list(range(start, start + 11))
+
+    def _innings_total(self, match_id, innings_no, version):
+        rng = random.Random(match_id * 31 + innings_no)
+        overs = min(20.0, rng.randint(2, 10) + version * 0.5)
+        runs = int(overs * rng.uniform(6.5, 9.5))
+        wickets = min(10, int(overs // 3) + rng.randint(0, 2))
+        return runs, wickets, overs
+
+    def match(self, match_id, completed=False):
+        version = self.versions.get(match_id, 0)
+        (team1, team1_short), (team2, team2_short) = self._teams(match_id)
+        ground, city = VENUES[match_id % len(VENUES)]
+        runs, wickets, overs = self._innings_total(match_id, 1, version)
+        start = int((time.time() - 3 * 3600) * 1000)
+        if completed:
+            state, status = "Complete", f"{team1} won by {match_id % 9 + 1} wkts"
+        else:
+            state, status = "In Progress", f"{team1} opt to bat"
+        return {
+            "matchInfo": {
+                "matchId": match_id,
+                "seriesId": 8000 + (match_id - SYNTHETIC_MATCH_ID_BASE) // MATCHES_PER_SERIES,
+                "matchDesc": f"{match_id % 50 + 1}th Match",
+                "matchFormat": FORMATS[match_id % len(FORMATS)],
+                "startDate": str(start),
+                "endDate": str(start + 8 * 3600 * 1000),
+                "state": state,
+                "status": status,
+                "stateTitle": state,
+                "team1": {"teamId": TEAMS.index((team1, team1_short)) + 1,
+                          "teamName": team1, "teamSName": team1_short},
+                "team2": {"teamId": TEAMS.index((team2, team2_short)) + 1,
+                          "teamName": team2, "teamSName": team2_short},
+                "venueInfo": {"ground": ground, "city": city},
+                "tossResults": {"tossWinnerName": team1, "decision": "Batting"},
+            },
+            "matchScore": {
+                "team1Score": {"inngs1": {"inningsId": 1, "runs": runs,
+                                          "wickets": wickets, "overs": overs}},
+            },
+        }
+
+    def _feed(self, match_ids, completed):
+        series = {}
+        for match_id in match_ids:
+            series_id = 8000 + (match_id - SYNTHETIC_MATCH_ID_BASE) // MATCHES_PER_SERIES
+            series.setdefault(series_id, []).append(self.match(match_id, completed))
+        return {
+            "typeMatches": [{
+                "matchType": "International",
+                "seriesMatches": [
+                    {"seriesAdWrapper": {"seriesId": series_id,
+                                         "seriesName": f"Synthetic Series {series_id}",
+                                         "matches": matches}}
+                    for series_id, matches in series.items()
+                ],
+            }]
+        }
+
+    def live_feed(self):
+        """Live feed for every synthetic match; advances a `churn` share of them first."""
+        with self._lock:
+            for match_id in self.versions:
+                if self.random.random() < self.churn:
+                    self.versions[match_id] += 1
+        return self._feed(sorted(self.versions), completed=False)
+
+    def recent_feed(self):
+        return self._feed(self.recent_ids, completed=True)
+
+    def scorecard(self, match_id):
+        version = self.versions.get(match_id, 0)
+        completed = match_id not in self.versions
+        (team1, _), (team2, _) = self._teams(match_id)
+        batting = self._squad(match_id, 0)
+        bowling = self._squad(match_id, 1)
+        runs, wickets, overs = self._innings_total(match_id, 1, version)
+        rng = random.Random(match_id * 7 + version)
+
+        batters = []
+        remaining = runs
+        for position, player_id in enumerate(batting[:wickets + 2]):
+            scored = remaining if position == wickets + 1 else rng.randint(0, max(0, remaining))
+            remaining -= scored
+            balls = max(1, int(scored / rng.uniform(0.8, 1.6)))
+            batters.append({
+                "id": player_id, "name": player_name(player_id),
+                "runs": scored, "balls": balls,
+                "fours": scored // 8, "sixes": scored // 20,
+                "strkrate": round(100.0 * scored / balls, 2),
+                "outdec": "not out" if position >= wickets else f"c & b {player_name(bowling[-1 - position % 5])}",
+            })
+
+        bowlers = []
+        full_overs = int(overs)
+        for n, player_id in enumerate(bowling[-5:]):
+            spell = full_overs // 5 + (1 if n < full_overs % 5 else 0)
+            conceded = int(spell * rng.uniform(5, 10))
+            bowlers.append({
+                "id": player_id, "name": player_name(player_id),
+                "overs": spell, "maidens": 0, "runs": conceded,
+                "wickets": wickets // 5 + (1 if n < wickets % 5 else 0),
+                "economy": round(conceded / spell, 2) if spell else 0.0,
+            })
+
+        return {
+            "scorecard": [{
+                "inningsId": 1,
+                "batteamname": team1,
+                "bowlteamname": team2,
+                "score": runs, "wickets": wickets, "overs": overs,
+                "batsman": batters,
+                "bowler": bowlers,
+            }],
+            "ismatchcomplete": completed,
+            "status": "Complete" if completed else "In Progress",
+        }
+
+    def _history_series(self):
+        """{series_id: (year, [match_id, ...])} for the completed historical matches."""
+        this_year = time.localtime().tm_year
+        series = {}
+        for n in range(self.history_matches):
+            index = n // MATCHES_PER_SERIES
+            year = this_year - index % HISTORY_YEARS
+            series.setdefault(HISTORY_SERIES_ID_BASE + index, (year, []))[1].append(
+                HISTORY_MATCH_ID_BASE + n)
+        return series
+
+    @staticmethod
+    def _series_start(series_id, year):
+        return datetime(year, series_id % 12 + 1, 1, 14, 0)
+
+    def series_archive(self, series_type, year):
+        """Synthetic history is all international, spread over the last HISTORY_YEARS years."""
+        months = {}
+        if series_type == "international":
+            for series_id, (series_year, _) in self._history_series().items():
+                if str(series_year) != str(year):
+                    continue
+                start = self._series_start(series_id, series_year)
+                months.setdefault(start.strftime("%B %Y").upper(), []).append({
+                    "id": series_id, "name": f"Synthetic Series {series_id}",
+                    "startDt": str(int(start.timestamp() * 1000)),
+                })
+        return {"seriesMapProto": [{"date": month, "series": series}
+                                   for month, series in months.items()]}
+
+    def series_matches(self, series_id):
+        """Completed matches of a synthetic historical series, or None if unknown."""
+        entry = self._history_series().get(series_id)
+        if entry is None:
+            return None
+        year, match_ids = entry
+        start = int(self._series_start(series_id, year).timestamp() * 1000)
+        details = []
+        for day, match_id in enumerate(match_ids):
+            match = self.match(match_id, completed=True)
+            match["matchInfo"]["seriesId"] = series_id
+            match["matchInfo"]["startDate"] = str(start + day * 86400 * 1000)
+            match["matchInfo"]["endDate"] = str(start + day * 86400 * 1000 + 8 * 3600 * 1000)
+            details.append({"matchDetailsMap": {"key": f"Day {day + 1}", "match": [match],
+                                                "seriesId": series_id}})
+        return {"matchDetails": details}
+
+    def player_search(self, query):
+        query = (query or "").lower()
+        players = [
+            {"id": str(pid), "name": player_name(pid), "teamName": TEAMS[pid % len(TEAMS)][0]}
+            for pid in range(SYNTHETIC_PLAYER_ID_BASE, SYNTHETIC_PLAYER_ID_BASE + 5000)
+            if query and query in player_name(pid).lower()
+        ]
+        return {"player": players[:20]}
+
+    def player(self, player_id, section=None):
+        name = player_name(player_id)
+        if section is None:
+            return {
+                "id": str(player_id), "name": name,
+                "intlTeam": TEAMS[player_id % len(TEAMS)][0],
+                "role": ["Batsman", "Bowler", "Batting Allrounder", "WK-Batsman"][player_id % 4],
+                "bat": "Right Handed Bat", "bowl": "Right-arm medium",
+            }
+        if section == "career":
+            return {"values": [{"name": fmt.lower(), "debut": "2015", "lastPlayed": "2025"}
+                               for fmt in FORMATS]}
+        return {
+            "headers": ["ROWHEADER", "Test", "ODI", "T20"],
+            "values": [{"values": ["Matches", "40", "90", "60"]},
+                       {"values": ["Runs", str(player_id % 7000), "3100", "1500"]}],
+        }
+
+
+class MockCricbuzzServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, archive=None, synthetic=None, latency_ms=0.0,
+                 jitter_ms=0.0, error_rate=0.0, error_status=503, cycle=True, quiet=True):
+        super().__init__(address, MockCricbuzzHandler)
+        self.archive = archive or FixtureArchive()
+        self.synthetic = synthetic or SyntheticData()
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.cycle = cycle
+        self.quiet = quiet
+        self._stats_lock = threading.Lock()
+        self.counts = {}
+
+    def count(self, route, outcome):
+        with self._stats_lock:
+            key = f"{route} {outcome}"
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def _template_scorecard(self, match_id):
+        """Reuse any recorded scorecard for a synthesized match id, rebased onto that id."""
+        for entry in self.archive.entries("/mcenter/v1/"):
+            if entry.get("status") == 200 and entry.get("body"):
+                return rebase_scorecard(entry["body"], match_id)
+        return self.synthetic.scorecard(match_id)
+
+    def _scaled_feed(self, recorded, synthetic):
+        """Append the synthetic matches to a recorded feed (or use them alone)."""
+        if recorded is None:
+            return synthetic
+        feed = json.loads(json.dumps(recorded))
+        feed.setdefault("typeMatches", []).extend(synthetic.get("typeMatches", []))
+        return feed
+
+    def resolve(self, path, params):
+        """Return (route, status, payload) for a request."""
+        recorded = self.archive.lookup(path, params, cycle=self.cycle)
+
+        if path in ("/matches/v1/live", "/matches/v1/recent"):
+            route = path.rsplit("/", 1)[-1]
+            body = recorded["body"] if recorded and recorded.get("status") == 200 else None
+            if self.synthetic.live_matches:
+                synthetic = (self.synthetic.live_feed() if route == "live"
+                             else self.synthetic.recent_feed())
+                return route, 200, self._scaled_feed(body, synthetic)
+            if recorded:
+                return route, recorded["status"], body
+            return route, 200, {"typeMatches": []}
+
+        if recorded:
+            route = ("scorecard" if SCORECARD_PATH.match(path)
+                     else "series" if path.startswith("/series/") else "player")
+            return route, recorded["status"], recorded.get("body")
+
+        scorecard = SCORECARD_PATH.match(path)
+        if scorecard:
+            match_id = int(scorecard.group(1))
+            if self.synthetic.is_synthetic_match(match_id):
+                return "scorecard", 200, self._template_scorecard(match_id)
+            return "scorecard", 404, None
+
+        archive = SERIES_ARCHIVE_PATH.match(path)
+        if archive:
+            return "series_archive", 200, self.synthetic.series_archive(archive.group(1),
+                                                                         params.get("year"))
+
+        series = SERIES_PATH.match(path)
+        if series:
+            payload = self.synthetic.series_matches(int(series.group(1)))
+            return "series", (200 if payload else 404), payload
+
+        if path == "/stats/v1/player/search":
+            return "player_search", 200, self.synthetic.player_search(params.get("plrN"))
+
+        player = PLAYER_PATH.match(path)
+        if player:
+            return "player", 200, self.synthetic.player(int(player.group(1)), player.group(2))
+
+        return "unknown", 404, None
+
+
+class MockCricbuzzHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload if payload is not None else {"message": "Not found"}).encode("utf-8")
+        if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            body = gzip.compress(body, 5)
+            headers = dict(headers or {}, **{"Content-Encoding": "gzip"})
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query))
+
+        delay = server.latency_ms + (random.uniform(0, server.jitter_ms) if server.jitter_ms else 0)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+
+        route, status, payload = server.resolve(url.path, params)
+        if server.error_rate and random.random() < server.error_rate:
+            server.count(route, f"injected_{server.error_status}")
+            headers = {"Retry-After": "1"} if server.error_status == 429 else None
+            self._send(server.error_status, {"message": "Injected failure"}, headers)
+            return
+
+        server.count(route, status)
+        self._send(status, payload)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Local mock of the Cricbuzz RapidAPI")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", help="Zip archive recorded with CRICBUZZ_RECORD")
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="Fixed delay added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0,
+                        help="Extra random delay of up to this many ms")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Share of requests answered with --error-status (0-1)")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--scale", type=int, default=0,
+                        help="Synthesize this many live matches (with scorecards)")
+    parser.add_argument("--history", type=int, default=0,
+                        help="Synthesize this many completed historical matches in series archives")
+    parser.add_argument("--churn", type=float, default=0.1,
+                        help="Share of synthetic live matches whose score moves per poll")
+    parser.add_argument("--no-cycle", action="store_true",
+                        help="Always serve the latest recorded snapshot")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    archive = FixtureArchive.load(args.fixtures) if args.fixtures else FixtureArchive()
+    if args.fixtures:
+        print(f"[OK] Loaded {len(archive)} recorded responses from {args.fixtures}")
+
+    server = MockCricbuzzServer(
+        (args.host, args.port),
+        archive=archive,
+        synthetic=SyntheticData(args.scale, args.churn, args.seed, args.history),
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        cycle=not args.no_cycle,
+        quiet=not args.verbose,
+    )
+    print(f"[INFO] Mock Cricbuzz API on http://{args.host}:{args.port} "
+          f"(scale={args.scale}, history={args.history}, latency={args.latency_ms}ms, "
+          f"error_rate={args.error_rate})")
+    print(f"[INFO] Point the app at it with CRICBUZZ_BASE_URL=http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("[INFO] Requests served:")
+        for key, count in sorted(server.counts.items()):
+            print(f"   {key}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,7 @@ from utils.db_connection import (
     delete_rows,
     execute_update,
 )
+from utils.db_pool import pool_stats
 
 def show_crud_operations():
     st.title("🛠️ CRUD Operations")
@@ -71,16 +72,76 @@ def show_crud_operations():
         # 3) View / Read Table as DataFrame
         # -------------------------------
         st.subheader("📖 View Table Data")
-        limit = st.number_input("Rows to load", min_value=1, max_value=10000, value=200, step=50)
+        limit = st.number_input("Rows per page", min_value=1, max_value=10000, value=200, step=50)
 
-        if st.button("📥 Load Data"):
+        # Page bounds of the table being browsed; page_starts remembers the first
+        # key of every visited page so returning to one is a single seek
+        browse = st.session_state.get("browse")
+        if browse is None or browse["table"] != (database, table) or browse["limit"] != int(limit):
+            browse = None
+
+        def load_page(key=None, direction="next", inclusive=False, number=1):
             try:
-                df, sql = fetch_table(host, user, passwd, database, table, int(limit))
-                st.code(sql, language="sql")
-                st.dataframe(df, use_container_width=True)
-                st.session_state["last_df"] = df
+                df, sql, page = fetch_table(host, user, passwd, database, table, int(limit),
+                                            key=key, direction=direction, inclusive=inclusive)
             except Exception as e:
                 st.error(f"Read failed: {e}")
+                return
+            starts = browse["page_starts"] if browse else {}
+            if number is not None and page["first"] is not None:
+                starts[number] = page["first"]
+            st.session_state["browse"] = {
+                "table": (database, table), "limit": int(limit), "number": number,
+                "page": page, "sql": sql, "params": key, "page_starts": starts,
+            }
+            st.session_state["last_df"] = df
+            # Rerun so the controls reflect the new page's bounds
+            st.rerun()
+
+        nav = st.columns(5)
+        if nav[0].button("📥 Load Data"):
+            browse = None
+            load_page()
+        page = browse["page"] if browse else None
+        number = browse["number"] if browse else None
+        if nav[1].button("⏮️ First", disabled=not browse):
+            load_page()
+        if nav[2].button("◀️ Previous", disabled=not (page and page["has_prev"])):
+            load_page(page["first"], "prev", number=number - 1 if number and number > 1 else None)
+        if nav[3].button("Next ▶️", disabled=not (page and page["has_next"])):
+            load_page(page["last"], "next", number=number + 1 if number else None)
+        if nav[4].button("Last ⏭️", disabled=not (page and page["key_columns"])):
+            load_page(direction="prev", number=None)
+
+        browse = st.session_state.get("browse")
+        if browse and browse["table"] == (database, table) and browse["limit"] == int(limit):
+            page = browse["page"]
+            jump = st.columns(2)
+            visited = sorted(browse["page_starts"])
+            if len(visited) > 1:
+                target = jump[0].selectbox("Go to visited page", visited,
+                                           index=visited.index(browse["number"])
+                                           if browse["number"] in visited else 0)
+                if target != browse["number"] and jump[0].button("Go"):
+                    # Page 1 is read from the start so it does not offer a Previous page
+                    if target == 1:
+                        load_page()
+                    else:
+                        load_page(browse["page_starts"][target], inclusive=True, number=target)
+            if len(page["key_columns"]) == 1:
+                start = jump[1].text_input(f"Jump to {page['key_columns'][0]} ≥")
+                if start.strip() and jump[1].button("Seek"):
+                    load_page((start.strip(),), inclusive=True, number=None)
+
+            label = f"Page {browse['number']}" if browse["number"] else "Page"
+            if not page["key_columns"]:
+                st.info("This table has no primary key; showing its first rows without paging.")
+            st.caption(f"{label} · {len(st.session_state['last_df'])} rows"
+                       + (f" · keys {page['first']} to {page['last']}" if page["first"] else ""))
+            st.code(browse["sql"], language="sql")
+            if browse["params"]:
+                st.caption(f"Parameters: {list(browse['params'])}")
+            st.dataframe(st.session_state["last_df"], use_container_width=True)
 
         # -------------------------------
         # 4) Custom SELECT Query
@@ -164,3 +225,14 @@ def show_crud_operations():
                     st.success(f"Updated {affected} row(s).")
                 except Exception as e:
                     st.error(f"Update failed: {e}")
+
+        # -------------------------------
+        # 8) Connection pool
+        # -------------------------------
+        with st.expander("🔗 Connection Pool"):
+            stats = pool_stats()
+            if stats:
+                st.caption("Pooled connections shared by every session of this server process.")
+                st.dataframe(pd.DataFrame.from_dict(stats, orient="index"), use_container_width=True)
+            else:
+                st.caption("No pooled connections opened yet.")
@@ -1,10 +1,11 @@
 # pages/live_matches.py
 import streamlit as st
-import requests
 import pandas as pd
 from datetime import datetime
 import os
 from dotenv import load_dotenv
+from utils.rate_limiter import QuotaExceededError
+from utils.cricbuzz_api import get_transport
 
 # -------------------------------
 # 1) Load environment variables
@@ -16,29 +17,25 @@ if not CRICBUZZ_API_KEY:
     st.error("❌ RAPIDAPI_KEY not found in environment variables. Please create a .env file with your API key.")
     st.stop()
 
-CRICBUZZ_HOST = "cricbuzz-cricket.p.rapidapi.com"
-
 # -------------------------------
 # 2) Cricbuzz API class
 # -------------------------------
 class CricbuzzAPI:
     def __init__(self):
-        self.headers = {
-            "x-rapidapi-key": CRICBUZZ_API_KEY,
-            "x-rapidapi-host": CRICBUZZ_HOST
-        }
-        self.base_url = "https://cricbuzz-cricket.p.rapidapi.com"
+        self.transport = get_transport()
 
     def get_live_matches(self):
         """Fetch live matches"""
         try:
-            url = f"{self.base_url}/matches/v1/live"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            if response.status_code == 200:
-                return response.json()
+            status, data = self.transport.get_json("live_matches", "/matches/v1/live")
+            if status == 200:
+                return data
             else:
-                st.error(f"API Error: {response.status_code}")
+                st.error(f"API Error: {status}")
                 return None
+        except QuotaExceededError as e:
+            st.error(f"❌ {e}")
+            return None
         except Exception as e:
             st.error(f"Error fetching data: {e}")
             return None
@@ -46,13 +43,18 @@ class CricbuzzAPI:
     def get_scorecard(self, match_id: str):
         """Fetch scorecard by matchId"""
         try:
-            url = f"{self.base_url}/mcenter/v1/{match_id}/scard"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            if response.status_code == 200:
-                return response.json()
+            status, data = self.transport.get_json(
+                "scorecard", f"/mcenter/v1/{match_id}/scard",
+                cache_params={"match_id": str(match_id)}
+            )
+            if status == 200:
+                return data
             else:
-                st.error(f"API Error (Scorecard): {response.status_code}")
+                st.error(f"API Error (Scorecard): {status}")
                 return None
+        except QuotaExceededError as e:
+            st.error(f"❌ {e}")
+            return None
         except Exception as e:
             st.error(f"Error fetching scorecard: {e}")
             return None
@@ -1,40 +1,37 @@
 import streamlit as st
 import pandas as pd
-import mysql.connector
 from mysql.connector import Error
 import os
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
-from urllib.parse import quote_plus
+from utils.db_connection import get_engine
+from utils.db_pool import get_connection_pool
+from utils.query_cache import get_query_cache
 
 # ----------------- Database Connection Functions -----------------
 # 1️⃣ Create a connection function
 def create_connection():
-    """Create a database connection and return the connection object."""
+    """Check out a pooled database connection; close() returns it to the pool."""
     load_dotenv()
     host = os.getenv("DB_HOST")
     user = os.getenv("DB_USER")
     password = os.getenv("DB_PASSWORD")
     database = os.getenv("DB_NAME")
 
-    conn = None
     try:
-        conn = mysql.connector.connect(
-            host=host,
-            user=user,
-            password=password,
-            database=database
-        )
-        if conn.is_connected():
-            return conn
+        return get_connection_pool(host, user, password, database).get_connection()
     except Error as e:
         st.error(f"❌ Error connecting to MySQL database: {e}")
         return None
 
 # 2️⃣ Function to run a query and return as DataFrame
-@st.cache_data(ttl=300, show_spinner=False)
 def run_query_cached(query):
-    """Run a given SQL query and return the results as a pandas DataFrame, cached for 5 mins."""
+    """Run a given SQL query and return the results as a pandas DataFrame.
+
+    Results stay cached until one of the tables the query reads is written to
+    (CRUD edits and data fetches bump its version). Without SHARED_CACHE_URL,
+    writes from other processes are not seen, so entries also expire after
+    QUERY_CACHE_LOCAL_TTL seconds.
+    """
     load_dotenv()
     host = os.getenv("DB_HOST", "localhost")
     user = os.getenv("DB_USER", "root")
@@ -42,11 +39,10 @@ def run_query_cached(query):
     database = os.getenv("DB_NAME", "cricket_db")
     
     try:
-        password_encoded = quote_plus(password)
-        engine = create_engine(f"mysql+mysqlconnector://{user}:{password_encoded}@{host}/{database}")
-        df = pd.read_sql(query, engine)
-        engine.dispose()
-        return df
+        return get_query_cache().get_or_run(
+            host, user, database, query,
+            lambda: pd.read_sql(query, get_engine(host, user, password, database)),
+        )
     except Exception as e:
         st.error(f"❌ Query Error: {e}")
         return None
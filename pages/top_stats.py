@@ -1,10 +1,8 @@
 import streamlit as st
-import http.client
-import json
-import requests
 import pandas as pd
 import os
 from dotenv import load_dotenv
+from utils.cricbuzz_api import get_transport
 
 # ---------------- Load API Key ----------------
 load_dotenv()
@@ -14,45 +12,36 @@ if not API_KEY:
     st.error("❌ RAPIDAPI_KEY not found in environment variables. Please create a .env file with your API key.")
     st.stop()
 
-# Cricbuzz API Config
-HEADERS = {
-    'x-rapidapi-key': API_KEY,
-    'x-rapidapi-host': "cricbuzz-cricket.p.rapidapi.com"
-}
-BASE_URL = "cricbuzz-cricket.p.rapidapi.com"
+# Shared pooled Cricbuzz transport (cache + rate limiter + keep-alive)
+transport = get_transport()
 
 # ---------------- Helper Functions ----------------
-def search_players(query: str):
-    """Search players by name"""
-    conn = http.client.HTTPSConnection(BASE_URL)
-    conn.request("GET", f"/stats/v1/player/search?plrN={query}", headers=HEADERS)
-    res = conn.getresponse()
-    data = res.read()
-    conn.close()
+def _get_json(endpoint: str, path: str, params=None, cache_params=None):
+    """Fetch a Cricbuzz endpoint through the shared transport ({} on failure)"""
     try:
-        return json.loads(data.decode("utf-8"))
-    except:
+        status, data = transport.get_json(endpoint, path, params=params, cache_params=cache_params)
+    except Exception:
         return {}
+    return data if status == 200 and data else {}
+
+def search_players(query: str):
+    """Search players by name"""
+    return _get_json("player_search", "/stats/v1/player/search", params={"plrN": query})
 
 def get_player_details(player_id: int):
     """Get full profile of a player"""
-    conn = http.client.HTTPSConnection(BASE_URL)
-    conn.request("GET", f"/stats/v1/player/{player_id}", headers=HEADERS)
-    res = conn.getresponse()
-    data = res.read()
-    conn.close()
-    try:
-        return json.loads(data.decode("utf-8"))
-    except:
-        return {}
+    return _get_json("player_details", f"/stats/v1/player/{player_id}",
+                     cache_params={"player_id": str(player_id)})
+
+def get_player_career(player_id: int):
+    """Get debut / last-played information per format"""
+    return _get_json("player_career", f"/stats/v1/player/{player_id}/career",
+                     cache_params={"player_id": str(player_id)})
 
 def get_player_stats(player_id: int, stat_type="batting"):
     """Fetch batting or bowling stats"""
-    url = f"https://cricbuzz-cricket.p.rapidapi.com/stats/v1/player/{player_id}/{stat_type}"
-    response = requests.get(url, headers=HEADERS)
-    if response.status_code == 200:
-        return response.json()
-    return {}
+    return _get_json("player_stats", f"/stats/v1/player/{player_id}/{stat_type}",
+                     cache_params={"player_id": str(player_id), "stat_type": stat_type})
 
 def parse_stats_table(stats_json):
     """Convert Cricbuzz stats JSON to a DataFrame"""
@@ -138,14 +127,9 @@ def show_top_stats():
 
                     # Career Debut Info
                     st.subheader("Career Debut Information")
-                    conn = http.client.HTTPSConnection(BASE_URL)
-                    conn.request("GET", f"/stats/v1/player/{selected_player['id']}/career", headers=HEADERS)
-                    res = conn.getresponse()
-                    career_data = res.read()
-                    conn.close()
+                    career_json = get_player_career(selected_player["id"])
 
                     try:
-                        career_json = json.loads(career_data.decode("utf-8"))
                         if "values" in career_json and career_json["values"]:
                             career_rows = []
                             for f in career_json["values"]:
@@ -0,0 +1,94 @@
+import os
+import re
+import sys
+
+import pytest
+from mysql.connector import Error
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakePlayersCursor:
+    """Just enough of a mysql.connector cursor for the statements PlayerResolver runs."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.rowcount = 0
+        self._rows = []
+
+    def execute(self, sql, params=()):
+        self.conn.statements.append(sql)
+        sql = " ".join(sql.split())
+        players = self.conn.players
+        if sql.startswith("SELECT player_id, cricbuzz_player_id, name, full_name FROM players"):
+            if "cricbuzz_player_id IN" in sql:
+                rows = [p for p in players if p["cricbuzz_player_id"] in params]
+            elif "name IN" in sql:
+                rows = [p for p in players if p["cricbuzz_player_id"] is None and p["name"] in params]
+            else:
+                rows = players
+            self._rows = [(p["player_id"], p["cricbuzz_player_id"], p["name"], p["full_name"])
+                          for p in rows]
+            self.rowcount = len(self._rows)
+        else:
+            raise AssertionError(f"unexpected statement: {sql}")
+
+    def executemany(self, sql, seq_params):
+        self.conn.statements.append(sql)
+        sql = " ".join(sql.split())
+        if self.conn.fail and sql.startswith(self.conn.fail):
+            self.conn.fail = None
+            raise Error(msg=f"{sql.split()[0]} failed")
+        players = self.conn.players
+        self.rowcount = 0
+        for params in seq_params:
+            if sql.startswith("UPDATE players SET cricbuzz_player_id"):
+                cb_id, player_id = params
+                for p in players:
+                    if p["player_id"] == player_id and p["cricbuzz_player_id"] is None:
+                        p["cricbuzz_player_id"] = cb_id
+                        self.rowcount += 1
+            elif sql.startswith("INSERT INTO players"):
+                full_name, name, country, cb_id = params
+                existing = [p for p in players if cb_id is not None and p["cricbuzz_player_id"] == cb_id]
+                if existing:
+                    existing[0]["name"] = name
+                else:
+                    players.append({"player_id": len(players) + 1, "cricbuzz_player_id": cb_id,
+                                    "name": name, "full_name": full_name, "country": country})
+                self.rowcount += 1
+            else:
+                raise AssertionError(f"unexpected statement: {sql}")
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def close(self):
+        pass
+
+
+class FakePlayersConnection:
+    """In-memory `players` table behind a connection-like object.
+
+    Set `fail` to a statement prefix to make the next such write raise.
+    """
+
+    def __init__(self, players=()):
+        self.players = [
+            {"player_id": i, "cricbuzz_player_id": cb_id, "name": name, "full_name": name}
+            for i, (cb_id, name) in enumerate(players, start=1)
+        ]
+        self.statements = []
+        self.fail = None
+
+    def cursor(self):
+        return FakePlayersCursor(self)
+
+    def written(self, verb):
+        return [s for s in self.statements if re.match(rf"\s*{verb}\b", s, re.IGNORECASE)]
+
+
+@pytest.fixture
+def players_conn():
+    return FakePlayersConnection
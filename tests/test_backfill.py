@@ -0,0 +1,21 @@
+import backfill
+from utils.resilience import DeadLetterQueue
+
+
+def test_worker_dead_letters_are_collected_into_the_shared_queue(tmp_path, monkeypatch):
+    monkeypatch.setattr(backfill, "WORKER_DIR", str(tmp_path / "backfill"))
+    shared = DeadLetterQueue(str(tmp_path / "dead_letters.json"))
+    shared.add("get_scorecard", [101], "timeout")
+
+    # Two workers left entries behind, one of them for the same call
+    first = DeadLetterQueue(backfill.worker_dead_letter_file(111))
+    first.add("get_scorecard", [101], "503")
+    first.add("get_player_details", [8733], "timeout")
+    DeadLetterQueue(backfill.worker_dead_letter_file(222)).add("get_scorecard", [102], "503")
+
+    assert backfill.collect_dead_letters(shared) == 3
+    entries = {(e["method"], e["args"][0]): e["attempts"] for e in shared.drain()}
+    assert entries == {("get_scorecard", "101"): 2, ("get_player_details", "8733"): 1,
+                       ("get_scorecard", "102"): 1}
+    assert list((tmp_path / "backfill").iterdir()) == []
+    assert backfill.collect_dead_letters(shared) == 0
@@ -0,0 +1,48 @@
+import io
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from utils.bulk_load import load_data_sql, tsv_file, tsv_value, write_tsv
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, "\\N"),
+    (True, "1"),
+    (False, "0"),
+    (42, "42"),
+    (Decimal("12.50"), "12.50"),
+    (83.33, "83.33"),
+    (datetime(2024, 3, 1, 14, 30), "2024-03-01 14:30:00.000000"),
+    (date(2024, 3, 1), "2024-03-01"),
+    ("c & b Starc", "c & b Starc"),
+    ("tab\there", "tab\\there"),
+    ("line\nbreak\r", "line\\nbreak\\r"),
+    ("back\\slash", "back\\\\slash"),
+    ("nul\0", "nul\\0"),
+    ("\\N", "\\\\N"),          # the text "\N" stays text, not NULL
+    (b"bytes", "bytes"),
+])
+def test_tsv_value(value, expected):
+    assert tsv_value(value) == expected
+
+
+def test_write_tsv_keeps_one_line_per_row():
+    out = io.StringIO()
+    assert write_tsv(out, [(1, "multi\nline", None), (2, "a\tb", "")]) == 2
+    assert out.getvalue() == "1\tmulti\\nline\t\\N\n2\ta\\tb\t\n"
+
+
+def test_tsv_file_is_removed_afterwards(tmp_path):
+    with tsv_file([(1, "x")], directory=str(tmp_path)) as (path, count):
+        assert count == 1
+        with open(path, encoding="utf-8") as f:
+            assert f.read() == "1\tx\n"
+    assert not list(tmp_path.iterdir())
+
+
+def test_load_data_sql_names_the_columns():
+    sql = load_data_sql("staging_batting_data", ["match_id", "player_id"])
+    assert sql.startswith("LOAD DATA LOCAL INFILE %s INTO TABLE staging_batting_data")
+    assert sql.endswith("(match_id, player_id)")
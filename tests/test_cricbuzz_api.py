@@ -0,0 +1,89 @@
+import pytest
+import requests
+
+from utils.cricbuzz_api import CricbuzzTransport
+from utils.rate_limiter import QuotaExceededError
+from utils.resilience import TransientAPIError
+from utils.response_cache import ResponseCache, is_completed_scorecard
+from utils.telemetry import Telemetry
+
+
+class FakeLimiter:
+    def acquire(self, endpoint):
+        pass
+
+    def observe(self, endpoint, status, headers):
+        pass
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self._payload = payload
+        self.status_code = status_code
+        self.headers = {}
+
+    def json(self):
+        return self._payload
+
+
+@pytest.fixture
+def transport(tmp_path):
+    transport = CricbuzzTransport(limiter=FakeLimiter(), cache=ResponseCache(str(tmp_path)),
+                                  telemetry=Telemetry(), breaker_threshold=1, breaker_reset=0.0)
+    transport.sent = []
+    yield transport
+    transport.close()
+
+
+def serve(transport, *outcomes):
+    """Make the transport's network attempts return (or raise) `outcomes` in order."""
+    outcomes = list(outcomes)
+
+    def send(endpoint, path, params):
+        transport.sent.append(path)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return FakeResponse(outcome)
+
+    transport._send = send
+
+
+def test_cached_if_refetches_rejected_payloads(transport):
+    in_progress = {"scorecard": [], "ismatchcomplete": False}
+    complete = {"scorecard": [], "ismatchcomplete": True}
+    serve(transport, in_progress, complete)
+
+    assert transport.get_json("scorecard", "/scard", cache_params={"id": 1}) == (200, in_progress)
+    # A cached in-progress scorecard is served normally, but fetched again when rejected
+    assert transport.get_json("scorecard", "/scard", cache_params={"id": 1})[1] == in_progress
+    assert transport.get_json("scorecard", "/scard", cache_params={"id": 1},
+                              cached_if=is_completed_scorecard)[1] == complete
+    assert transport.get_json("scorecard", "/scard", cache_params={"id": 1},
+                              cached_if=is_completed_scorecard)[1] == complete
+    assert len(transport.sent) == 2
+
+
+def test_half_open_probe_failing_with_a_broken_body_reopens_the_breaker(transport):
+    transport.retry_policy.max_retries = 0
+    serve(transport, requests.ConnectionError("refused"),
+          requests.exceptions.ChunkedEncodingError("truncated"), {"matches": []})
+
+    for _ in range(2):
+        with pytest.raises(TransientAPIError):
+            transport.get_json("live_matches", "/live")
+    # reset_timeout is 0, so the next call is a fresh probe rather than a rejection
+    assert transport.get_json("live_matches", "/live") == (200, {"matches": []})
+    assert transport.breaker("live_matches").state == "closed"
+
+
+def test_local_error_during_probe_releases_it(transport):
+    transport.retry_policy.max_retries = 0
+    serve(transport, requests.ConnectionError("refused"), QuotaExceededError("quota"), {"matches": []})
+
+    with pytest.raises(TransientAPIError):
+        transport.get_json("live_matches", "/live")
+    with pytest.raises(QuotaExceededError):
+        transport.get_json("live_matches", "/live")
+    assert transport.get_json("live_matches", "/live") == (200, {"matches": []})
+    assert transport.breaker("live_matches").rejected == 0
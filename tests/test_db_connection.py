@@ -0,0 +1,73 @@
+import pytest
+
+from utils import db_connection
+
+
+class FakeKeyCursor:
+    """Answers fetch_table's keyset queries over a single-column key 1..n."""
+
+    column_names = ("id",)
+
+    def __init__(self, keys):
+        self.keys = keys
+        self._rows = []
+
+    def execute(self, sql, params=()):
+        rows = list(self.keys)
+        if "WHERE" in sql:
+            bound = params[0]
+            op = sql.split("WHERE (`id`) ")[1].split(" ")[0]
+            rows = [k for k in rows if {"<": k < bound, ">": k > bound, ">=": k >= bound}[op]]
+        if "DESC" in sql:
+            rows.reverse()
+        limit = int(sql.rsplit("LIMIT ", 1)[1])
+        self._rows = [(k,) for k in rows[:limit]]
+
+    def fetchmany(self, size):
+        chunk, self._rows = self._rows[:size], self._rows[size:]
+        return chunk
+
+    def fetchall(self):
+        return self.fetchmany(len(self._rows))
+
+    def close(self):
+        pass
+
+
+class FakeKeyConnection:
+    def __init__(self, keys):
+        self.keys = keys
+
+    def cursor(self):
+        return FakeKeyCursor(self.keys)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def fetch(monkeypatch):
+    monkeypatch.setattr(db_connection, "get_primary_key", lambda *args: ["id"])
+    monkeypatch.setattr(db_connection, "create_connection",
+                        lambda *args: FakeKeyConnection(range(1, 26)))
+
+    def fetch(**kwargs):
+        return db_connection.fetch_table("h", "u", "p", "db", "t", limit=10, **kwargs)[2]
+    return fetch
+
+
+def test_inclusive_seek_to_the_first_key_has_no_previous_page(fetch):
+    first = fetch()
+    assert (first["first"], first["has_prev"], first["has_next"]) == ((1,), False, True)
+
+    again = fetch(key=first["first"], inclusive=True)
+    assert (again["first"], again["has_prev"], again["has_next"]) == ((1,), False, True)
+    second = fetch(key=(11,), inclusive=True)
+    assert (second["first"], second["has_prev"], second["has_next"]) == ((11,), True, True)
+
+
+def test_paging_backwards_from_the_second_page(fetch):
+    second = fetch(key=(10,))
+    assert (second["first"], second["has_prev"]) == ((11,), True)
+    first = fetch(key=second["first"], direction="prev")
+    assert (first["first"], first["last"], first["has_prev"], first["has_next"]) == ((1,), (10,), False, True)
@@ -0,0 +1,131 @@
+from mysql.connector import Error
+
+from fetch_api_data import DatabaseManager
+
+
+class RecordingCursor:
+    def __init__(self, statements, existing=0):
+        self.statements = statements
+        self.existing = existing
+        self.rowcount = 0
+
+    def execute(self, sql, params=None):
+        self.statements.append((" ".join(sql.split()), params))
+
+    def executemany(self, sql, seq_params):
+        seq_params = list(seq_params)
+        self.statements.append((" ".join(sql.split()), seq_params))
+        self.rowcount = len(seq_params) - self.existing + 2 * self.existing
+
+    def fetchone(self):
+        return (self.existing,)
+
+    def close(self):
+        pass
+
+
+class RecordingConnection:
+    def __init__(self, existing=0):
+        self.statements = []
+        self.existing = existing
+
+    def cursor(self):
+        return RecordingCursor(self.statements, self.existing)
+
+
+def profile(cb_id, name):
+    return {"cricbuzz_player_id": cb_id, "name": name, "full_name": name, "country": "India",
+            "playing_role": "Batsman", "batting_style": "Right Handed Bat", "bowling_style": ""}
+
+
+def test_upsert_players_writes_one_batch_keyed_on_the_cricbuzz_id():
+    db = DatabaseManager()
+    db.conn = RecordingConnection(existing=1)
+
+    result = db.upsert_players([profile(1413, "Virat Kohli"), profile(8733, "KL Rahul"),
+                                {"name": "No Id", "full_name": "No Id"}])
+
+    assert result == (1, 1)
+    statements = [sql for sql, _ in db.conn.statements]
+    assert len(statements) == 2
+    assert statements[0].startswith("SELECT COUNT(*) FROM players WHERE (cricbuzz_player_id) IN")
+    assert statements[1].startswith("INSERT INTO players (cricbuzz_player_id, full_name, name")
+    assert "ON DUPLICATE KEY UPDATE" in statements[1] and "total_runs =" not in statements[1]
+    assert [row[0] for row in db.conn.statements[1][1]] == [1413, 8733]
+
+
+class LoadDataCursor(RecordingCursor):
+    """Records statements and the TSV each LOAD DATA reads; `refuse` fails it like the server."""
+
+    def __init__(self, conn):
+        super().__init__(conn.statements, conn.existing)
+        self.conn = conn
+
+    def execute(self, sql, params=None):
+        super().execute(sql, params)
+        if sql.startswith("LOAD DATA LOCAL INFILE"):
+            if self.conn.refuse:
+                raise Error(msg="Loading local data is disabled", errno=3948)
+            with open(params[0], encoding="utf-8", newline="") as f:
+                self.conn.loaded.append(f.read())
+        elif sql.startswith("INSERT INTO"):
+            self.rowcount = 3
+
+
+class LoadDataConnection(RecordingConnection):
+    def __init__(self, existing=0, refuse=False):
+        super().__init__(existing)
+        self.refuse = refuse
+        self.loaded = []
+
+    def cursor(self):
+        return LoadDataCursor(self)
+
+
+def bulk_manager(conn):
+    db = DatabaseManager(bulk_load=True)
+    db.bulk_load_min_rows = 2
+    db.conn = conn
+    return db
+
+
+ROWS = [(1, 10, "Virat\tKohli", None), (1, 11, "Stale", 3.5), (1, 11, "Line\nBreak", 4.0)]
+
+
+def test_bulk_load_stages_a_tsv_and_merges_it(tmp_path, monkeypatch):
+    monkeypatch.setattr("utils.bulk_load.tsv_file.__defaults__", (str(tmp_path),))
+    db = bulk_manager(LoadDataConnection(existing=1))
+
+    result = db._bulk_upsert("batting_data", ["match_id", "player_id", "player_name", "strike_rate"],
+                             ["match_id", "player_id"], ["player_name", "strike_rate"], ROWS, 1000)
+
+    # The duplicate key keeps its last row; NULL, tabs and newlines are escaped
+    assert db.conn.loaded == ["1\t10\tVirat\\tKohli\t\\N\n1\t11\tLine\\nBreak\t4.0\n"]
+    statements = [sql for sql, _ in db.conn.statements]
+    assert statements[1].startswith("CREATE TEMPORARY TABLE staging_batting_data")
+    assert any(sql.startswith("INSERT INTO batting_data (match_id, player_id, player_name, strike_rate) "
+                              "SELECT") for sql in statements)
+    assert statements[-1] == "DROP TEMPORARY TABLE IF EXISTS staging_batting_data"
+    # 2 staged, 1 already there: 1 inserted, (3 - 1) // 2 = 1 updated
+    assert result == (1, 1)
+    assert not list(tmp_path.iterdir())
+
+
+def test_refused_local_infile_falls_back_to_multi_row_inserts(tmp_path, monkeypatch):
+    monkeypatch.setattr("utils.bulk_load.tsv_file.__defaults__", (str(tmp_path),))
+    db = bulk_manager(LoadDataConnection(refuse=True))
+
+    db._bulk_upsert("batting_data", ["match_id", "player_id", "player_name", "strike_rate"],
+                    ["match_id", "player_id"], ["player_name", "strike_rate"], ROWS, 1000)
+
+    assert db.bulk_load is False
+    statements = [sql for sql, _ in db.conn.statements]
+    assert statements[-2].startswith("SELECT COUNT(*) FROM batting_data WHERE (match_id, player_id) IN")
+    assert statements[-1].startswith("INSERT INTO batting_data (match_id, player_id, player_name, "
+                                     "strike_rate) VALUES")
+    assert len(db.conn.statements[-1][1]) == 2
+    # Later batches skip LOAD DATA altogether
+    db.conn.statements.clear()
+    db._bulk_upsert("batting_data", ["match_id", "player_id", "player_name", "strike_rate"],
+                    ["match_id", "player_id"], ["player_name", "strike_rate"], ROWS, 1000)
+    assert not any("LOAD DATA" in sql for sql, _ in db.conn.statements)
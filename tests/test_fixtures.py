@@ -0,0 +1,25 @@
+import multiprocessing
+
+from utils.fixtures import FixtureArchive, FixtureRecorder
+
+
+def record_many(archive_path, worker, count):
+    recorder = FixtureRecorder(archive_path)
+    for n in range(count):
+        recorder.record(f"/series/v1/{worker}", {"n": n}, 200, {"worker": worker, "n": n})
+
+
+def test_worker_processes_can_record_into_one_archive(tmp_path):
+    archive_path = str(tmp_path / "fixtures.zip")
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=record_many, args=(archive_path, worker, 40))
+               for worker in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join(60)
+        assert process.exitcode == 0
+
+    archive = FixtureArchive.load(archive_path)
+    assert len(archive) == 160
+    assert archive.lookup("/series/v1/3", {"n": 39})["body"] == {"worker": 3, "n": 39}
@@ -0,0 +1,116 @@
+from contextlib import contextmanager
+from functools import partial
+
+from mysql.connector import Error
+
+from fetch_api_data import column_match_ids
+from utils.ingest_pipeline import WriteBuffer
+from utils.records import BattingInnings, ColumnBatch
+
+
+class FakeDatabase:
+    """Writers that record what they were given; `fail` names tables whose next write raises."""
+
+    def __init__(self):
+        self.written = {}
+        self.fail = set()
+
+    @contextmanager
+    def transaction(self):
+        yield
+
+    def writer(self, table, records):
+        if table in self.fail:
+            self.fail.discard(table)
+            raise Error(msg=f"{table} write failed")
+        self.written.setdefault(table, []).extend(records)
+        return len(records)
+
+
+def batting(match_id, player_id):
+    return BattingInnings(match_id, player_id, f"Player {player_id}", 10, 12, 83.33, "not out", "India", 1)
+
+
+def new_buffer(db):
+    buffer = WriteBuffer(db, batch_size=1000, flush_interval=3600)
+    buffer.register("batting_data", partial(db.writer, "batting_data"),
+                    partial(ColumnBatch, BattingInnings), match_ids=column_match_ids)
+    buffer.register("bowling_data", partial(db.writer, "bowling_data"),
+                    match_ids=lambda rows: {row[0] for row in rows})
+    buffer.register("scorecard_innings_hashes", partial(db.writer, "scorecard_innings_hashes"), progress=True)
+    buffer.register("scorecard_watermarks", partial(db.writer, "scorecard_watermarks"), progress=True)
+    return buffer
+
+
+def test_failed_table_flush_withholds_later_progress_records():
+    db = FakeDatabase()
+    buffer = new_buffer(db)
+
+    # First flush: match 1's batting rows fail to write
+    buffer.add("batting_data", [batting(1, 10), batting(1, 11)])
+    db.fail.add("batting_data")
+    assert buffer.flush() is False
+    assert buffer.failed_matches == {1}
+
+    # A later flush carries fingerprints and watermarks for matches 1 and 2
+    buffer.add("batting_data", [batting(2, 20)])
+    buffer.add("scorecard_innings_hashes", [(1, 1, "aaa"), (2, 1, "bbb")])
+    buffer.add("scorecard_watermarks", [(1, "India won"), (2, "Stumps")])
+    assert buffer.flush() is True
+
+    assert [r.match_id for r in db.written["batting_data"]] == [2]
+    assert db.written["scorecard_innings_hashes"] == [(2, 1, "bbb")]
+    assert db.written["scorecard_watermarks"] == [(2, "Stumps")]
+
+
+def test_tables_dropped_after_a_failure_count_as_lost():
+    db = FakeDatabase()
+    buffer = new_buffer(db)
+
+    buffer.add("batting_data", [batting(1, 10)])
+    buffer.add("bowling_data", [(3, 30)])
+    buffer.add("scorecard_watermarks", [(1, "India won"), (3, "Stumps"), (4, "Stumps")])
+    db.fail.add("batting_data")
+    assert buffer.flush() is False
+    assert buffer.failed_matches == {1, 3}
+    assert "scorecard_watermarks" not in db.written
+
+    buffer.add("scorecard_watermarks", [(3, "Stumps"), (4, "Stumps")])
+    buffer.flush()
+    assert db.written["scorecard_watermarks"] == [(4, "Stumps")]
+
+
+def test_matches_rewritten_by_a_later_flush_are_released():
+    db = FakeDatabase()
+    buffer = new_buffer(db)
+
+    buffer.add("batting_data", [batting(1, 10)])
+    buffer.add("bowling_data", [(1, 30)])
+    db.fail.add("bowling_data")
+    assert buffer.flush() is False
+    assert buffer.failed_matches == {1}
+
+    # The next cycle fetches match 1 again and all of its rows are written
+    buffer.add("batting_data", [batting(1, 10)])
+    buffer.add("bowling_data", [(1, 30)])
+    buffer.add("scorecard_watermarks", [(1, "India won")])
+    assert buffer.flush() is True
+    assert buffer.failed_matches == set()
+    assert db.written["scorecard_watermarks"] == [(1, "India won")]
+
+
+def test_a_partly_rewritten_match_stays_withheld():
+    db = FakeDatabase()
+    buffer = new_buffer(db)
+
+    buffer.add("batting_data", [batting(1, 10)])
+    db.fail.add("batting_data")
+    buffer.flush()
+
+    buffer.add("batting_data", [batting(1, 10)])
+    buffer.add("bowling_data", [(1, 30)])
+    buffer.add("scorecard_watermarks", [(1, "India won")])
+    db.fail.add("bowling_data")
+    assert buffer.flush() is False
+    assert buffer.failed_matches == {1}
+    assert "scorecard_watermarks" not in db.written
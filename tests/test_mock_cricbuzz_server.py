@@ -0,0 +1,53 @@
+from mock_cricbuzz_server import HISTORY_MATCH_ID_BASE, MockCricbuzzServer, SyntheticData
+from utils.fixtures import FixtureArchive
+
+RECORDED = {
+    "matchHeader": {"matchId": 1234, "team1": {"id": 2, "name": "India"},
+                    "team2": {"id": 4, "name": "Australia"}},
+    "scorecard": [{
+        "matchId": "1234", "inningsId": 1, "batteamid": 2, "batteamname": "India",
+        "batsman": [{"id": 1413, "name": "Virat Kohli", "runs": 50},
+                    {"id": 576, "name": "Rohit Sharma", "runs": 20}],
+        "bowler": [{"id": 8095, "name": "Pat Cummins", "wickets": 2}],
+        "partnership": {"partnership": [{"bat1id": 1413, "bat2id": 576, "totalruns": 40}]},
+    }],
+    "ismatchcomplete": True,
+}
+
+
+def scorecard(match_id):
+    archive = FixtureArchive({"key": [{"path": "/mcenter/v1/1234/scard", "params": {},
+                                       "status": 200, "body": RECORDED}]})
+    server = MockCricbuzzServer(("127.0.0.1", 0), archive=archive,
+                                synthetic=SyntheticData(history_matches=2))
+    try:
+        route, status, payload = server.resolve(f"/mcenter/v1/{match_id}/scard", {})
+    finally:
+        server.server_close()
+    assert (route, status) == ("scorecard", 200)
+    return payload
+
+
+def player_ids(payload):
+    innings = payload["scorecard"][0]
+    return [p["id"] for p in innings["batsman"] + innings["bowler"]]
+
+
+def test_template_scorecard_is_rebased_onto_each_synthetic_match():
+    first, second = scorecard(HISTORY_MATCH_ID_BASE), scorecard(HISTORY_MATCH_ID_BASE + 1)
+
+    assert first["matchHeader"]["matchId"] == HISTORY_MATCH_ID_BASE
+    assert first["scorecard"][0]["matchId"] == str(HISTORY_MATCH_ID_BASE)
+    assert not set(player_ids(first)) & set(player_ids(second))
+    assert not set(player_ids(first)) & {1413, 576, 8095}
+    assert len(set(player_ids(first))) == 3
+
+    # Ids stay consistent within the match, and team ids with the batting side
+    innings = first["scorecard"][0]
+    stand = innings["partnership"]["partnership"][0]
+    assert [stand["bat1id"], stand["bat2id"]] == [p["id"] for p in innings["batsman"]]
+    assert innings["batteamid"] == first["matchHeader"]["team1"]["id"] != 2
+    assert first["matchHeader"]["team2"]["id"] != second["matchHeader"]["team2"]["id"]
+    assert innings["inningsId"] == 1 and innings["batsman"][0]["runs"] == 50
+    # The recorded payload itself is left untouched
+    assert RECORDED["scorecard"][0]["batsman"][0]["id"] == 1413
@@ -0,0 +1,93 @@
+import pytest
+from mysql.connector import Error
+
+from utils.player_resolver import PlayerResolver, normalize_name
+from utils.telemetry import Telemetry
+
+
+def test_normalize_name_strips_markers_and_accents():
+    assert normalize_name("Rohit Sharma (c)") == "rohit sharma"
+    assert normalize_name("Dinesh Chándimal (wk)") == "dinesh chandimal"
+
+
+def test_resolve_and_flush_against_connection(players_conn):
+    conn = players_conn([(1413, "Virat Kohli"), (None, "Jasprit Bumrah")])
+    resolver = PlayerResolver(conn, telemetry=Telemetry())
+
+    assert resolver.load() == 2
+    assert resolver.resolve("Virat Kohli (c)", 1413) == 1
+    # Name hit: the Cricbuzz id is linked on the next flush
+    assert resolver.resolve("Jasprit Bumrah", 9311) == 2
+    assert resolver.resolve_or_add("Shubman Gill", 11808, "India") is None
+
+    assert resolver.flush() == 1
+    assert conn.players[1]["cricbuzz_player_id"] == 9311
+    gill = conn.players[2]
+    assert (gill["name"], gill["cricbuzz_player_id"]) == ("Shubman Gill", 11808)
+    assert resolver.resolve("Shubman Gill", 11808) == gill["player_id"]
+    assert resolver.stats["added"] == 1
+
+
+def test_same_name_with_a_different_cricbuzz_id_is_a_new_player(players_conn):
+    conn = players_conn([(576, "Mohammad Nabi")])
+    resolver = PlayerResolver(conn)
+    resolver.load()
+
+    # Exact name, initial + surname and fuzzy matches all point at the stored player
+    for name in ("Mohammad Nabi", "M Nabi", "Mohammed Nabi"):
+        assert resolver.resolve(name, 99001) is None
+    assert resolver.stats["id_conflicts"] == 3
+    assert resolver.resolve_or_add("Mohammad Nabi", 99001) is None
+    resolver.flush()
+
+    assert [(p["player_id"], p["cricbuzz_player_id"]) for p in conn.players] == [(1, 576), (2, 99001)]
+    assert resolver.resolve("Mohammad Nabi", 576) == 1
+    assert resolver.resolve("Mohammad Nabi", 99001) == 2
+    # Without an id the name is now ambiguous, so it is not guessed
+    assert resolver.resolve("Mohammad Nabi") is None
+    assert not conn.written("UPDATE")
+
+
+def test_name_match_links_players_without_a_cricbuzz_id(players_conn):
+    conn = players_conn([(None, "Rashid Khan")])
+    resolver = PlayerResolver(conn)
+    resolver.load()
+
+    assert resolver.resolve("Rashid Khan", 2885) == 1
+    # Once linked, another id under the same name is someone else
+    assert resolver.resolve("Rashid Khan", 7777) is None
+    resolver.flush()
+    assert conn.players[0]["cricbuzz_player_id"] == 2885
+
+
+def test_flush_reports_writes_to_players(players_conn):
+    conn = players_conn([(None, "Jasprit Bumrah")])
+    written = []
+    resolver = PlayerResolver(conn, on_write=written.append)
+    resolver.load()
+    resolver.resolve("Jasprit Bumrah", 9311)
+    resolver.add("Shubman Gill", 11808)
+
+    resolver.flush()
+    assert written == ["players", "players"]
+
+
+def test_failed_flush_raises_and_keeps_the_queue(players_conn):
+    conn = players_conn([(None, "Jasprit Bumrah")])
+    resolver = PlayerResolver(conn, batch_size=1)
+    resolver.load()
+    resolver.resolve("Jasprit Bumrah", 9311)
+    resolver.add("Shubman Gill", 11808)
+    resolver.add("Yashasvi Jaiswal", 13940)
+    # Batches fill without writing anything until flush() is called
+    assert not conn.written("INSERT")
+
+    conn.fail = "INSERT INTO players"
+    with pytest.raises(Error):
+        resolver.flush()
+    assert resolver.resolve("Shubman Gill", 11808) is None
+
+    assert resolver.flush() == 2
+    assert conn.players[0]["cricbuzz_player_id"] == 9311
+    assert resolver.resolve("Shubman Gill", 11808) is not None
+    assert resolver.resolve("Yashasvi Jaiswal", 13940) is not None
@@ -0,0 +1,27 @@
+from utils.query_cache import QueryCache
+
+
+def test_entries_without_a_shared_backend_expire_after_the_local_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("utils.query_cache.time.time", lambda: now[0])
+    cache = QueryCache(local_max_age=300)
+    runs = []
+
+    def run():
+        runs.append(1)
+        return len(runs)
+
+    sql = "SELECT * FROM players"
+    assert cache.get_or_run("h", "u", "db", sql, run) == 1
+    now[0] += 299
+    assert cache.get_or_run("h", "u", "db", sql, run) == 1
+    # A write made by another process is never bumped here, so age alone expires it
+    now[0] += 2
+    assert cache.get_or_run("h", "u", "db", sql, run) == 2
+
+    cache.bump("h", "db", ["players"])
+    assert cache.get_or_run("h", "u", "db", sql, run) == 3
+    # Shorter max ages (schema lookups) still apply
+    assert cache.get_or_run("h", "u", "db", "SHOW TABLES", run, tables=[], max_age=10) == 4
+    now[0] += 11
+    assert cache.get_or_run("h", "u", "db", "SHOW TABLES", run, tables=[], max_age=10) == 5
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+from utils.rate_limiter import (MonthlyUsage, QuotaExceededError, RateLimiter, SharedBudget,
+                                endpoint_rates_from_env)
+
+
+def test_monthly_quota_holds_across_restarts(tmp_path):
+    path = str(tmp_path / "usage.json")
+    first = RateLimiter(requests_per_second=1000, monthly_quota=3, usage=MonthlyUsage(path))
+    first.acquire("live_matches")
+    first.acquire("live_matches")
+    first.save_usage()
+
+    # A new process (daemon restart, next fetch run) starts from the stored count
+    second = RateLimiter(requests_per_second=1000, monthly_quota=3, usage=MonthlyUsage(path))
+    assert second.stats()["totals"]["month_used"] == 2
+    second.acquire("scorecard")
+    with pytest.raises(QuotaExceededError):
+        second.acquire("scorecard")
+    with pytest.raises(QuotaExceededError):
+        first.acquire("live_matches")
+    assert MonthlyUsage(path).used() == 3
+
+
+def test_monthly_usage_starts_over_in_a_new_month(tmp_path):
+    path = tmp_path / "usage.json"
+    path.write_text(json.dumps({"month": "1999-01", "used": 500}))
+    usage = MonthlyUsage(str(path))
+    assert usage.used() == 0
+    assert usage.claim(10) == 1
+    assert usage.add(4) == 5
+
+
+def test_shared_budget_starts_from_and_writes_back_the_monthly_count(tmp_path):
+    path = str(tmp_path / "usage.json")
+    MonthlyUsage(path).add(5)
+
+    budget = SharedBudget(1000, monthly_quota=8, usage=MonthlyUsage(path))
+    worker = RateLimiter(requests_per_second=1000, monthly_quota=8, shared=budget)
+    worker.acquire("scorecard")
+    worker.acquire("scorecard")
+    assert budget.requests.value == 7 and budget.run_requests() == 2
+
+    # Another process uses the API while the pool runs
+    MonthlyUsage(path).add(1)
+    assert budget.save() == 8
+    assert budget.run_requests() == 2
+    assert worker.quota_exhausted()
+    with pytest.raises(QuotaExceededError):
+        worker.acquire("scorecard")
+    assert budget.save() == 8 and MonthlyUsage(path).used() == 8
+
+
+def test_usage_file_is_written_in_batches(tmp_path):
+    path = str(tmp_path / "usage.json")
+    limiter = RateLimiter(requests_per_second=1000, monthly_quota=1000, usage=MonthlyUsage(path),
+                          usage_sync_every=5, usage_sync_seconds=3600)
+    for _ in range(5):
+        limiter.acquire("scorecard")
+    assert MonthlyUsage(path).used() == 0
+
+    MonthlyUsage(path).add(10)
+    limiter.acquire("scorecard")
+    # The batch went out with the next request, which also saw the other process's requests
+    assert MonthlyUsage(path).used() == 15
+    assert limiter.stats()["totals"]["month_used"] == 16
+    assert limiter.save_usage() == 16
+
+
+def test_endpoint_rates_come_from_the_environment(monkeypatch):
+    monkeypatch.setenv("RAPIDAPI_ENDPOINT_RPS", "scorecard=2, player_stats = 0.5,bad")
+    rates = endpoint_rates_from_env()
+    assert rates == {"scorecard": 2.0, "player_stats": 0.5}
+    limiter = RateLimiter(requests_per_second=10, endpoint_rates=rates)
+    assert limiter._bucket("scorecard").rate == 2.0
+    assert limiter._bucket("live_matches").rate == 10.0
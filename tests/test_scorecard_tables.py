@@ -0,0 +1,135 @@
+import pytest
+
+from utils.records import Partnership
+from utils.scorecard_tables import FielderIndex, derive_match_tables, innings_partnerships, parse_dismissal
+
+
+@pytest.mark.parametrize("outdec, expected", [
+    ("c Smith b Starc", ("catch", ["Smith"])),
+    ("c †KL Rahul b Siraj", ("catch", ["KL Rahul"])),
+    ("c & b Starc", ("catch", ["Starc"])),
+    ("c and b Starc", ("catch", ["Starc"])),
+    ("c sub (Axar Patel) b Bumrah", ("catch", ["Axar Patel"])),
+    ("st †Carey b Zampa", ("stumping", ["Carey"])),
+    ("run out (Maxwell)", ("run_out", ["Maxwell"])),
+    ("run out (Smith/Carey)", ("run_out", ["Smith", "Carey"])),
+    ("run out (sub [Agar]/†Carey)", ("run_out", ["Agar", "Carey"])),
+    ("  c  Smith   b  Starc ", ("catch", ["Smith"])),
+    ("b Starc", (None, [])),
+    ("lbw b Cummins", (None, [])),
+    ("hit wicket b Starc", (None, [])),
+    ("not out", (None, [])),
+    ("", (None, [])),
+    (None, (None, [])),
+])
+def test_parse_dismissal(outdec, expected):
+    assert parse_dismissal(outdec) == expected
+
+
+AUSTRALIA = [(1, "Steven Smith"), (2, "Alex Carey"), (3, "Mitchell Starc"),
+             (4, "Mitchell Marsh"), (5, "Shaun Marsh"), (6, "Glenn Maxwell")]
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("Steven Smith", (1, "Steven Smith")),
+    ("steven smith", (1, "Steven Smith")),
+    ("Smith", (1, "Steven Smith")),
+    ("†Carey", (2, "Alex Carey")),
+    ("S Smith", (1, "Steven Smith")),
+    ("Marsh", None),             # two Marshes: ambiguous
+    ("Mitchell Marsh", (4, "Mitchell Marsh")),
+    ("Agar", None),              # a substitute who neither batted nor bowled
+    ("", None),
+])
+def test_fielder_index_lookup(name, expected):
+    assert FielderIndex(AUSTRALIA).lookup(name) == expected
+
+
+def batter(cb_id, name, outdec="", runs=10):
+    return {"id": cb_id, "name": name, "runs": runs, "balls": 10, "strkrate": 100.0, "outdec": outdec}
+
+
+def test_partnerships_come_from_the_scorecard_list_when_present():
+    innings = {"inningsId": 2, "partnership": {"partnership": [
+        {"bat1name": "Rohit Sharma", "bat2name": "Shubman Gill", "totalruns": 60},
+        {"bat1name": "Virat Kohli", "bat2name": "Shubman Gill", "totalruns": 25},
+    ]}}
+    assert innings_partnerships(7, innings) == [
+        Partnership(7, 2, "Rohit Sharma", "Shubman Gill", 60, 1),
+        Partnership(7, 2, "Virat Kohli", "Shubman Gill", 25, 2),
+    ]
+
+
+def test_partnerships_are_rebuilt_from_the_fall_of_wickets():
+    innings = {
+        "inningsId": 1, "score": 150,
+        "batsman": [batter(11, "Rohit Sharma"), batter(12, "Shubman Gill"),
+                    batter(13, "Virat Kohli"), batter(14, "Shreyas Iyer")],
+        # Out of order on purpose; the second wicket is matched by name only
+        "fow": {"fow": [{"batsmanid": None, "batsmanname": "Shubman Gill", "runs": 90},
+                        {"batsmanid": 11, "batsmanname": "Rohit Sharma", "runs": 40}]},
+    }
+    assert innings_partnerships(7, innings) == [
+        Partnership(7, 1, "Rohit Sharma", "Shubman Gill", 40, 1),
+        Partnership(7, 1, "Shubman Gill", "Virat Kohli", 50, 2),
+        # Unbroken stand at the end of the innings
+        Partnership(7, 1, "Virat Kohli", "Shreyas Iyer", 60, 3),
+    ]
+
+
+def test_rebuilding_stops_when_the_fall_of_wickets_names_nobody_at_the_crease():
+    innings = {
+        "inningsId": 1, "score": 100,
+        "batsman": [batter(11, "Rohit Sharma"), batter(12, "Shubman Gill"), batter(13, "Virat Kohli")],
+        "fow": {"fow": [{"batsmanid": 13, "batsmanname": "Virat Kohli", "runs": 30},
+                        {"batsmanid": 12, "batsmanname": "Shubman Gill", "runs": 70}]},
+    }
+    assert innings_partnerships(7, innings) == [Partnership(7, 1, "Rohit Sharma", "Shubman Gill", 30, 1)]
+
+
+def test_fewer_than_two_batters_give_no_partnerships():
+    assert innings_partnerships(7, {"batsman": [batter(11, "Rohit Sharma")]}) == []
+
+
+def test_derive_match_tables_credits_fielders_of_the_fielding_side():
+    scorecard = {"scorecard": [
+        {
+            "inningsId": 1, "batteamname": "India", "bowlteamname": "Australia", "score": 60,
+            "batsman": [
+                batter(11, "Rohit Sharma", "c Smith b Starc"),
+                batter(12, "Shubman Gill", "c & b Starc"),
+                batter(13, "Virat Kohli", "st †Carey b Maxwell"),
+                batter(14, "KL Rahul", "run out (Smith/†Carey)"),
+                batter(15, "Hardik Pandya", "c sub (Agar) b Starc"),
+                batter(16, "Ravindra Jadeja", "c Marsh b Starc"),
+                batter(17, "Axar Patel", "not out"),
+            ],
+            "bowler": [{"id": 3, "name": "Mitchell Starc", "overs": 4, "runs": 30, "wickets": 4,
+                        "economy": 7.5},
+                       {"id": 6, "name": "Glenn Maxwell", "overs": 2, "runs": 20, "wickets": 1,
+                        "economy": 10.0}],
+        },
+        {
+            "inningsId": 2, "batteamname": "Australia", "bowlteamname": "India", "score": 10,
+            "batsman": [batter(1, "Steven Smith"), batter(2, "Alex Carey"),
+                        batter(4, "Mitchell Marsh"), batter(5, "Shaun Marsh")],
+            "bowler": [],
+        },
+    ]}
+    # Every Cricbuzz id is known; player_id = 100 + Cricbuzz id
+    tables = derive_match_tables(7, scorecard, lambda name, cb_id: 100 + cb_id if cb_id else None,
+                                 match_format="T20", venue="Wankhede Stadium")
+
+    fielding = {r.player_id: (r.catches, r.stumpings, r.run_outs) for r in tables["fielding_data"]}
+    assert fielding == {
+        101: (1, 0, 1),   # Smith: a catch and a shared run out
+        103: (1, 0, 0),   # Starc: caught and bowled
+        102: (0, 1, 1),   # Carey: a stumping and a shared run out
+    }
+    # The substitute and the ambiguous "Marsh" are left uncredited
+    assert all(r.format == "T20" for r in tables["fielding_data"])
+    assert [r.player_id for r in tables["bowlers_bowling_venue_data"]] == [103, 106]
+    assert {r.venue for r in tables["bowlers_bowling_venue_data"]} == {"Wankhede Stadium"}
+    assert len(tables["batters_batting_data"]) == 11
+    assert set(tables) == {"players_partnerships_data", "fielding_data",
+                           "batters_batting_data", "bowlers_bowling_venue_data"}
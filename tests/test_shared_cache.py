@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+
+from utils import shared_cache
+from utils.shared_cache import decode_value, encode_value
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({"player": ["Kohli", "Root"], "runs": [12898, 11000], "avg": [57.3, 50.1]})
+
+
+def test_dataframes_round_trip_through_arrow(frame):
+    blob = encode_value(frame)
+    assert blob[:1] == b"A"
+    pd.testing.assert_frame_equal(decode_value(blob), frame)
+
+
+def test_dataframes_fall_back_to_json_without_pyarrow(frame, monkeypatch):
+    monkeypatch.setattr(shared_cache, "pa", None)
+    blob = encode_value(frame)
+    assert blob[:1] == b"D"
+    pd.testing.assert_frame_equal(decode_value(blob), frame)
+
+
+def test_columns_arrow_cannot_type_are_shared_as_json():
+    frame = pd.DataFrame({"value": [1, "two", 3.5]})
+    blob = encode_value(frame)
+    assert blob[:1] == b"D"
+    assert decode_value(blob)["value"].tolist() == [1, "two", 3.5]
+
+
+def test_plain_values_are_json():
+    assert decode_value(encode_value([[1, "a"], [2, "b"]])) == [[1, "a"], [2, "b"]]
+    assert encode_value(object()) is None
+
+
+def test_overwriting_a_key_counts_only_the_size_difference(tmp_path):
+    backend = shared_cache.FileCacheBackend(str(tmp_path), max_bytes=10_000)
+    for _ in range(100):
+        assert backend.set("live", b"x" * 1000)
+    assert backend.stats()["approx_bytes"] == backend._scan_size()
+    assert backend.stats()["evictions"] == 0
+
+    backend.set("live", b"x" * 10)
+    backend.set("other", b"y" * 500)
+    backend.delete("other")
+    assert backend.stats()["approx_bytes"] == backend._scan_size()
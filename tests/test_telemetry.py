@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+
+from fetch_api_data import build_run_report, run_counters
+from utils.ingest_pipeline import WriteBuffer
+from utils.rate_limiter import RateLimiter
+from utils.resilience import RetryPolicy
+from utils.response_cache import ResponseCache
+from utils.telemetry import Histogram, Telemetry, get_telemetry
+
+
+def test_histogram_since_keeps_only_later_observations():
+    h = Histogram()
+    h.observe(0.003)
+    h.observe(4.0)
+    earlier = h.copy()
+    h.observe(0.02)
+
+    delta = h.since(earlier)
+    assert delta.count == 1
+    assert round(delta.sum, 6) == 0.02
+    assert delta.max == 0.025
+
+
+def test_snapshot_since_checkpoint():
+    telemetry = Telemetry()
+    telemetry.observe_api("live_matches", 0.2, 200)
+    telemetry.count_cache("live_matches", hit=False)
+    telemetry.observe_db("INSERT INTO players (name) VALUES (%s)", 0.01, rows=3)
+    checkpoint = telemetry.checkpoint()
+    telemetry.count_cache("live_matches", hit=True)
+    telemetry.observe_db("INSERT INTO players (name) VALUES (%s)", 0.01, rows=2)
+
+    snapshot = telemetry.snapshot(since=checkpoint)
+    assert snapshot["api"]["live_matches"]["count"] == 0
+    assert snapshot["api"]["live_matches"]["cache"] == {"hits": 1, "misses": 0}
+    assert snapshot["db"]["insert players"]["count"] == 1
+    assert snapshot["db"]["insert players"]["rows"] == 2
+    assert telemetry.snapshot()["db"]["insert players"]["rows"] == 5
+
+
+class FakeTransport:
+    def __init__(self):
+        self.retry_policy = RetryPolicy()
+        self.sent = 0
+
+    def connection_stats(self):
+        return {"connections_opened": 1, "requests_sent": self.sent,
+                "connections_reused": max(0, self.sent - 1)}
+
+
+def test_run_report_counts_only_the_run(tmp_path):
+    client = SimpleNamespace(transport=FakeTransport(), cache=ResponseCache(str(tmp_path)),
+                             limiter=RateLimiter(requests_per_second=1000), dead_letters=[])
+    # Earlier activity in the same process (another job, page views)
+    for _ in range(3):
+        client.limiter.acquire("live_matches")
+        client.transport.retry_policy.record_request()
+    client.transport.sent = 3
+    get_telemetry().observe_api("live_matches", 0.1, 200)
+
+    baseline = run_counters(client)
+    client.limiter.acquire("scorecard")
+    client.transport.retry_policy.record_request()
+    client.transport.sent = 4
+    get_telemetry().observe_api("scorecard", 0.1, 200)
+
+    report, _ = build_run_report(client, WriteBuffer(None), 0, baseline=baseline)
+    assert report["rate_limiter"]["tokens_used"] == 1
+    assert report["retries"]["requests"] == 1
+    assert report["http_pool"] == {"connections_opened": 0, "requests_sent": 1, "connections_reused": 1}
+    assert list(report["api"]) == ["scorecard"]
@@ -0,0 +1,67 @@
+import os
+import tempfile
+from contextlib import contextmanager
+from datetime import date, datetime, time as dt_time
+from decimal import Decimal
+
+from utils.response_cache import PROJECT_ROOT
+
+# LOAD DATA LOCAL INFILE only reads files from this directory (allow_local_infile_in_path)
+BULK_LOAD_DIR = os.path.join(PROJECT_ROOT, ".cache", "bulk_load")
+
+# MySQL's default LOAD DATA escaping: backslash sequences, \N for NULL
+_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r", "\0": "\\0"})
+
+
+def tsv_value(value):
+    """One field as LOAD DATA reads it with the default FIELDS/LINES options."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, (int, Decimal)):
+        return str(value)
+    if isinstance(value, float):
+        return repr(value)
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+    if isinstance(value, (date, dt_time)):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        value = value.decode("utf-8")
+    return str(value).translate(_ESCAPES)
+
+
+def write_tsv(f, rows):
+    """Stream rows (tuples) into an open text file; returns the number written."""
+    count = 0
+    for row in rows:
+        f.write("\t".join(map(tsv_value, row)))
+        f.write("\n")
+        count += 1
+    return count
+
+
+@contextmanager
+def tsv_file(rows, directory=BULK_LOAD_DIR):
+    """Write rows to a temporary TSV file and yield (path, row_count); the file is removed after."""
+    os.makedirs(directory, exist_ok=True)
+    fd, path = tempfile.mkstemp(dir=directory, prefix="load-", suffix=".tsv")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            count = write_tsv(f, rows)
+        yield path, count
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def load_data_sql(table, columns):
+    """LOAD DATA LOCAL INFILE statement for a file written by write_tsv (path as the parameter)."""
+    return (f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} "
+            f"CHARACTER SET utf8mb4 "
+            f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' "
+            f"LINES TERMINATED BY '\\n' "
+            f"({', '.join(columns)})")
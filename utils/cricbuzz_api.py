@@ -0,0 +1,238 @@
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+from utils.fixtures import FixtureRecorder
+from utils.rate_limiter import get_rate_limiter
+from utils.response_cache import get_response_cache
+from utils.telemetry import get_telemetry
+from utils.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    TransientAPIError,
+    is_retryable_status,
+)
+
+CRICBUZZ_HOST = "cricbuzz-cricket.p.rapidapi.com"
+CRICBUZZ_BASE_URL = f"https://{CRICBUZZ_HOST}"
+
+
+class CricbuzzTransport:
+    """Single pooled HTTP transport used by every Cricbuzz caller in the project.
+
+    One `requests.Session` keeps TCP/TLS connections alive across calls and
+    threads, asks for gzip-compressed bodies, and routes every request through
+    the shared response cache and rate limiter. Failed calls are retried with
+    jittered exponential backoff when the status says it is worth it, and a
+    per-endpoint circuit breaker fails fast while the upstream is unhealthy.
+    Per-endpoint latency and connection-reuse counters are available from
+    `stats()`. With a `recorder`, every network response is also saved to a
+    fixture archive that `mock_cricbuzz_server.py` can replay.
+    """
+
+    def __init__(self, api_key=None, base_url=CRICBUZZ_BASE_URL, pool_size=10,
+                 timeout=10, limiter=None, cache=None, retry_policy=None,
+                 breaker_threshold=5, breaker_reset=30.0, recorder=None, telemetry=None):
+        self.base_url = base_url.rstrip("/")
+        self.recorder = recorder
+        self.telemetry = telemetry or get_telemetry()
+        self.timeout = timeout
+        self.limiter = limiter or get_rate_limiter()
+        self.cache = cache or get_response_cache()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset = breaker_reset
+        self._breakers = {}
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            "x-rapidapi-key": api_key or "",
+            "x-rapidapi-host": CRICBUZZ_HOST,
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+        })
+        # pool_block makes extra threads wait for a pooled connection instead of
+        # opening (and then discarding) one-off connections.
+        self._adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount("https://", self._adapter)
+        self.session.mount("http://", self._adapter)
+
+        self._lock = threading.Lock()
+        self._latency = {}
+
+    def _record_latency(self, endpoint, seconds):
+        with self._lock:
+            stats = self._latency.get(endpoint)
+            if stats is None:
+                stats = self._latency[endpoint] = {
+                    "calls": 0, "total": 0.0, "min": None, "max": 0.0, "last": 0.0,
+                }
+            stats["calls"] += 1
+            stats["total"] += seconds
+            stats["last"] = seconds
+            stats["max"] = max(stats["max"], seconds)
+            stats["min"] = seconds if stats["min"] is None else min(stats["min"], seconds)
+
+    def breaker(self, endpoint):
+        """Return the circuit breaker guarding `endpoint`"""
+        with self._lock:
+            breaker = self._breakers.get(endpoint)
+            if breaker is None:
+                breaker = self._breakers[endpoint] = CircuitBreaker(
+                    self.breaker_threshold, self.breaker_reset
+                )
+            return breaker
+
+    def _send(self, endpoint, path, params):
+        """One rate-limited attempt. Returns the response or raises a requests exception."""
+        self.limiter.acquire(endpoint)
+        started = time.perf_counter()
+        status = "error"
+        try:
+            response = self.session.get(f"{self.base_url}{path}", params=params, timeout=self.timeout)
+            status = response.status_code
+        finally:
+            elapsed = time.perf_counter() - started
+            self._record_latency(endpoint, elapsed)
+            self.telemetry.observe_api(endpoint, elapsed, status)
+        self.limiter.observe(endpoint, response.status_code, response.headers)
+        return response
+
+    def get_json(self, endpoint, path, params=None, cache_params=None, cached_if=None):
+        """GET `path` and return (status_code, payload).
+
+        Cache hits are returned as status 200 without touching the network or
+        the rate limiter; `cached_if(payload)`, when given, decides whether a
+        cached payload may be served or must be fetched again. Permanent
+        failures (404 and other non-retryable 4xx) return a None payload.
+        Timeouts, connection errors, broken bodies, 429 and 5xx are retried; if
+        they still fail, or the endpoint's breaker is open, TransientAPIError
+        is raised.
+        """
+        cache_params = cache_params if cache_params is not None else params
+        cached = self.cache.get(endpoint, cache_params)
+        if cached is not None and cached_if is not None and not cached_if(cached):
+            cached = None
+        self.telemetry.count_cache(endpoint, cached is not None)
+        if cached is not None:
+            return 200, cached
+
+        breaker = self.breaker(endpoint)
+        self.retry_policy.record_request()
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                raise CircuitOpenError(endpoint, "circuit open, upstream unhealthy")
+
+            retry_after = None
+            try:
+                response = self._send(endpoint, path, params)
+                payload = response.json() if response.status_code == 200 else None
+            except requests.RequestException as e:
+                # Connection errors, timeouts, truncated bodies, invalid JSON
+                breaker.record_failure()
+                last_error = TransientAPIError(endpoint, f"{type(e).__name__}: {e}")
+            except BaseException:
+                # Not an upstream failure (e.g. QuotaExceededError): free the probe slot
+                breaker.release_probe()
+                raise
+            else:
+                status = response.status_code
+                if status == 200:
+                    breaker.record_success()
+                    if self.recorder is not None:
+                        self.recorder.record(path, params, status, payload)
+                    return 200, self.cache.set(endpoint, cache_params, payload)
+                if not is_retryable_status(status):
+                    # The upstream answered; a 404 says nothing about its health
+                    breaker.record_success()
+                    if self.recorder is not None:
+                        self.recorder.record(path, params, status, None)
+                    return status, None
+                breaker.record_failure()
+                retry_after = response.headers.get("retry-after")
+                last_error = TransientAPIError(endpoint, f"HTTP {status}", status)
+
+            attempt += 1
+            if attempt > self.retry_policy.max_retries or not self.retry_policy.try_spend_retry():
+                raise last_error
+            self.telemetry.count_retry(endpoint)
+            try:
+                delay = self.retry_policy.backoff(attempt, retry_after)
+            except ValueError:
+                delay = self.retry_policy.backoff(attempt)
+            time.sleep(delay)
+
+    def connection_stats(self):
+        """Connections opened vs. requests served by the keep-alive pool."""
+        pool = self._adapter.poolmanager.connection_from_url(self.base_url)
+        opened = getattr(pool, "num_connections", 0)
+        served = getattr(pool, "num_requests", 0)
+        return {
+            "connections_opened": opened,
+            "requests_sent": served,
+            "connections_reused": max(0, served - opened),
+        }
+
+    def stats(self):
+        with self._lock:
+            latency = {
+                endpoint: {
+                    "calls": s["calls"],
+                    "avg_ms": round(1000 * s["total"] / s["calls"], 1) if s["calls"] else 0.0,
+                    "min_ms": round(1000 * (s["min"] or 0.0), 1),
+                    "max_ms": round(1000 * s["max"], 1),
+                    "last_ms": round(1000 * s["last"], 1),
+                }
+                for endpoint, s in self._latency.items()
+            }
+            breakers = {
+                endpoint: {"state": b.state, "trips": b.trips, "rejected": b.rejected}
+                for endpoint, b in self._breakers.items()
+            }
+        return {
+            "latency": latency,
+            "connections": self.connection_stats(),
+            "retries": self.retry_policy.stats(),
+            "breakers": breakers,
+            "recorded": self.recorder.recorded if self.recorder is not None else 0,
+        }
+
+    def close(self):
+        self.session.close()
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport():
+    """Return the process-wide transport configured from .env.
+
+    CRICBUZZ_BASE_URL points the transport at another server (e.g. the local
+    mock); CRICBUZZ_RECORD names a zip archive to record responses into.
+    """
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                load_dotenv()
+                record_path = os.getenv("CRICBUZZ_RECORD")
+                _transport = CricbuzzTransport(
+                    api_key=os.getenv("RAPIDAPI_KEY"),
+                    base_url=os.getenv("CRICBUZZ_BASE_URL") or CRICBUZZ_BASE_URL,
+                    pool_size=int(os.getenv("CRICBUZZ_POOL_SIZE") or 10),
+                    timeout=float(os.getenv("CRICBUZZ_TIMEOUT") or 10),
+                    retry_policy=RetryPolicy(
+                        max_retries=int(os.getenv("CRICBUZZ_MAX_RETRIES") or 3),
+                    ),
+                    breaker_threshold=int(os.getenv("CRICBUZZ_BREAKER_THRESHOLD") or 5),
+                    breaker_reset=float(os.getenv("CRICBUZZ_BREAKER_RESET") or 30),
+                    recorder=FixtureRecorder(record_path) if record_path else None,
+                )
+    return _transport
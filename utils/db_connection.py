@@ -1,63 +1,71 @@
-import mysql.connector
+import os
 from mysql.connector import Error
 import pandas as pd
 import streamlit as st
 from sqlalchemy import create_engine
 from urllib.parse import quote_plus
+from utils.db_pool import get_connection_pool
+from utils.query_cache import SCHEMA, get_query_cache
 
 def create_connection(host, user, passwd, database=None):
-    """Create a new MySQL connection. Don't cache connections across reruns."""
-    return mysql.connector.connect(
-        host=host,
-        user=user,
-        password=passwd,
-        database=database,
-        autocommit=True,
-    )
+    """Check out a MySQL connection from the shared pool for these credentials.
+
+    The connection is autocommit; close() returns it to the pool.
+    """
+    return get_connection_pool(host, user, passwd, database).get_connection()
 
 @st.cache_data(ttl=300)
 def list_databases(host, user, passwd):
     """Returns a list of available user databases, excluding system databases."""
     conn = create_connection(host, user, passwd)
-    cursor = conn.cursor()
-    cursor.execute("SHOW DATABASES")
-    all_databases = [db[0] for db in cursor]
-    cursor.close()
-    conn.close()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SHOW DATABASES")
+        all_databases = [db[0] for db in cursor]
+        cursor.close()
+    finally:
+        conn.close()
 
     excluded_dbs = {"information_schema", "performance_schema", "mysql", "sys"}
     return sorted([db for db in all_databases if db not in excluded_dbs])
 
-@st.cache_data(ttl=300)
+def _metadata_rows(host, user, passwd, database, sql, params=()):
+    """Rows of a schema lookup, cached for DB_METADATA_CACHE_TTL seconds (default 300)."""
+    def load():
+        conn = create_connection(host, user, passwd, database)
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+            cursor.close()
+        finally:
+            conn.close()
+        return rows
+    # No write made through this app changes the schema, so these expire by age
+    return get_query_cache().get_or_run(
+        host, user, database, sql, load, params, tables=[SCHEMA],
+        max_age=float(os.getenv("DB_METADATA_CACHE_TTL") or 300),
+    )
+
 def list_tables(host, user, passwd, database):
     """Returns a list of tables for a specific database."""
     try:
-        conn = create_connection(host, user, passwd, database)
-        cursor = conn.cursor()
-        cursor.execute("SHOW FULL TABLES WHERE Table_type = 'BASE TABLE'")
-        tables = [row[0] for row in cursor.fetchall()]
-        cursor.close()
-        conn.close()
-        return sorted(tables)
+        rows = _metadata_rows(host, user, passwd, database,
+                              "SHOW FULL TABLES WHERE Table_type = 'BASE TABLE'")
+        return sorted(row[0] for row in rows)
     except Error:
         return []
 
-@st.cache_data(ttl=300)
 def get_table_columns(host, user, passwd, database, table):
     """Returns a list of columns for a specific table."""
     try:
-        conn = create_connection(host, user, passwd, database)
-        cursor = conn.cursor()
         col_q = """
             SELECT COLUMN_NAME, DATA_TYPE, IS_NULLABLE, COLUMN_KEY, COLUMN_DEFAULT, EXTRA
             FROM INFORMATION_SCHEMA.COLUMNS
             WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s
             ORDER BY ORDINAL_POSITION
         """
-        cursor.execute(col_q, (database, table))
-        cols = cursor.fetchall()
-        cursor.close()
-        conn.close()
+        cols = _metadata_rows(host, user, passwd, database, col_q, (database, table))
 
         return [
             {
@@ -73,24 +81,132 @@ def get_table_columns(host, user, passwd, database, table):
     except Error:
         return []
 
-def fetch_table(host, user, passwd, database, table, limit=200):
-    """Return dataframe and the exact SQL used."""
-    sql = f"SELECT * FROM `{table}` LIMIT {int(limit)};"
+def get_dependent_tables(host, user, passwd, database, table):
+    """Returns `table` and every table whose foreign keys lead to it (cascaded deletes and updates)."""
+    found = [table]
+    try:
+        for name in found:
+            rows = _metadata_rows(host, user, passwd, database, """
+                SELECT DISTINCT TABLE_NAME FROM INFORMATION_SCHEMA.KEY_COLUMN_USAGE
+                WHERE REFERENCED_TABLE_SCHEMA = %s AND REFERENCED_TABLE_NAME = %s
+            """, (database, name))
+            found.extend(row[0] for row in rows if row[0] not in found)
+    except Error:
+        pass
+    return found
+
+@st.cache_resource(show_spinner=False)
+def get_engine(host, user, passwd, database):
+    """Process-wide pooled SQLAlchemy engine, one per (host, user, database).
+
+    Shared by every session and rerun, so a query checks out a warm
+    connection instead of connecting and authenticating. Pool limits come from
+    DB_POOL_SIZE, DB_POOL_MAX_OVERFLOW, DB_POOL_TIMEOUT and DB_POOL_RECYCLE;
+    connections are pinged before use so ones the server dropped are replaced.
+    """
     password_encoded = quote_plus(passwd)
-    engine = create_engine(f"mysql+mysqlconnector://{user}:{password_encoded}@{host}/{database}")
-    df = pd.read_sql(sql, engine)
-    engine.dispose()
-    return df, sql
+    return create_engine(
+        f"mysql+mysqlconnector://{user}:{password_encoded}@{host}/{database}",
+        pool_size=int(os.getenv("DB_POOL_SIZE") or 5),
+        max_overflow=int(os.getenv("DB_POOL_MAX_OVERFLOW") or 10),
+        pool_timeout=float(os.getenv("DB_POOL_TIMEOUT") or 30),
+        # Below MySQL's wait_timeout so idle connections are renewed before the server drops them
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE") or 1800),
+        pool_pre_ping=True,
+    )
+
+def get_primary_key(host, user, passwd, database, table):
+    """Returns the primary key columns of a table in index order ([] if it has none)."""
+    try:
+        rows = _metadata_rows(host, user, passwd, database, """
+            SELECT COLUMN_NAME FROM INFORMATION_SCHEMA.STATISTICS
+            WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND INDEX_NAME = 'PRIMARY'
+            ORDER BY SEQ_IN_INDEX
+        """, (database, table))
+        return [row[0] for row in rows]
+    except Error:
+        return []
+
+def fetch_table(host, user, passwd, database, table, limit=200, key=None, direction="next",
+                inclusive=False):
+    """Return one page of a table as a dataframe, the SQL used and the page bounds.
+
+    Pages are found by seeking on the primary key rather than with OFFSET, so
+    any page costs one index range scan of `limit` rows however deep it is:
+    direction "next" reads the rows after `key` (from the start when None, or
+    from `key` itself when `inclusive`), "prev" the rows before it (the last
+    page when None). Rows stream through an unbuffered cursor straight into
+    the dataframe. The page dict holds the key columns, the first and last
+    key of the page (to pass back as `key`) and whether more rows exist on
+    either side; an inclusive seek checks for rows before `key` with a
+    one-row probe. Tables without a primary key return their first `limit` rows.
+    """
+    limit = int(limit)
+    key_columns = get_primary_key(host, user, passwd, database, table)
+    page = {"key_columns": key_columns, "first": None, "last": None,
+            "has_prev": False, "has_next": False}
+    params = []
+    probe = None
+    if not key_columns:
+        sql = f"SELECT * FROM `{table}` LIMIT {limit}"
+    else:
+        key_list = ", ".join(f"`{c}`" for c in key_columns)
+        backwards = direction == "prev"
+        where = ""
+        if key is not None:
+            params = list(key)
+            op = "<" if backwards else (">=" if inclusive else ">")
+            where = f" WHERE ({key_list}) {op} ({', '.join(['%s'] * len(params))})"
+            if inclusive and not backwards:
+                # The seek key may be the table's first row, so look for one before it
+                probe = (f"SELECT 1 FROM `{table}` WHERE ({key_list}) < "
+                         f"({', '.join(['%s'] * len(params))}) LIMIT 1")
+        order = ", ".join(f"`{c}` {'DESC' if backwards else 'ASC'}" for c in key_columns)
+        # One row beyond the page tells whether there is another page that way
+        sql = f"SELECT * FROM `{table}`{where} ORDER BY {order} LIMIT {limit + 1}"
+
+    conn = create_connection(host, user, passwd, database)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        columns = list(cursor.column_names)
+        rows = []
+        while True:
+            chunk = cursor.fetchmany(500)
+            if not chunk:
+                break
+            rows.extend(chunk)
+        cursor.close()
+        if probe:
+            cursor = conn.cursor()
+            cursor.execute(probe, params)
+            page["has_prev"] = bool(cursor.fetchall())
+            cursor.close()
+    finally:
+        conn.close()
+
+    if key_columns:
+        more = len(rows) > limit
+        rows = rows[:limit]
+        if direction == "prev":
+            rows.reverse()
+            page["has_prev"], page["has_next"] = more, key is not None
+        else:
+            page["has_next"] = more
+            if not probe:
+                page["has_prev"] = key is not None
+        if rows:
+            positions = [columns.index(c) for c in key_columns]
+            page["first"] = tuple(rows[0][i] for i in positions)
+            page["last"] = tuple(rows[-1][i] for i in positions)
+    df = pd.DataFrame.from_records(rows, columns=columns)
+    return df, sql, page
 
 def run_select(host, user, passwd, database, select_sql):
     """Run a user-provided SELECT (read-only)."""
     if not select_sql.strip().lower().startswith("select"):
         raise ValueError("Only SELECT queries are allowed here.")
-    password_encoded = quote_plus(passwd)
-    engine = create_engine(f"mysql+mysqlconnector://{user}:{password_encoded}@{host}/{database}")
-    df = pd.read_sql(select_sql, engine)
-    engine.dispose()
-    return df
+    return pd.read_sql(select_sql, get_engine(host, user, passwd, database))
 
 def insert_row(host, user, passwd, database, table, data):
     """Insert a row using parameterized SQL. Returns affected rows and SQL preview."""
@@ -100,11 +216,14 @@ def insert_row(host, user, passwd, database, table, data):
     values = list(data.values())
 
     conn = create_connection(host, user, passwd, database)
-    cur = conn.cursor()
-    cur.execute(sql, values)
-    affected = cur.rowcount
-    cur.close()
-    conn.close()
+    try:
+        cur = conn.cursor()
+        cur.execute(sql, values)
+        affected = cur.rowcount
+        cur.close()
+    finally:
+        conn.close()
+    get_query_cache().bump(host, database, [table])
     return affected, sql
 
 def delete_rows(host, user, passwd, database, table, where_clause):
@@ -114,11 +233,15 @@ def delete_rows(host, user, passwd, database, table, where_clause):
         raise ValueError("Refusing to delete without a WHERE clause.")
     sql = f"DELETE FROM `{table}` WHERE {where};"
     conn = create_connection(host, user, passwd, database)
-    cur = conn.cursor()
-    cur.execute(sql)
-    affected = cur.rowcount
-    cur.close()
-    conn.close()
+    try:
+        cur = conn.cursor()
+        cur.execute(sql)
+        affected = cur.rowcount
+        cur.close()
+    finally:
+        conn.close()
+    # Foreign keys may have cascaded the change into child tables
+    get_query_cache().bump(host, database, get_dependent_tables(host, user, passwd, database, table))
     return affected, sql
 
 def execute_update(host, user, passwd, database, table, set_clause, where_clause):
@@ -131,9 +254,13 @@ def execute_update(host, user, passwd, database, table, set_clause, where_clause
         raise ValueError("Refusing to update without a WHERE clause.")
     sql = f"UPDATE `{table}` SET {set_part} WHERE {where_part};"
     conn = create_connection(host, user, passwd, database)
-    cur = conn.cursor()
-    cur.execute(sql)
-    affected = cur.rowcount
-    cur.close()
-    conn.close()
+    try:
+        cur = conn.cursor()
+        cur.execute(sql)
+        affected = cur.rowcount
+        cur.close()
+    finally:
+        conn.close()
+    # Foreign keys may have cascaded the change into child tables
+    get_query_cache().bump(host, database, get_dependent_tables(host, user, passwd, database, table))
     return affected, sql
@@ -0,0 +1,160 @@
+import hashlib
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+from mysql.connector import Error
+from mysql.connector.errors import PoolError
+from mysql.connector.pooling import CNX_POOL_MAXSIZE, MySQLConnectionPool
+
+
+class PooledConnection:
+    """A connection checked out of a ConnectionPool.
+
+    Behaves like the mysql.connector connection it wraps; `close()` (or
+    leaving a `with` block) hands it back to the pool instead of disconnecting.
+    """
+
+    def __init__(self, pool, cnx):
+        self._pool = pool
+        self._cnx = cnx
+
+    def close(self):
+        cnx, self._cnx = self._cnx, None
+        if cnx is None:
+            return
+        try:
+            cnx.close()
+        finally:
+            self._pool._release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        # A connection dropped without close() must not hold its slot forever
+        if getattr(self, "_cnx", None) is not None:
+            self.close()
+
+    def __getattr__(self, name):
+        cnx = self.__dict__.get("_cnx")
+        if cnx is None:
+            raise PoolError("Connection was already returned to the pool")
+        return getattr(cnx, name)
+
+
+class ConnectionPool:
+    """Bounded pool of MySQL connections for one credential set.
+
+    Backed by mysql.connector's MySQLConnectionPool, which pings a connection
+    when it is checked out and reconnects it if the server dropped it. That
+    pool fails at once when every connection is busy; here callers wait up to
+    `timeout` seconds for one to come back instead, and checkouts, waits and
+    timeouts are counted for `stats()`.
+    """
+
+    def __init__(self, size=5, timeout=10.0, **connect_args):
+        self.size = max(1, min(int(size), CNX_POOL_MAXSIZE))
+        self.timeout = float(timeout)
+        key = f"{connect_args.get('user')}@{connect_args.get('host')}/{connect_args.get('database')}"
+        self._pool = MySQLConnectionPool(
+            pool_name="cricbuzz-" + hashlib.sha1(key.encode()).hexdigest()[:12],
+            pool_size=self.size,
+            # Callers leave no session state behind (autocommit, no variables)
+            pool_reset_session=False,
+            **connect_args,
+        )
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.timeouts = 0
+        self.failures = 0
+
+    def get_connection(self):
+        """Check out a connection, waiting for a free one; raises PoolError on timeout."""
+        if not self._slots.acquire(blocking=False):
+            started = time.perf_counter()
+            with self._lock:
+                self.waits += 1
+            acquired = self._slots.acquire(timeout=self.timeout)
+            with self._lock:
+                self.wait_time += time.perf_counter() - started
+                if not acquired:
+                    self.timeouts += 1
+            if not acquired:
+                raise PoolError(f"No free database connection after {self.timeout:g}s "
+                                f"({self.size} in use)")
+        try:
+            cnx = self._pool.get_connection()
+        except Error:
+            with self._lock:
+                self.failures += 1
+            self._slots.release()
+            raise
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+        return PooledConnection(self, cnx)
+
+    def _release(self):
+        with self._lock:
+            self.in_use -= 1
+        self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": self.size,
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "wait_time": round(self.wait_time, 3),
+                "timeouts": self.timeouts,
+                "failures": self.failures,
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_connection_pool(host, user, passwd, database=None):
+    """Return the process-wide pool for these credentials, creating it on first use.
+
+    DB_CONNECTION_POOL_SIZE connections per credential set (default 5, at most
+    32) and DB_CONNECTION_POOL_TIMEOUT seconds to wait for one (default 10).
+    """
+    key = (host, user, passwd, database)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                load_dotenv()
+                pool = ConnectionPool(
+                    size=int(os.getenv("DB_CONNECTION_POOL_SIZE") or 5),
+                    timeout=float(os.getenv("DB_CONNECTION_POOL_TIMEOUT") or 10),
+                    host=host,
+                    user=user,
+                    password=passwd,
+                    database=database,
+                    autocommit=True,
+                )
+                _pools[key] = pool
+    return pool
+
+
+def pool_stats():
+    """{'user@host/database': stats} for every pool created in this process."""
+    return {f"{user}@{host}/{database or ''}": pool.stats()
+            for (host, user, _, database), pool in list(_pools.items())}
@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import zipfile
+from urllib.parse import urlencode
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are only serialized within one process
+    fcntl = None
+
+
+def fixture_key(path, params=None):
+    """Identify a request by path and sorted query string."""
+    query = urlencode(sorted((params or {}).items()), doseq=True)
+    raw = f"{path}?{query}" if query else path
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class FixtureRecorder:
+    """Appends API responses to a zip archive (deflate-compressed JSON entries).
+
+    Every response is stored as its own snapshot,
+    `<key>/<time>-<pid>-<sequence>.json`, so a live match polled repeatedly can
+    be replayed in the order it evolved.
+    Appends take an exclusive lock on `<archive>.lock` as well as a thread
+    lock, so backfill worker processes can record into the same archive.
+    """
+
+    def __init__(self, archive_path):
+        self.archive_path = archive_path
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self.recorded = 0
+
+    def record(self, path, params, status, body):
+        entry = {
+            "path": path,
+            "params": params or {},
+            "status": status,
+            "recorded_at": time.time(),
+            "body": body,
+        }
+        with self._lock:
+            self._sequence += 1
+            # The pid keeps names from different recording processes apart
+            name = (f"{fixture_key(path, params)}/{int(time.time() * 1000)}-"
+                    f"{os.getpid()}-{self._sequence:06d}.json")
+            with open(self.archive_path + ".lock", "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                with zipfile.ZipFile(self.archive_path, "a", compression=zipfile.ZIP_DEFLATED) as zf:
+                    zf.writestr(name, json.dumps(entry, default=str))
+            self.recorded += 1
+
+
+class FixtureArchive:
+    """Read side of a recorded archive: snapshots per request, oldest first."""
+
+    def __init__(self, snapshots=None):
+        self.snapshots = snapshots or {}
+        self._cursor = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, archive_path):
+        snapshots = {}
+        with zipfile.ZipFile(archive_path, "r") as zf:
+            for name in sorted(zf.namelist()):
+                if not name.endswith(".json"):
+                    continue
+                entry = json.loads(zf.read(name))
+                key = name.split("/", 1)[0]
+                snapshots.setdefault(key, []).append(entry)
+        return cls(snapshots)
+
+    def __len__(self):
+        return sum(len(entries) for entries in self.snapshots.values())
+
+    def entries(self, path_prefix=""):
+        """Latest snapshot of every recorded request whose path starts with `path_prefix`."""
+        return [
+            entries[-1] for entries in self.snapshots.values()
+            if entries and entries[-1]["path"].startswith(path_prefix)
+        ]
+
+    def lookup(self, path, params=None, cycle=True):
+        """Return the next snapshot for a request, or None if it was never recorded.
+
+        With `cycle`, repeated requests step through the recorded snapshots and
+        then stay on the last one; otherwise the latest snapshot is returned.
+        """
+        key = fixture_key(path, params)
+        entries = self.snapshots.get(key)
+        if not entries:
+            return None
+        if not cycle:
+            return entries[-1]
+        with self._lock:
+            index = self._cursor.get(key, 0)
+            self._cursor[key] = min(index + 1, len(entries) - 1)
+        return entries[index]
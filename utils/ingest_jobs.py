@@ -0,0 +1,197 @@
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+# Milestones printed by fetch_api_data.main(), in order, as (marker, progress, phase)
+FETCH_MILESTONES = (
+    ("Retrying", 0.05, "Replaying failed calls"),
+    ("Fetching live and recent matches", 0.1, "Fetching matches"),
+    ("Fetching scorecard data", 0.3, "Fetching scorecards"),
+    ("Fetching profiles for", 0.75, "Fetching player profiles"),
+    ("Pipeline throughput", 0.95, "Writing run report"),
+    ("Data fetching completed", 1.0, "Done"),
+)
+
+
+class ThreadRoutedStream:
+    """Stand-in for sys.stdout that sends each thread's writes to its own sink.
+
+    Threads routed to a job write into that job's log; every other thread
+    (Streamlit's script threads included) writes to the original stream.
+    """
+
+    def __init__(self, fallback):
+        self.fallback = fallback
+        self._sinks = {}
+        self._lock = threading.Lock()
+
+    def route(self, sink, thread_id=None):
+        with self._lock:
+            self._sinks[thread_id or threading.get_ident()] = sink
+
+    def sink(self, thread_id=None):
+        return self._sinks.get(thread_id or threading.get_ident())
+
+    def unroute_sink(self, sink):
+        """Stop routing every thread that writes to `sink`."""
+        with self._lock:
+            for thread_id in [t for t, s in self._sinks.items() if s is sink]:
+                del self._sinks[thread_id]
+
+    def write(self, text):
+        sink = self._sinks.get(threading.get_ident())
+        if sink is None:
+            return self.fallback.write(text)
+        sink.write(text)
+        return len(text)
+
+    def flush(self):
+        self.fallback.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.fallback, name)
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_output_router():
+    """Install (once) and return the thread-routed sys.stdout."""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = ThreadRoutedStream(sys.stdout)
+                sys.stdout = _router
+    return _router
+
+
+def inherit_output():
+    """Thread initializer that sends a worker thread's output where the calling thread's goes.
+
+    Pass the result as `initializer=` of a thread pool created inside a job so
+    its workers' prints land in the same job log. Outside a job it does nothing.
+    """
+    sink = _router.sink() if _router is not None else None
+
+    def initializer():
+        if sink is not None:
+            _router.route(sink)
+    return initializer
+
+
+class IngestionJob:
+    """One background run of an ingestion function, with its captured output.
+
+    `target` runs on a daemon thread whose stdout (and that of the thread pools
+    it creates with `inherit_output()`) is captured line by line. Progress and
+    the current phase advance as the `milestones` markers appear in the output.
+    A target that returns a non-zero value or raises marks the job failed.
+    """
+
+    def __init__(self, key, target, milestones=(), max_lines=2000):
+        self.key = key
+        self.target = target
+        self.milestones = list(milestones)
+        self.state = "pending"
+        self.phase = "Starting"
+        self.progress = 0.0
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self._lines = deque(maxlen=max_lines)
+        self._partial = ""
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread = None
+
+    def write(self, text):
+        with self._lock:
+            text = self._partial + text
+            *lines, self._partial = text.split("\n")
+            for line in lines:
+                self._lines.append(line)
+                self._advance(line)
+
+    def _advance(self, line):
+        for i, (marker, progress, phase) in enumerate(self.milestones):
+            if marker in line:
+                self.progress = max(self.progress, progress)
+                self.phase = phase
+                del self.milestones[:i + 1]
+                return
+
+    def start(self):
+        self.state = "running"
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name=f"ingest-job-{self.key}", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        router = get_output_router()
+        router.route(self)
+        try:
+            result = self.target()
+            self.state = "failed" if result else "succeeded"
+            if result:
+                self.error = f"exited with status {result}"
+        except BaseException as e:
+            self.state = "failed"
+            self.error = f"{type(e).__name__}: {e}"
+            self.write(traceback.format_exc())
+        finally:
+            router.unroute_sink(self)
+            if self._partial:
+                self.write("\n")
+            if self.state == "succeeded":
+                self.progress, self.phase = 1.0, "Done"
+            self.finished_at = time.time()
+            self._done.set()
+
+    @property
+    def running(self):
+        return self.state in ("pending", "running")
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def log(self, tail=None):
+        with self._lock:
+            lines = list(self._lines)
+        return "\n".join(lines[-tail:] if tail else lines)
+
+
+class JobRegistry:
+    """At most one running ingestion job per key (one key per database).
+
+    `submit()` starts a job, or returns the one already running for that key,
+    so a second click (from any browser session) attaches to the running job
+    instead of paying for the same API calls twice.
+    """
+
+    def __init__(self):
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key, target, milestones=()):
+        """Return (job, started): the running job for `key`, or a newly started one."""
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.running:
+                return job, False
+            job = IngestionJob(key, target, milestones)
+            self._jobs[key] = job
+            job.start()
+            return job, True
+
+    def get(self, key):
+        """The running or most recent job for `key`, if any."""
+        return self._jobs.get(key)
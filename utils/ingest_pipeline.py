@@ -0,0 +1,185 @@
+import time
+from contextlib import contextmanager
+
+from mysql.connector import Error
+
+STAGES = ("fetch", "parse", "resolve", "buffer", "flush")
+
+
+class StageCounter:
+    """Items handled and wall time spent in one pipeline stage."""
+
+    __slots__ = ("items", "seconds", "calls")
+
+    def __init__(self):
+        self.items = 0
+        self.seconds = 0.0
+        self.calls = 0
+
+    def count(self, items=1):
+        self.items += items
+
+    @property
+    def rate(self):
+        return self.items / self.seconds if self.seconds > 0 else 0.0
+
+
+class PipelineMetrics:
+    """Per-stage and per-table throughput counters for one ingestion run."""
+
+    def __init__(self):
+        self.stages = {name: StageCounter() for name in STAGES}
+        self.tables = {}
+
+    def stage(self, name):
+        """Time a block of work; call `.count(n)` on the yielded counter."""
+        return self._timed(self.stages, name)
+
+    def table(self, name):
+        """Time the flush of one table; count the rows written."""
+        return self._timed(self.tables, name)
+
+    @contextmanager
+    def _timed(self, counters, name):
+        counter = counters.setdefault(name, StageCounter())
+        started = time.perf_counter()
+        try:
+            yield counter
+        finally:
+            counter.seconds += time.perf_counter() - started
+            counter.calls += 1
+
+    def as_dict(self):
+        def summary(counters):
+            return {
+                name: {"items": c.items, "seconds": round(c.seconds, 4), "per_second": round(c.rate, 1)}
+                for name, c in counters.items() if c.calls
+            }
+        return {"stages": summary(self.stages), "tables": summary(self.tables)}
+
+    def report(self):
+        lines = []
+        for name, counter in self.stages.items():
+            if not counter.calls:
+                continue
+            lines.append(f"{name:<8} {counter.items:>8} items in {counter.seconds:7.2f}s "
+                         f"({counter.rate:,.0f}/s)")
+        return lines
+
+
+class WriteBuffer:
+    """Write-behind buffer: parsed rows accumulate per table and are flushed in bulk.
+
+    Tables are registered with a writer and a batch factory (`list` by default,
+    or a typed container such as `records.ColumnBatch`). A flush writes every
+    non-empty table in registration order (so parents go before children and
+    watermarks go last), each inside one explicit transaction. A flush happens
+    when any table reaches `batch_size` records, when `flush_interval` seconds
+    have passed since the last one, or on demand.
+
+    If a table fails to write, its transaction is rolled back and the tables
+    after it in the same flush are dropped, so watermarks never get ahead of
+    the data they describe; the next run fetches those rows again. Tables
+    registered with `match_ids` report which matches a lost batch covered, and
+    `progress` tables (fingerprints, watermarks: tuples that start with the
+    match id) withhold their records for those matches, so a later flush cannot
+    mark them done either, until a later flush writes the matches' rows again.
+    """
+
+    def __init__(self, db_manager, batch_size=5000, flush_interval=5.0, metrics=None):
+        self.db_manager = db_manager
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = float(flush_interval)
+        self.metrics = metrics or PipelineMetrics()
+        self.writers = {}
+        self._factories = {}
+        self.batches = {}
+        self.results = {}
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.failed_matches = set()
+        self._match_ids = {}
+        self._progress = set()
+        self._last_flush = time.monotonic()
+
+    def register(self, table, writer, batch_factory=list, match_ids=None, progress=False):
+        """Add a table. `match_ids(batch)` lists the matches a batch holds rows for."""
+        self.writers[table] = writer
+        self._factories[table] = batch_factory
+        self.batches[table] = batch_factory()
+        if match_ids is not None:
+            self._match_ids[table] = match_ids
+        if progress:
+            self._progress.add(table)
+
+    def add(self, table, records):
+        """Buffer records for `table`; flushes when the batch size or interval is reached."""
+        with self.metrics.stage("buffer") as counter:
+            batch = self.batches[table]
+            before = len(batch)
+            batch.extend(records)
+            counter.count(len(batch) - before)
+        if (len(batch) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def pending(self):
+        return sum(len(batch) for batch in self.batches.values())
+
+    def _accumulate(self, table, result):
+        if isinstance(result, tuple):
+            previous = self.results.get(table) or (0,) * len(result)
+            self.results[table] = tuple(a + (b or 0) for a, b in zip(previous, result))
+        elif isinstance(result, (int, float)):
+            self.results[table] = self.results.get(table, 0) + result
+
+    def flush(self):
+        """Write every buffered table, one transaction per table. Returns True on success."""
+        self._last_flush = time.monotonic()
+        # any() rather than pending(): a batch can hold work without rows (see MatchReplaceBatch)
+        if not any(self.batches.values()):
+            return True
+
+        ok = True
+        with self.metrics.stage("flush") as counter:
+            for table, writer in self.writers.items():
+                records = self.batches[table]
+                if not records:
+                    continue
+                self.batches[table] = self._factories[table]()
+                if table in self._progress and self.failed_matches:
+                    kept = [record for record in records if record[0] not in self.failed_matches]
+                    if len(kept) < len(records):
+                        print(f"[WARNING] Withheld {len(records) - len(kept)} {table} records "
+                              f"for matches whose rows failed to write")
+                    records = kept
+                    if not records:
+                        continue
+                if not ok:
+                    print(f"[WARNING] Dropped {len(records)} buffered {table} rows "
+                          f"after an earlier write failed")
+                    self._lost(table, records)
+                    continue
+                try:
+                    with self.metrics.table(table) as table_counter, self.db_manager.transaction():
+                        result = writer(records)
+                        table_counter.count(len(records))
+                    self._accumulate(table, result)
+                    counter.count(len(records))
+                    if table in self._match_ids and self.failed_matches:
+                        # Re-fetched and rewritten: the match can be marked done again
+                        self.failed_matches.difference_update(self._match_ids[table](records))
+                except Error as e:
+                    print(f"[ERROR] Flushing {len(records)} rows into {table} failed, "
+                          f"rolled back: {e}")
+                    self._lost(table, records)
+                    ok = False
+        self.flushes += 1
+        if not ok:
+            self.failed_flushes += 1
+        return ok
+
+    def _lost(self, table, records):
+        match_ids = self._match_ids.get(table)
+        if match_ids is not None:
+            self.failed_matches.update(match_ids(records))
@@ -0,0 +1,231 @@
+import difflib
+import re
+import unicodedata
+
+from mysql.connector import Error
+
+from utils.telemetry import Telemetry, TimedCursor
+
+# Scorecards decorate names with captain / keeper markers, e.g. "Rohit Sharma (c)"
+_MARKERS = re.compile(r"\((?:c|wk|c\s*&\s*wk|sub|rhb|lhb)\)", re.IGNORECASE)
+_NON_ALNUM = re.compile(r"[^a-z0-9 ]+")
+
+
+def normalize_name(name):
+    """Lower-case, strip accents, scorecard markers and punctuation."""
+    if not name:
+        return ""
+    text = unicodedata.normalize("NFKD", str(name))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = _MARKERS.sub(" ", text.lower())
+    text = _NON_ALNUM.sub(" ", text.replace(".", " "))
+    return " ".join(text.split())
+
+
+def initial_surname(normalized):
+    """'virat kohli' / 'v kohli' -> 'v kohli', used to match abbreviated names."""
+    parts = normalized.split()
+    if len(parts) < 2:
+        return normalized
+    return f"{parts[0][0]} {parts[-1]}"
+
+
+class PlayerResolver:
+    """In-memory player index used while ingesting scorecards.
+
+    The players table is read once; after that every lookup is a dict hit on
+    the Cricbuzz player id or the normalized name, with a fuzzy fallback for
+    spelling variants. A name match is never used for an entry whose
+    Cricbuzz id differs from the one stored for that player: same-named
+    players are common, so such an entry is treated as a new player. Players
+    that are not in the table yet are queued and written in batches by `flush()`.
+    """
+
+    def __init__(self, conn, fuzzy_cutoff=0.88, batch_size=500, telemetry=None, on_write=None):
+        self.conn = conn
+        self.telemetry = telemetry
+        self.on_write = on_write
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.batch_size = batch_size
+        self.by_cricbuzz_id = {}
+        self.cricbuzz_id_of = {}
+        self.by_name = {}
+        self.by_initial_surname = {}
+        self._ambiguous = set()
+        self._fuzzy_memo = {}
+        self._pending = {}
+        self._pending_links = {}
+        self.stats = {"id_hits": 0, "name_hits": 0, "fuzzy_hits": 0, "id_conflicts": 0,
+                      "misses": 0, "added": 0}
+
+    def _cursor(self):
+        """Cursor reporting to `telemetry` and calling `on_write(table)` after each write."""
+        cur = self.conn.cursor()
+        if self.telemetry is None and self.on_write is None:
+            return cur
+        return TimedCursor(cur, self.telemetry or Telemetry(), on_write=self.on_write)
+
+    def load(self):
+        """Read the players table into memory. Returns the number of players indexed."""
+        cur = self._cursor()
+        try:
+            cur.execute("SELECT player_id, cricbuzz_player_id, name, full_name FROM players")
+            rows = cur.fetchall()
+        finally:
+            cur.close()
+        for player_id, cricbuzz_id, name, full_name in rows:
+            self._index(player_id, cricbuzz_id, name, full_name)
+        return len(rows)
+
+    def _index_name(self, index, key, player_id):
+        if not key:
+            return
+        existing = index.get(key)
+        if existing is not None and existing != player_id:
+            # Two different players share this key; never guess between them
+            self._ambiguous.add((id(index), key))
+        else:
+            index[key] = player_id
+
+    def _index(self, player_id, cricbuzz_id, name, full_name=None):
+        if cricbuzz_id:
+            self.by_cricbuzz_id[int(cricbuzz_id)] = player_id
+            self.cricbuzz_id_of[player_id] = int(cricbuzz_id)
+        for raw in (name, full_name):
+            normalized = normalize_name(raw)
+            self._index_name(self.by_name, normalized, player_id)
+            self._index_name(self.by_initial_surname, initial_surname(normalized), player_id)
+        self._fuzzy_memo.clear()
+
+    def _lookup(self, index, key):
+        if (id(index), key) in self._ambiguous:
+            return None
+        return index.get(key)
+
+    def _fuzzy(self, normalized):
+        if normalized in self._fuzzy_memo:
+            return self._fuzzy_memo[normalized]
+        match = None
+        candidates = difflib.get_close_matches(normalized, self.by_name.keys(), n=2,
+                                               cutoff=self.fuzzy_cutoff)
+        if candidates:
+            player_id = self._lookup(self.by_name, candidates[0])
+            # Only accept a fuzzy hit when it is not equally close to someone else
+            if len(candidates) == 1 or self.by_name.get(candidates[1]) == player_id:
+                match = player_id
+        self._fuzzy_memo[normalized] = match
+        return match
+
+    def resolve(self, name, cricbuzz_id=None):
+        """Return the players.player_id for a scorecard entry, or None if unknown."""
+        if cricbuzz_id:
+            player_id = self.by_cricbuzz_id.get(int(cricbuzz_id))
+            if player_id is not None:
+                self.stats["id_hits"] += 1
+                return player_id
+
+        normalized = normalize_name(name)
+        if not normalized:
+            self.stats["misses"] += 1
+            return None
+
+        hit = "name_hits"
+        player_id = self._lookup(self.by_name, normalized)
+        if player_id is None:
+            player_id = self._lookup(self.by_initial_surname, initial_surname(normalized))
+        if player_id is None:
+            hit = "fuzzy_hits"
+            player_id = self._fuzzy(normalized)
+
+        if player_id is None:
+            self.stats["misses"] += 1
+            return None
+
+        known_id = self.cricbuzz_id_of.get(player_id)
+        if cricbuzz_id and known_id is not None and known_id != int(cricbuzz_id):
+            # Same name, different Cricbuzz player
+            self.stats["id_conflicts"] += 1
+            return None
+        self.stats[hit] += 1
+
+        if cricbuzz_id:
+            # Remember the Cricbuzz id so the next run resolves by id directly
+            self.by_cricbuzz_id[int(cricbuzz_id)] = player_id
+            self.cricbuzz_id_of[player_id] = int(cricbuzz_id)
+            self._pending_links[player_id] = int(cricbuzz_id)
+        return player_id
+
+    def add(self, name, cricbuzz_id=None, country=""):
+        """Queue a player that is not in the table yet; written on the next flush()."""
+        normalized = normalize_name(name)
+        key = int(cricbuzz_id) if cricbuzz_id else normalized
+        if not normalized or key in self._pending:
+            return
+        self._pending[key] = (str(name).strip(), str(name).strip(), country,
+                              int(cricbuzz_id) if cricbuzz_id else None)
+
+    def resolve_or_add(self, name, cricbuzz_id=None, country=""):
+        """Resolve a player, queueing it for insertion when it is unknown."""
+        player_id = self.resolve(name, cricbuzz_id)
+        if player_id is None:
+            self.add(name, cricbuzz_id, country)
+        return player_id
+
+    def flush(self):
+        """Persist queued players and id links in batches. Returns players added.
+
+        Database errors are re-raised so the caller's transaction rolls back;
+        the queued players and links are kept for the next flush.
+        """
+        added = 0
+        links, self._pending_links = self._pending_links, {}
+        pending, self._pending = self._pending, {}
+        written = []
+        cur = self._cursor()
+        try:
+            if links:
+                cur.executemany(
+                    "UPDATE players SET cricbuzz_player_id = %s "
+                    "WHERE player_id = %s AND cricbuzz_player_id IS NULL",
+                    [(cb_id, player_id) for player_id, cb_id in links.items()]
+                )
+
+            rows = list(pending.values())
+            for start in range(0, len(rows), self.batch_size):
+                chunk = rows[start:start + self.batch_size]
+                cur.executemany("""
+                    INSERT INTO players (full_name, name, country, cricbuzz_player_id)
+                    VALUES (%s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE name = VALUES(name)
+                """, chunk)
+                added += len(chunk)
+
+                # Read back the generated ids for the rows we just wrote
+                cb_ids = [row[3] for row in chunk if row[3] is not None]
+                if cb_ids:
+                    placeholders = ", ".join(["%s"] * len(cb_ids))
+                    cur.execute(
+                        f"SELECT player_id, cricbuzz_player_id, name, full_name FROM players "
+                        f"WHERE cricbuzz_player_id IN ({placeholders})", cb_ids
+                    )
+                    written.extend(cur.fetchall())
+                names = [row[1] for row in chunk if row[3] is None]
+                if names:
+                    placeholders = ", ".join(["%s"] * len(names))
+                    cur.execute(
+                        f"SELECT player_id, cricbuzz_player_id, name, full_name FROM players "
+                        f"WHERE cricbuzz_player_id IS NULL AND name IN ({placeholders})", names
+                    )
+                    written.extend(cur.fetchall())
+        except Error as e:
+            print(f"[ERROR] Error saving new players: {e}")
+            # Nothing was indexed yet, so the rolled-back ids are never handed out
+            self._pending_links = {**links, **self._pending_links}
+            self._pending = {**pending, **self._pending}
+            raise
+        finally:
+            cur.close()
+        for row in written:
+            self._index(*row)
+        self.stats["added"] += added
+        return added
@@ -0,0 +1,269 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+
+from utils.shared_cache import decode_value, encode_value, get_shared_backend
+
+# Pseudo-table the metadata lookups (table and column lists) depend on
+SCHEMA = "__schema__"
+
+_COMMENTS = re.compile(r"/\*.*?\*/|(?:--|#)[^\n]*", re.DOTALL)
+_TOKENS = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"|`[^`]*`|\s+|[^\s'\"`]+", re.DOTALL)
+_TABLE_REF = re.compile(
+    r"\b(?:FROM|JOIN)\s+((?:`[^`]+`|\w+)(?:\.(?:`[^`]+`|\w+))?"
+    r"(?:\s*(?:AS\s+)?(?!(?:WHERE|JOIN|ON|USING|GROUP|ORDER|LIMIT|HAVING|UNION|LEFT|RIGHT|INNER|CROSS|STRAIGHT_JOIN|NATURAL|WINDOW|FOR|LOCK)\b)\w+)?"
+    r"(?:\s*,\s*(?:`[^`]+`|\w+)(?:\.(?:`[^`]+`|\w+))?(?:\s+(?:AS\s+)?\w+)?)*)",
+    re.IGNORECASE,
+)
+_NAME = re.compile(r"(`[^`]+`|\w+)(?:\.(`[^`]+`|\w+))?")
+
+
+def normalize_sql(sql):
+    """SQL with comments removed, whitespace collapsed and no trailing semicolon.
+
+    Quoted strings and identifiers are kept as written, so two queries share a
+    cache entry exactly when they differ only in layout.
+    """
+    text = _COMMENTS.sub(" ", sql or "")
+    parts = []
+    for token in _TOKENS.findall(text):
+        parts.append(" " if token.isspace() else token)
+    return "".join(parts).strip().rstrip(";").strip()
+
+
+def referenced_tables(sql, database):
+    """{(database, table)} read by a SELECT, from its FROM and JOIN clauses (lowercased).
+
+    Unqualified names belong to `database`. String literals are ignored; CTE
+    names are harmless extras. Tables read only through a view are not seen.
+    """
+    text = re.sub(r"'(?:[^'\\]|\\.|'')*'", "''", normalize_sql(sql))
+    tables = set()
+    for match in _TABLE_REF.finditer(text):
+        for item in match.group(1).split(","):
+            name = _NAME.match(item.strip())
+            if not name:
+                continue
+            first, second = (part.strip("`") if part else None for part in name.groups())
+            schema, table = (first, second) if second else (database, first)
+            if table.upper() in ("SELECT", "DUAL", "LATERAL"):
+                continue
+            tables.add(((schema or "").lower(), table.lower()))
+    return tables
+
+
+class QueryCache:
+    """Query results kept until a table they read is written to.
+
+    Every (host, database, table) has a version. An entry remembers the
+    versions of the tables its query read; it is served as long as none of
+    them has been bumped since, so an unchanged dashboard never re-runs its
+    queries and a write shows up on the next read. Entries can also carry a
+    max age (used for schema lookups, which no write in this app bumps). At
+    most `max_entries` are kept in memory, least recently used first out.
+
+    Without a `backend` the versions only see writes made in this process, so
+    entries then expire after `local_max_age` seconds at the latest, and
+    writes from command-line fetches and backfills show up within that time.
+
+    With a shared `backend` (see utils.shared_cache) the versions live in the
+    backend, so a write on any replica invalidates every replica's entries,
+    and results are stored there too: a query one replica has run is served
+    to the others, and while it runs they wait for its result (up to
+    `lock_seconds`) rather than sending the same query to MySQL.
+    """
+
+    def __init__(self, max_entries=256, backend=None, lock_seconds=30.0, local_max_age=300.0):
+        self.max_entries = max(1, int(max_entries))
+        self.backend = backend
+        self.local_max_age = local_max_age
+        self.lock_seconds = float(lock_seconds)
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _version_key(host, table):
+        return f"v:{host}:{table[0]}:{table[1]}"
+
+    def _versions_of(self, host, tables):
+        tables = sorted(tables)
+        if self.backend is None:
+            with self._lock:
+                return tuple((table, self._versions.get((host, table), 0)) for table in tables)
+        keys = [self._version_key(host, table) for table in tables]
+        tokens = self.backend.get_many(keys)
+        for i, token in enumerate(tokens):
+            if token is None:
+                # Never written (or evicted): start it at a fresh token, so an
+                # entry stored under an evicted version can never match again
+                self.backend.add(keys[i], uuid.uuid4().hex.encode())
+                tokens[i] = self.backend.get(keys[i])
+        return tuple((table, token.decode() if token else None) for table, token in zip(tables, tokens))
+
+    def get_or_run(self, host, user, database, sql, loader, params=(), tables=None, max_age=None):
+        """Cached result of `loader()` for this query; runs it on a miss.
+
+        `tables` defaults to the tables parsed from `sql`. Results with a
+        `copy()` method (DataFrames, lists) are copied so callers can modify them.
+        """
+        key = (host, user, database, normalize_sql(sql), tuple(params))
+        if tables is None:
+            tables = referenced_tables(sql, database)
+        else:
+            tables = {(database.lower(), t.lower()) for t in tables}
+        if self.backend is None and self.local_max_age:
+            max_age = min(max_age or self.local_max_age, self.local_max_age)
+
+        # Versions are taken before the query runs: a write racing with it
+        # leaves the new entry already out of date rather than wrongly fresh
+        versions = self._versions_of(host, tables)
+        if any(version is None for _, version in versions):
+            # Shared backend unreachable: without versions nothing can be validated
+            with self._lock:
+                self.misses += 1
+            return loader()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, read_versions, stored_at, entry_max_age = entry
+                fresh = entry_max_age is None or time.time() - stored_at < entry_max_age
+                if read_versions == versions and fresh:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return _copy(value)
+                del self._entries[key]
+                self.invalidations += 1
+
+        if self.backend is None:
+            with self._lock:
+                self.misses += 1
+            value = loader()
+            self._remember(key, value, versions, time.time(), max_age)
+            return _copy(value)
+
+        digest = hashlib.sha1(json.dumps(key, default=str).encode("utf-8")).hexdigest()
+        found = self._shared_get(digest, versions)
+        lock_key = "l:" + digest
+        locked = False
+        if found is None:
+            locked = self.backend.add(lock_key, b"1", self.lock_seconds)
+            # Another replica is running this query: wait for its result, or take
+            # over if it gives up (failed query, lock expired)
+            deadline = time.monotonic() + self.lock_seconds
+            while not locked and time.monotonic() < deadline:
+                time.sleep(0.1)
+                found = self._shared_get(digest, versions)
+                if found is not None:
+                    break
+                locked = self.backend.add(lock_key, b"1", self.lock_seconds)
+        if found is not None:
+            value, stored_at = found
+            with self._lock:
+                self.shared_hits += 1
+            self._remember(key, value, versions, stored_at, max_age)
+            return _copy(value)
+
+        with self._lock:
+            self.misses += 1
+        try:
+            value = loader()
+            stored_at = time.time()
+            self._remember(key, value, versions, stored_at, max_age)
+            self._shared_put(digest, value, versions, stored_at, max_age)
+        finally:
+            if locked:
+                self.backend.delete(lock_key)
+        return _copy(value)
+
+    def _remember(self, key, value, versions, stored_at, max_age):
+        with self._lock:
+            self._entries[key] = (value, versions, stored_at, max_age)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _shared_get(self, digest, versions):
+        """(value, stored_at) from the backend if stored under the same versions, else None."""
+        blob = self.backend.get("r:" + digest)
+        if not blob:
+            return None
+        header, _, body = blob.partition(b"\n")
+        try:
+            meta = json.loads(header)
+        except ValueError:
+            return None
+        if [list(v) for v in meta["versions"]] != [[list(t), v] for t, v in versions]:
+            return None
+        value = decode_value(body)
+        return None if value is None else (value, meta["stored_at"])
+
+    def _shared_put(self, digest, value, versions, stored_at, max_age):
+        body = encode_value(value)
+        if body is None:
+            return
+        header = json.dumps({"versions": [[list(t), v] for t, v in versions],
+                             "stored_at": stored_at}).encode("utf-8")
+        self.backend.set("r:" + digest, header + b"\n" + body, max_age)
+
+    def bump(self, host, database, tables):
+        """Record a write to `tables`; entries that read any of them become stale."""
+        for table in tables:
+            if not table:
+                continue
+            table = ((database or "").lower(), table.strip("`").lower())
+            with self._lock:
+                self._versions[(host, table)] = self._versions.get((host, table), 0) + 1
+            if self.backend is not None:
+                self.backend.set(self._version_key(host, table), uuid.uuid4().hex.encode())
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = {"entries": len(self._entries), "hits": self.hits,
+                     "shared_hits": self.shared_hits, "misses": self.misses,
+                     "invalidations": self.invalidations}
+        if self.backend is not None:
+            stats["backend"] = self.backend.stats()
+        return stats
+
+
+def _copy(value):
+    return value.copy() if hasattr(value, "copy") else value
+
+
+_query_cache = None
+_query_cache_lock = threading.Lock()
+
+
+def get_query_cache():
+    """Return the process-wide QueryCache (QUERY_CACHE_MAX_ENTRIES entries in memory),
+    shared with other processes through SHARED_CACHE_URL when it is set and
+    otherwise expiring entries after QUERY_CACHE_LOCAL_TTL seconds.
+    """
+    global _query_cache
+    if _query_cache is None:
+        with _query_cache_lock:
+            if _query_cache is None:
+                load_dotenv()
+                _query_cache = QueryCache(
+                    int(os.getenv("QUERY_CACHE_MAX_ENTRIES") or 256),
+                    backend=get_shared_backend("query"),
+                    lock_seconds=float(os.getenv("QUERY_CACHE_LOCK_SECONDS") or 30),
+                    local_max_age=float(os.getenv("QUERY_CACHE_LOCAL_TTL") or 300),
+                )
+    return _query_cache
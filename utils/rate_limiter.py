@@ -0,0 +1,468 @@
+import atexit
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+from utils.response_cache import PROJECT_ROOT
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, writes are still atomic
+    fcntl = None
+
+DEFAULT_USAGE_FILE = os.path.join(PROJECT_ROOT, ".cache", "rapidapi_usage.json")
+
+
+class QuotaExceededError(RuntimeError):
+    """Raised when the monthly RapidAPI request quota has been used up."""
+
+
+def _current_month():
+    return datetime.now().strftime("%Y-%m")
+
+
+class MonthlyUsage:
+    """Requests sent this month, kept in a small JSON file so the quota holds across runs.
+
+    Every process that calls the API (fetch runs, the daemon, the Streamlit
+    server, backfills) counts into the same file. Updates re-read the file
+    under an exclusive lock, so concurrent processes add to each other's
+    counts instead of overwriting them. The count starts over each month.
+    """
+
+    def __init__(self, path=DEFAULT_USAGE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+    def __getstate__(self):
+        # Handed to spawned worker processes along with a SharedBudget
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.path = state["path"]
+        self._lock = threading.Lock()
+
+    def _read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return 0
+        return int(data.get("used") or 0) if data.get("month") == _current_month() else 0
+
+    def _write(self, used):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"month": _current_month(), "used": used}, f)
+        os.replace(tmp_path, self.path)
+
+    def _update(self, change):
+        """Apply `change(used) -> new_used` to the stored count under the lock."""
+        with self._lock, open(self.path + ".lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            used = change(self._read())
+            self._write(used)
+            return used
+
+    def used(self):
+        """Requests counted so far this month."""
+        with self._lock:
+            return self._read()
+
+    def claim(self, quota=None):
+        """Count one request and return the month's total; QuotaExceededError once `quota` is used."""
+        def change(used):
+            if quota is not None and used >= quota:
+                raise QuotaExceededError(f"RapidAPI monthly quota of {quota} requests exhausted")
+            return used + 1
+        return self._update(change)
+
+    def add(self, count):
+        """Count `count` requests sent elsewhere (e.g. by a worker pool); returns the month's total."""
+        return self._update(lambda used: used + max(0, int(count)))
+
+
+class TokenBucket:
+    """Thread-safe token bucket that hands out reservations instead of polling.
+
+    Every caller reserves a token up front and is told exactly how long to wait
+    for it, so requests leave at the configured rate without sleep-and-retry
+    loops. The token balance may go negative; that is the queue of callers
+    already promised a future slot.
+    """
+
+    def __init__(self, rate, capacity=None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def reserve(self, tokens=1.0):
+        """Take tokens and return the number of seconds until they are valid."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def penalize(self, seconds):
+        """Push every future reservation back by `seconds` (e.g. after a 429)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+
+class SharedTokenBucket(TokenBucket):
+    """TokenBucket whose balance lives in shared memory, for a pool of worker processes.
+
+    The balance and refill time sit in a `multiprocessing.Array`, guarded by
+    its lock, so every process that inherits the bucket draws from one budget.
+    `time.monotonic()` is system-wide, so all processes refill on one clock.
+    """
+
+    def __init__(self, rate, capacity=None, context=None):
+        self._state = (context or multiprocessing.get_context()).Array("d", 2)
+        super().__init__(rate, capacity)
+        self._lock = self._state.get_lock()
+
+    @property
+    def _tokens(self):
+        return self._state[0]
+
+    @_tokens.setter
+    def _tokens(self, value):
+        self._state[0] = value
+
+    @property
+    def _updated(self):
+        return self._state[1]
+
+    @_updated.setter
+    def _updated(self, value):
+        self._state[1] = value
+
+
+class SharedBudget:
+    """Plan-wide request rate and monthly request count shared across processes.
+
+    Created once by a parent process and handed to its workers (e.g. as a
+    ProcessPoolExecutor initializer argument); each worker calls
+    `share_budget()` before its first request. With a `usage` (MonthlyUsage),
+    the monthly count starts from what earlier runs and other processes have
+    used, and the parent writes the pool's requests back with `save()`.
+    """
+
+    def __init__(self, requests_per_second, burst=None, monthly_quota=None, context=None,
+                 usage=None):
+        context = context or multiprocessing.get_context()
+        self.requests_per_second = float(requests_per_second)
+        self.burst = burst
+        self.monthly_quota = monthly_quota
+        self.bucket = SharedTokenBucket(self.requests_per_second, burst, context)
+        self.usage = usage
+        self._seed = usage.used() if usage is not None else 0
+        self._saved = self._seed
+        self._others = 0
+        self.requests = context.Value("q", self._seed)
+
+    @classmethod
+    def from_env(cls, context=None):
+        return cls(*_plan_from_env(), context=context, usage=monthly_usage_from_env())
+
+    def run_requests(self):
+        """Requests the pool has sent since this budget was created."""
+        return self.requests.value - self._seed - self._others
+
+    def save(self):
+        """Add the pool's requests since the last save to `usage` (parent process only).
+
+        Requests other processes counted in the meantime are added to the
+        shared count too, so the quota check sees them. Returns the month's total.
+        """
+        if self.usage is None:
+            return self.requests.value
+        with self.requests.get_lock():
+            total = self.usage.add(self.requests.value - self._saved)
+            if total > self.requests.value:
+                self._others += total - self.requests.value
+                self.requests.value = total
+            self._saved = self.requests.value
+            return total
+
+
+class RateLimiter:
+    """Per-endpoint token buckets behind one plan-wide bucket and monthly quota.
+
+    All Cricbuzz callers (the ingestion script and the Streamlit pages) go
+    through `acquire()` before a request and `observe()` after it. With a
+    `shared` SharedBudget, the plan-wide bucket and the monthly count are the
+    ones every process in a worker pool uses; otherwise the monthly count is
+    kept in `usage` (a MonthlyUsage), when given, so it survives restarts.
+
+    Requests are counted in memory and added to `usage` every
+    `usage_sync_every` requests or `usage_sync_seconds` seconds (and on every
+    request once the quota is that close), so callers never wait on the file.
+    Call `save_usage()` before exiting to store the rest.
+    """
+
+    def __init__(self, requests_per_second=5.0, burst=None, monthly_quota=None,
+                 endpoint_rates=None, shared=None, usage=None, usage_sync_every=25,
+                 usage_sync_seconds=5.0):
+        self.requests_per_second = float(requests_per_second)
+        self.burst = burst
+        self.monthly_quota = int(monthly_quota) if monthly_quota else None
+        self.endpoint_rates = dict(endpoint_rates or {})
+        self.shared = shared
+        self.usage = usage if shared is None else None
+        self._plan_bucket = shared.bucket if shared else TokenBucket(self.requests_per_second, burst)
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._month = _current_month()
+        self._month_used = self.usage.used() if self.usage is not None else 0
+        self.usage_sync_every = max(1, int(usage_sync_every))
+        self.usage_sync_seconds = float(usage_sync_seconds)
+        self._unsaved = 0
+        self._usage_lock = threading.Lock()
+        self._usage_synced = time.monotonic()
+        self._quota_remaining = None
+        self._stats = {}
+
+    def _bucket(self, endpoint):
+        bucket = self._buckets.get(endpoint)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(endpoint)
+                if bucket is None:
+                    rate = self.endpoint_rates.get(endpoint, self.requests_per_second)
+                    bucket = TokenBucket(rate, self.burst)
+                    self._buckets[endpoint] = bucket
+        return bucket
+
+    def _endpoint_stats(self, endpoint):
+        stats = self._stats.get(endpoint)
+        if stats is None:
+            stats = self._stats.setdefault(endpoint, {
+                "tokens_used": 0,
+                "wait_time": 0.0,
+                "throttled_calls": 0,
+                "rate_limited_responses": 0,
+            })
+        return stats
+
+    def _check_quota(self):
+        month = _current_month()
+        if month != self._month:
+            self._month = month
+            self._month_used = 0
+            self._quota_remaining = None
+        if self._quota_remaining is not None and self._quota_remaining <= 0:
+            raise QuotaExceededError("RapidAPI monthly quota exhausted (reported by API)")
+        if self.monthly_quota is not None and self._month_used >= self.monthly_quota:
+            raise QuotaExceededError(
+                f"RapidAPI monthly quota of {self.monthly_quota} requests exhausted"
+            )
+
+    def quota_exhausted(self):
+        """True once the monthly quota (configured or reported by the API) is used up."""
+        with self._lock:
+            try:
+                self._check_quota()
+            except QuotaExceededError:
+                return True
+        if self.shared is not None and self.monthly_quota is not None:
+            return self.shared.requests.value >= self.monthly_quota
+        return False
+
+    def _count_shared_request(self):
+        """Claim one request from the pool-wide monthly count; returns the new total."""
+        with self.shared.requests.get_lock():
+            if self.monthly_quota is not None and self.shared.requests.value >= self.monthly_quota:
+                raise QuotaExceededError(
+                    f"RapidAPI monthly quota of {self.monthly_quota} requests exhausted"
+                )
+            self.shared.requests.value += 1
+            return self.shared.requests.value
+
+    def _usage_due(self):
+        near_quota = (self.monthly_quota is not None
+                      and self._month_used + self.usage_sync_every >= self.monthly_quota)
+        return (near_quota or self._unsaved >= self.usage_sync_every
+                or time.monotonic() - self._usage_synced >= self.usage_sync_seconds)
+
+    def save_usage(self, blocking=True):
+        """Add the requests counted since the last save to `usage` and pick up
+        what other processes used meanwhile. Returns the month's total, or None
+        when another thread is already saving (with `blocking=False`).
+        """
+        if self.usage is None:
+            return self._month_used
+        if not self._usage_lock.acquire(blocking=blocking):
+            return None
+        try:
+            with self._lock:
+                count, self._unsaved = self._unsaved, 0
+            try:
+                total = self.usage.add(count)
+            except OSError as e:
+                with self._lock:
+                    self._unsaved += count
+                print(f"[WARNING] Could not update {self.usage.path}: {e}")
+                return None
+            self._usage_synced = time.monotonic()
+            with self._lock:
+                self._month_used = max(self._month_used, total + self._unsaved)
+            return total
+        finally:
+            self._usage_lock.release()
+
+    def acquire(self, endpoint="default"):
+        """Block until a request to `endpoint` may be sent. Returns seconds waited."""
+        if self.usage is not None and self._usage_due():
+            # The file is touched outside self._lock, and by one thread at a time
+            self.save_usage(blocking=False)
+        with self._lock:
+            self._check_quota()
+            if self.shared is not None:
+                self._month_used = self._count_shared_request()
+            else:
+                self._month_used += 1
+                if self.usage is not None:
+                    self._unsaved += 1
+            if self._quota_remaining is not None:
+                self._quota_remaining -= 1
+
+        wait = max(self._plan_bucket.reserve(), self._bucket(endpoint).reserve())
+        if wait > 0:
+            time.sleep(wait)
+
+        with self._lock:
+            stats = self._endpoint_stats(endpoint)
+            stats["tokens_used"] += 1
+            if wait > 0:
+                stats["wait_time"] += wait
+                stats["throttled_calls"] += 1
+        return wait
+
+    def observe(self, endpoint, status_code, headers=None):
+        """Feed a response back so 429s and RapidAPI quota headers are honoured."""
+        headers = headers or {}
+        remaining = headers.get("x-ratelimit-requests-remaining")
+        if remaining is not None:
+            try:
+                with self._lock:
+                    self._quota_remaining = int(remaining)
+            except ValueError:
+                pass
+
+        if status_code == 429:
+            try:
+                retry_after = float(headers.get("retry-after") or 1.0)
+            except ValueError:
+                retry_after = 1.0
+            self._plan_bucket.penalize(retry_after)
+            with self._lock:
+                self._endpoint_stats(endpoint)["rate_limited_responses"] += 1
+
+    def stats(self):
+        """Return a snapshot of counters per endpoint plus plan-wide totals."""
+        with self._lock:
+            endpoints = {name: dict(values) for name, values in self._stats.items()}
+            month_used = self._month_used
+            quota_remaining = self._quota_remaining
+        totals = {
+            "tokens_used": sum(s["tokens_used"] for s in endpoints.values()),
+            "wait_time": round(sum(s["wait_time"] for s in endpoints.values()), 3),
+            "throttled_calls": sum(s["throttled_calls"] for s in endpoints.values()),
+            "rate_limited_responses": sum(s["rate_limited_responses"] for s in endpoints.values()),
+            "month_used": month_used,
+            "monthly_quota": self.monthly_quota,
+            "quota_remaining": quota_remaining,
+        }
+        return {"endpoints": endpoints, "totals": totals}
+
+
+def monthly_usage_from_env():
+    """MonthlyUsage stored in RAPIDAPI_USAGE_FILE (default .cache/rapidapi_usage.json)."""
+    load_dotenv()
+    return MonthlyUsage(os.getenv("RAPIDAPI_USAGE_FILE") or DEFAULT_USAGE_FILE)
+
+
+def endpoint_rates_from_env():
+    """{endpoint: requests_per_second} from RAPIDAPI_ENDPOINT_RPS, e.g. "scorecard=2,player=1"."""
+    load_dotenv()
+    rates = {}
+    for item in (os.getenv("RAPIDAPI_ENDPOINT_RPS") or "").split(","):
+        endpoint, _, rate = item.partition("=")
+        if endpoint.strip() and rate.strip():
+            try:
+                rates[endpoint.strip()] = float(rate)
+            except ValueError:
+                print(f"[WARNING] Ignoring RAPIDAPI_ENDPOINT_RPS entry {item.strip()!r}")
+    return rates
+
+
+def _plan_from_env():
+    """(requests_per_second, burst, monthly_quota) of the RapidAPI plan in .env."""
+    load_dotenv()
+    burst = os.getenv("RAPIDAPI_BURST")
+    quota = os.getenv("RAPIDAPI_MONTHLY_QUOTA")
+    return (float(os.getenv("RAPIDAPI_RPS") or 5),
+            float(burst) if burst else None,
+            int(quota) if quota else None)
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+_shared_budget = None
+
+
+def share_budget(budget):
+    """Make this process's limiter draw from a SharedBudget created by its parent.
+
+    Must be called before the first request (i.e. before get_rate_limiter()).
+    """
+    global _shared_budget
+    if _limiter is not None:
+        raise RuntimeError("share_budget() must be called before the rate limiter is created")
+    _shared_budget = budget
+
+
+def get_rate_limiter():
+    """Return the process-wide limiter configured from the RapidAPI plan in .env.
+
+    Its unsaved monthly count is written to the usage file at exit.
+    """
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                requests_per_second, burst, monthly_quota = _plan_from_env()
+                _limiter = RateLimiter(
+                    requests_per_second=requests_per_second,
+                    burst=burst,
+                    monthly_quota=monthly_quota,
+                    endpoint_rates=endpoint_rates_from_env(),
+                    shared=_shared_budget,
+                    usage=None if _shared_budget else monthly_usage_from_env(),
+                )
+                atexit.register(_limiter.save_usage)
+    return _limiter
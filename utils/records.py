@@ -0,0 +1,221 @@
+from array import array
+from dataclasses import dataclass, fields
+from datetime import date
+
+# Numeric columns are stored in typed arrays (8 bytes per value, no per-value object)
+_TYPECODES = {int: "q", float: "d"}
+
+
+def _int(value, default=0):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _float(value, default=0.0):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+@dataclass(slots=True)
+class Match:
+    """One parsed entry of a /matches/v1/live or /recent feed."""
+    cricbuzz_match_id: int | None
+    match_desc: str = ""
+    team1: str = ""
+    team2: str = ""
+    venue: str = ""
+    venue_city: str = ""
+    start_date: date | None = None
+    status: str = ""
+    state: str = ""
+    match_winner: str = ""
+    win_margin: str = ""
+    format: str = ""
+    toss_winner: str = ""
+    toss_decision: str = ""
+    match_state: str = ""
+    payload_hash: str | None = None
+
+
+@dataclass(slots=True)
+class BattingInnings:
+    """One batter's innings from a scorecard, as stored in batting_data."""
+    match_id: int
+    player_id: int
+    player_name: str
+    runs: int
+    balls: int
+    strike_rate: float
+    dismissal: str
+    team: str
+    innings_no: int
+
+    @classmethod
+    def from_api(cls, match_id, player_id, batsman, team, innings_no):
+        return cls(
+            match_id, player_id,
+            batsman.get('name', ''),
+            _int(batsman.get('runs')),
+            _int(batsman.get('balls')),
+            _float(batsman.get('strkrate')),
+            batsman.get('outdec', ''),
+            team,
+            _int(innings_no, 1),
+        )
+
+
+@dataclass(slots=True)
+class BowlingSpell:
+    """One bowler's figures from a scorecard, as stored in bowling_data."""
+    match_id: int
+    player_id: int
+    player_name: str
+    overs: float
+    runs_conceded: int
+    wickets: int
+    economy_rate: float
+    format: str
+
+    @classmethod
+    def from_api(cls, match_id, player_id, bowler, match_format):
+        return cls(
+            match_id, player_id,
+            bowler.get('name', ''),
+            _float(bowler.get('overs')),
+            _int(bowler.get('runs')),
+            _int(bowler.get('wickets')),
+            _float(bowler.get('economy')),
+            match_format,
+        )
+
+
+@dataclass(slots=True)
+class Partnership:
+    """One batting partnership, as stored in players_partnerships_data."""
+    match_id: int
+    innings_no: int
+    batter1_name: str
+    batter2_name: str
+    runs_partnership: int
+    wicket_fallen: int
+
+
+@dataclass(slots=True)
+class FieldingRecord:
+    """One fielder's dismissals in a match, as stored in fielding_data."""
+    match_id: int
+    player_id: int
+    catches: int = 0
+    stumpings: int = 0
+    run_outs: int = 0
+    format: str = ""
+
+
+@dataclass(slots=True)
+class BatterInnings:
+    """One innings with its match date, as stored in batters_batting_data."""
+    match_id: int
+    player_id: int
+    player_name: str
+    runs: int
+    balls_faced: int
+    strike_rate: float
+    date: date | None
+
+
+@dataclass(slots=True)
+class VenueBowling:
+    """One bowling spell with its venue, as stored in bowlers_bowling_venue_data."""
+    match_id: int
+    player_id: int
+    player_name: str
+    venue: str
+    overs: float
+    runs_conceded: int
+    wickets: int
+    economy_rate: float
+
+
+class ColumnBatch:
+    """Column-oriented batch of one record type.
+
+    Each field is kept in its own column: `array('q')` / `array('d')` for int
+    and float fields, a list otherwise. `params()` zips the requested columns
+    straight into executemany parameters, in whatever order the SQL needs.
+    """
+
+    def __init__(self, record_type, records=None):
+        self.record_type = record_type
+        self.names = [f.name for f in fields(record_type)]
+        self._coerce = {}
+        self.columns = {}
+        for f in fields(record_type):
+            typecode = _TYPECODES.get(f.type)
+            self.columns[f.name] = array(typecode) if typecode else []
+            if typecode:
+                self._coerce[f.name] = f.type
+        if records is not None:
+            self.extend(records)
+
+    def append(self, record):
+        # Convert every value first so a bad one cannot leave columns of uneven length
+        values = [getattr(record, name) for name in self.names]
+        for i, name in enumerate(self.names):
+            convert = self._coerce.get(name)
+            if convert is not None:
+                values[i] = convert(values[i])
+        for name, value in zip(self.names, values):
+            self.columns[name].append(value)
+
+    def extend(self, records):
+        if isinstance(records, ColumnBatch) and records.record_type is self.record_type:
+            for name in self.names:
+                self.columns[name].extend(records.columns[name])
+            return
+        for record in records:
+            self.append(record)
+
+    def __len__(self):
+        return len(self.columns[self.names[0]])
+
+    def __iter__(self):
+        for values in zip(*(self.columns[name] for name in self.names)):
+            yield self.record_type(*values)
+
+    def filter(self, predicate):
+        """New batch with the records for which `predicate(record)` is true."""
+        return ColumnBatch(self.record_type, (r for r in self if predicate(r)))
+
+    def params(self, columns=None):
+        """executemany parameters: one tuple per record, fields in `columns` order."""
+        return list(zip(*(self.columns[name] for name in (columns or self.names))))
+
+
+class MatchReplaceBatch:
+    """Rows that replace everything stored for their matches.
+
+    For tables without a natural key: the writer deletes the rows of every
+    match in `match_ids` and inserts `rows`. A match whose rows all went away
+    still has its old rows deleted, so the batch counts as non-empty while it
+    holds any match even when `len()` (the row count) is zero.
+    """
+
+    def __init__(self, record_type):
+        self.match_ids = set()
+        self.rows = ColumnBatch(record_type)
+
+    def extend(self, items):
+        """Add (match_id, records) pairs."""
+        for match_id, records in items:
+            self.match_ids.add(match_id)
+            self.rows.extend(records)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __bool__(self):
+        return bool(self.match_ids)
@@ -0,0 +1,220 @@
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, writes are still atomic
+    fcntl = None
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class CricbuzzAPIError(RuntimeError):
+    """Base error for Cricbuzz calls that could not be completed."""
+
+    def __init__(self, endpoint, message, status_code=None):
+        super().__init__(f"{endpoint}: {message}")
+        self.endpoint = endpoint
+        self.status_code = status_code
+
+
+class TransientAPIError(CricbuzzAPIError):
+    """The call failed for a reason that may succeed later (timeouts, 429, 5xx)."""
+
+
+class CircuitOpenError(TransientAPIError):
+    """The endpoint's circuit breaker is open; the call was not attempted."""
+
+
+def is_retryable_status(status_code):
+    """429 and 5xx are worth retrying; other 4xx (e.g. 404) are not."""
+    return status_code in RETRYABLE_STATUS_CODES
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter and a shared retry budget.
+
+    The budget allows retries up to `budget_ratio` of recent first attempts
+    (plus a small floor), so a widespread outage cannot multiply traffic by
+    `max_retries`.
+    """
+
+    def __init__(self, max_retries=3, base_delay=0.5, max_delay=8.0,
+                 budget_ratio=0.2, budget_floor=10):
+        self.max_retries = int(max_retries)
+        self.base_delay = float(base_delay)
+        self.max_delay = float(max_delay)
+        self.budget_ratio = float(budget_ratio)
+        self.budget_floor = int(budget_floor)
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._retries = 0
+
+    def record_request(self):
+        with self._lock:
+            self._requests += 1
+
+    def try_spend_retry(self):
+        """Take one retry from the budget; False when the budget is exhausted."""
+        with self._lock:
+            allowed = self.budget_floor + self.budget_ratio * self._requests
+            if self._retries >= allowed:
+                return False
+            self._retries += 1
+            return True
+
+    def backoff(self, attempt, retry_after=None):
+        """Seconds to wait before retry number `attempt` (1-based)."""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        delay = random.uniform(0, ceiling)
+        if retry_after:
+            delay = max(delay, float(retry_after))
+        return delay
+
+    def stats(self):
+        with self._lock:
+            return {"requests": self._requests, "retries": self._retries}
+
+
+class CircuitBreaker:
+    """Per-endpoint breaker: closed -> open after N consecutive failures -> half-open probe."""
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = int(failure_threshold)
+        self.reset_timeout = float(reset_timeout)
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+        self.trips = 0
+        self.rejected = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        """Return True if a call may go out now."""
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+
+    def release_probe(self):
+        """End a half-open probe that produced no verdict (e.g. a local error before the request)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probe_in_flight:
+                # The half-open probe failed: stay open for another reset_timeout
+                self._probe_in_flight = False
+                self._opened_at = time.monotonic()
+                self.trips += 1
+            elif self._opened_at is None and self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self.trips += 1
+
+
+class DeadLetterQueue:
+    """Calls that still failed after retries, persisted for the next run to replay first.
+
+    Updates take an exclusive lock on `<path>.lock`, so several processes
+    (backfill workers, a fetch run) can share one queue.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @contextmanager
+    def _locked(self):
+        with self._lock, open(self.path + ".lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def _read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return []
+
+    def _write(self, entries):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entries, f, indent=2, default=str)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def _merge(entries, new):
+        """Fold `new` entries into `entries`, de-duplicated by (method, args)."""
+        for item in new:
+            for entry in entries:
+                if entry["method"] == item["method"] and entry["args"] == item["args"]:
+                    entry["attempts"] += item["attempts"]
+                    entry["error"] = item["error"]
+                    entry["failed_at"] = max(entry["failed_at"], item["failed_at"])
+                    break
+            else:
+                entries.append(dict(item))
+        return entries
+
+    def add(self, method, args, error):
+        """Record a failed client call, de-duplicated by (method, args)."""
+        self.extend([{
+            "method": method,
+            "args": [str(a) for a in args],
+            "error": str(error),
+            "failed_at": time.time(),
+            "attempts": 1,
+        }])
+
+    def extend(self, entries):
+        """Add entries drained from another queue (e.g. a worker's)."""
+        if not entries:
+            return
+        with self._locked():
+            self._write(self._merge(self._read(), entries))
+
+    def drain(self):
+        """Remove and return every entry."""
+        with self._locked():
+            entries = self._read()
+            if entries:
+                self._write([])
+            return entries
+
+    def __len__(self):
+        with self._locked():
+            return len(self._read())
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+
+from dotenv import load_dotenv
+
+from utils.shared_cache import FileCacheBackend, get_shared_backend
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_DIR = os.path.join(PROJECT_ROOT, ".cache", "cricbuzz")
+
+# Seconds an entry stays fresh, per endpoint. None means "never expires".
+ENDPOINT_TTLS = {
+    "live_matches": 15,
+    "recent_matches": 120,
+    "scorecard": 30,             # while the match is still in progress
+    "player_search": 24 * 3600,
+    "player_details": 24 * 3600,
+    "player_career": 24 * 3600,
+    "player_stats": 12 * 3600,
+    "series_archive": 24 * 3600,
+    "series_matches": 6 * 3600,
+}
+
+COMPLETED_STATES = {"complete", "completed", "result", "abandon", "abandoned", "no result"}
+
+
+def is_completed_scorecard(payload):
+    """True when a scorecard payload belongs to a match that has finished."""
+    if not isinstance(payload, dict):
+        return False
+    if payload.get("ismatchcomplete") or payload.get("isMatchComplete"):
+        return True
+    header = payload.get("matchHeader") or {}
+    state = str(header.get("state") or payload.get("state") or "").strip().lower()
+    return state in COMPLETED_STATES or bool(header.get("complete"))
+
+
+def ttl_for(endpoint, payload):
+    """Pick the TTL for a payload based on its endpoint and, for scorecards, match state."""
+    if endpoint == "scorecard" and is_completed_scorecard(payload):
+        return None
+    return ENDPOINT_TTLS.get(endpoint, 60)
+
+
+class ResponseCache:
+    """Compressed cache of Cricbuzz JSON payloads with LRU size bounding.
+
+    Entries are stored through a backend from `utils.shared_cache`: by default
+    one file per entry in a local directory, which the ingestion script and
+    every Streamlit process on the host share (atomic writes, reads bump the
+    mtime that eviction orders by). With SHARED_CACHE_URL pointing at a
+    key-value server, replicas on other hosts share the payloads too.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=256 * 1024 * 1024, backend=None):
+        self.backend = backend or FileCacheBackend(directory, max_bytes, suffix=".json.z")
+
+    @staticmethod
+    def make_key(endpoint, params=None):
+        raw = json.dumps([endpoint, params or {}], sort_keys=True, default=str)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get(self, endpoint, params=None):
+        """Return the cached payload, or None when missing or expired."""
+        blob = self.backend.get(self.make_key(endpoint, params))
+        if blob is None:
+            return None
+        try:
+            entry = json.loads(zlib.decompress(blob))
+        except (ValueError, zlib.error):
+            return None
+        expires_at = entry.get("expires_at")
+        if expires_at is not None and expires_at < time.time():
+            return None
+        return entry["payload"]
+
+    def set(self, endpoint, params, payload, ttl="auto"):
+        """Store a payload and return it. `ttl="auto"` applies the endpoint policy."""
+        if payload is None:
+            return payload
+        if ttl == "auto":
+            ttl = ttl_for(endpoint, payload)
+        now = time.time()
+        entry = {
+            "endpoint": endpoint,
+            "params": params or {},
+            "stored_at": now,
+            "expires_at": None if ttl is None else now + ttl,
+            "payload": payload,
+        }
+        blob = zlib.compress(json.dumps(entry, default=str).encode("utf-8"), 6)
+        self.backend.set(self.make_key(endpoint, params), blob, ttl)
+        return payload
+
+    def evict(self):
+        """Delete least recently used entries (file backend; a server evicts on its own)."""
+        if hasattr(self.backend, "evict"):
+            self.backend.evict()
+
+    def clear(self):
+        """Remove every cached entry."""
+        self.backend.clear()
+
+    def stats(self):
+        return self.backend.stats()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Return the process-wide cache configured from CRICBUZZ_CACHE_DIR / CRICBUZZ_CACHE_MAX_MB.
+
+    When SHARED_CACHE_URL is set the payloads go to that shared backend instead.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                load_dotenv()
+                _cache = ResponseCache(
+                    directory=os.getenv("CRICBUZZ_CACHE_DIR") or DEFAULT_CACHE_DIR,
+                    max_bytes=float(os.getenv("CRICBUZZ_CACHE_MAX_MB") or 256) * 1024 * 1024,
+                    backend=get_shared_backend("cricbuzz"),
+                )
+    return _cache
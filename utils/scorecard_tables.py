@@ -0,0 +1,189 @@
+import re
+
+from utils.records import BatterInnings, FieldingRecord, Partnership, VenueBowling, _float, _int
+
+# Tables derived from a whole scorecard, in the order the write buffer flushes them
+DERIVED_TABLES = (
+    ("players_partnerships_data", Partnership),
+    ("fielding_data", FieldingRecord),
+    ("batters_batting_data", BatterInnings),
+    ("bowlers_bowling_venue_data", VenueBowling),
+)
+
+_CAUGHT_AND_BOWLED = re.compile(r"^c\s*(?:&|and)\s*b\s+(.+)$", re.IGNORECASE)
+_CAUGHT = re.compile(r"^c\s+(.+?)\s+b\s+.+$", re.IGNORECASE)
+_STUMPED = re.compile(r"^st\s+(.+?)\s+b\s+.+$", re.IGNORECASE)
+_RUN_OUT = re.compile(r"^run\s*out\s*\(?([^)]*)\)?", re.IGNORECASE)
+_NAME_NOISE = re.compile(r"[†\[\]]|\(sub\)|\bsub\b|\(wk\)|\(c\)", re.IGNORECASE)
+
+
+def _clean_name(name):
+    return " ".join(_NAME_NOISE.sub(" ", name or "").replace("(", " ").replace(")", " ").split())
+
+
+def parse_dismissal(outdec):
+    """('catch' | 'stumping' | 'run_out' | None, [fielder names]) from a dismissal text.
+
+    'c Smith b Starc' -> ('catch', ['Smith']), 'c & b Starc' -> ('catch', ['Starc']),
+    'st †Carey b Zampa' -> ('stumping', ['Carey']), 'run out (Smith/Carey)' ->
+    ('run_out', ['Smith', 'Carey']). Bowled, lbw, not out etc. credit no fielder.
+    """
+    text = " ".join((outdec or "").split())
+    match = _CAUGHT_AND_BOWLED.match(text) or _CAUGHT.match(text)
+    if match:
+        return "catch", [_clean_name(match.group(1))]
+    match = _STUMPED.match(text)
+    if match:
+        return "stumping", [_clean_name(match.group(1))]
+    match = _RUN_OUT.match(text)
+    if match:
+        return "run_out", [name for name in map(_clean_name, match.group(1).split("/")) if name]
+    return None, []
+
+
+class FielderIndex:
+    """Look up the short fielder names of dismissal texts among one side's players.
+
+    Scorecards name fielders by surname or short name ('Kohli', 'KL Rahul')
+    while the batting and bowling lists carry full names and ids. A name is
+    resolved when it equals one player's name, or is the ending of exactly
+    one player's name; anything ambiguous is left unresolved.
+    """
+
+    def __init__(self, players):
+        self.players = {}
+        for cb_id, name in players:
+            if name:
+                self.players.setdefault(name.casefold(), (cb_id, name))
+
+    def lookup(self, name):
+        key = _clean_name(name).casefold()
+        if not key:
+            return None
+        if key in self.players:
+            return self.players[key]
+        candidates = [player for full, player in self.players.items() if full.endswith(" " + key)]
+        if len(candidates) == 1:
+            return candidates[0]
+        surname = key.split()[-1]
+        candidates = [player for full, player in self.players.items()
+                      if full.split()[-1] == surname]
+        return candidates[0] if len(candidates) == 1 else None
+
+
+def innings_partnerships(match_id, innings):
+    """Partnerships of one innings.
+
+    Uses the scorecard's own partnership list when present; otherwise they are
+    rebuilt from the fall of wickets and the batting order. `wicket_fallen` is
+    the wicket that ended the partnership (one more than the wickets down for
+    an unbroken one at the end of the innings).
+    """
+    innings_no = _int(innings.get('inningsId'), 1)
+    explicit = (innings.get('partnership') or {}).get('partnership') or []
+    if explicit:
+        return [
+            Partnership(match_id, innings_no, p.get('bat1name', ''), p.get('bat2name', ''),
+                        _int(p.get('totalruns')), wicket)
+            for wicket, p in enumerate(explicit, 1)
+        ]
+
+    batters = [(b.get('id'), b.get('name', '')) for b in innings.get('batsman', [])]
+    if len(batters) < 2:
+        return []
+    fall = sorted((innings.get('fow') or {}).get('fow') or [], key=lambda w: _int(w.get('runs')))
+    crease = list(batters[:2])
+    waiting = batters[2:]
+    partnerships = []
+    previous = 0
+    for wicket, fow in enumerate(fall, 1):
+        if len(crease) < 2:
+            break
+        runs = _int(fow.get('runs'))
+        partnerships.append(Partnership(match_id, innings_no, crease[0][1], crease[1][1],
+                                        max(0, runs - previous), wicket))
+        previous = runs
+        out = [b for b in crease
+               if (fow.get('batsmanid') and str(b[0]) == str(fow.get('batsmanid')))
+               or b[1] == fow.get('batsmanname')]
+        if not out:
+            break  # Batting order and fall of wickets disagree; stop rather than guess
+        crease.remove(out[0])
+        if waiting:
+            crease.append(waiting.pop(0))
+
+    total = innings.get('score')
+    if total is not None and len(crease) == 2 and len(partnerships) == len(fall):
+        partnerships.append(Partnership(match_id, innings_no, crease[0][1], crease[1][1],
+                                        max(0, _int(total) - previous), len(fall) + 1))
+    return partnerships
+
+
+def _fielding_side(innings, all_innings):
+    """(cb_id, name) of the players who fielded in `innings`: its bowlers and their team's batters."""
+    players = [(b.get('id'), b.get('name', '')) for b in innings.get('bowler', [])]
+    batting_team = innings.get('batteamname', '')
+    fielding_team = innings.get('bowlteamname')
+    for other in all_innings:
+        team = other.get('batteamname', '')
+        if fielding_team:
+            same_side = team == fielding_team
+        else:
+            same_side = bool(team) and team != batting_team
+        if same_side:
+            players.extend((b.get('id'), b.get('name', '')) for b in other.get('batsman', []))
+    return players
+
+
+def derive_match_tables(match_id, scorecard, resolve, match_format="", venue="", match_date=None):
+    """Derive every scorecard-based analytics table for one match in a single pass.
+
+    `resolve(name, cricbuzz_id)` returns the players.player_id or None.
+    Returns {table_name: [records]} for the DERIVED_TABLES; every table is
+    present (possibly empty) so the caller can replace the match's old rows.
+    """
+    tables = {table: [] for table, _ in DERIVED_TABLES}
+    fielding = {}
+    all_innings = (scorecard or {}).get('scorecard', [])
+
+    for innings in all_innings:
+        tables["players_partnerships_data"].extend(innings_partnerships(match_id, innings))
+        fielders = FielderIndex(_fielding_side(innings, all_innings))
+
+        for batsman in innings.get('batsman', []):
+            outdec = batsman.get('outdec', '')
+            balls = _int(batsman.get('balls'))
+            if balls or outdec:
+                player_id = resolve(batsman.get('name', ''), batsman.get('id'))
+                if player_id:
+                    tables["batters_batting_data"].append(BatterInnings(
+                        match_id, player_id, batsman.get('name', ''), _int(batsman.get('runs')),
+                        balls, _float(batsman.get('strkrate')), match_date
+                    ))
+
+            kind, names = parse_dismissal(outdec)
+            for name in names:
+                found = fielders.lookup(name)
+                player_id = resolve(found[1], found[0]) if found else None
+                if not player_id:
+                    continue
+                record = fielding.setdefault(player_id, FieldingRecord(match_id, player_id,
+                                                                       format=match_format))
+                if kind == "catch":
+                    record.catches += 1
+                elif kind == "stumping":
+                    record.stumpings += 1
+                else:
+                    record.run_outs += 1
+
+        for bowler in innings.get('bowler', []):
+            player_id = resolve(bowler.get('name', ''), bowler.get('id'))
+            if player_id:
+                tables["bowlers_bowling_venue_data"].append(VenueBowling(
+                    match_id, player_id, bowler.get('name', ''), venue,
+                    _float(bowler.get('overs')), _int(bowler.get('runs')),
+                    _int(bowler.get('wickets')), _float(bowler.get('economy'))
+                ))
+
+    tables["fielding_data"] = list(fielding.values())
+    return tables
@@ -0,0 +1,487 @@
+import hashlib
+import io
+import json
+import os
+import socket
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from urllib.parse import unquote, urlparse
+
+from dotenv import load_dotenv
+
+try:
+    import pyarrow as pa
+except ImportError:  # Arrow comes with Streamlit; without it DataFrames are shared as JSON
+    pa = None
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SHARED_DIR = os.path.join(_PROJECT_ROOT, ".cache", "shared")
+
+# Expiry header of every file entry: seconds since the epoch, 0 for never
+_EXPIRY = struct.Struct(">d")
+
+_DECODE_ERRORS = (ValueError, zlib.error) + ((pa.ArrowException,) if pa is not None else ())
+
+
+class FileCacheBackend:
+    """Byte values stored one per file in a directory, shared by every process that uses it.
+
+    Writes are atomic (temp file + rename) so a reader never sees half an
+    entry, `add()` creates a key only if it does not exist (a hard link, which
+    fails when the name is taken), and reads bump the file's mtime, which is
+    what least-recently-used eviction orders by once the files exceed
+    `max_bytes` in total.
+    """
+
+    def __init__(self, directory=DEFAULT_SHARED_DIR, max_bytes=512 * 1024 * 1024, suffix=".bin"):
+        self.directory = directory
+        self.max_bytes = int(max_bytes)
+        self.suffix = suffix
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._approx_bytes = self._scan_size()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode("utf-8")).hexdigest() + self.suffix)
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(self.suffix):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _scan_size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def _read(self, path):
+        """Value of an entry file, or None when missing, corrupt or expired."""
+        try:
+            with open(path, "rb") as f:
+                blob = f.read()
+        except OSError:
+            return None
+        if len(blob) < _EXPIRY.size:
+            return None
+        expires_at = _EXPIRY.unpack_from(blob)[0]
+        if expires_at and expires_at < time.time():
+            return None
+        return blob[_EXPIRY.size:]
+
+    def _write_temp(self, value, ttl):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(_EXPIRY.pack(time.time() + ttl if ttl else 0))
+            f.write(value)
+        return tmp_path, _EXPIRY.size + len(value)
+
+    def get(self, key):
+        path = self._path(key)
+        value = self._read(path)
+        if value is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def get_many(self, keys):
+        return [self.get(key) for key in keys]
+
+    def set(self, key, value, ttl=None):
+        """Store `value` (bytes) under `key`, expiring after `ttl` seconds if given."""
+        try:
+            tmp_path, size = self._write_temp(value, ttl)
+        except OSError:
+            return False
+        path = self._path(key)
+        # Overwriting a hot key (a live match every few seconds) only adds the difference
+        replaced = self._size(path)
+        try:
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+        self._wrote(size - replaced)
+        return True
+
+    def add(self, key, value, ttl=None):
+        """Store `value` only if `key` is absent (or expired); True when this call stored it."""
+        path = self._path(key)
+        try:
+            tmp_path, size = self._write_temp(value, ttl)
+        except OSError:
+            return False
+        try:
+            for _ in range(2):
+                try:
+                    os.link(tmp_path, path)
+                    self._wrote(size)
+                    return True
+                except FileExistsError:
+                    if self._read(path) is not None:
+                        return False
+                    # Expired: remove it and try once more
+                    removed = self._size(path)
+                    try:
+                        os.remove(path)
+                        self._wrote(-removed, counted=False)
+                    except FileNotFoundError:
+                        pass
+            return False
+        except OSError:
+            return False
+        finally:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def delete(self, key):
+        path = self._path(key)
+        removed = self._size(path)
+        try:
+            os.remove(path)
+        except OSError:
+            return
+        with self._lock:
+            self._approx_bytes = max(0, self._approx_bytes - removed)
+
+    @staticmethod
+    def _size(path):
+        try:
+            return os.stat(path).st_size
+        except OSError:
+            return 0
+
+    def _wrote(self, size, counted=True):
+        """Account for `size` more bytes on disk (negative when an entry shrank or went)."""
+        with self._lock:
+            if counted:
+                self.writes += 1
+            self._approx_bytes = max(0, self._approx_bytes + size)
+            over_budget = self._approx_bytes > self.max_bytes
+        if over_budget:
+            self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the directory is under 90% of its budget."""
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            target = self.max_bytes * 0.9
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                self.evictions += 1
+            self._approx_bytes = total
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            for _, _, path in self._entries():
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            self._approx_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": "file",
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "approx_bytes": self._approx_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+class RespError(RuntimeError):
+    """Error reply from the key-value server."""
+
+
+class RespCacheBackend:
+    """Client for a Redis-protocol (RESP) key-value server, e.g. a local Redis or Valkey.
+
+    Same interface as FileCacheBackend, with every key under `prefix`. One
+    connection per backend, opened on first use and reopened after a network
+    error; a call that still fails is counted and treated as a cache miss, and
+    the server is left alone for `retry_after` seconds, so an unavailable
+    server makes the app fall back to MySQL but never breaks it. Size-bounded
+    LRU eviction is the server's job (`maxmemory` with `allkeys-lru`).
+    """
+
+    def __init__(self, host="127.0.0.1", port=6379, db=0, password=None, prefix="",
+                 timeout=2.0, retry_after=30.0):
+        self.host = host
+        self.port = int(port)
+        self.db = int(db)
+        self.password = password
+        self.prefix = prefix
+        self.timeout = float(timeout)
+        self.retry_after = float(retry_after)
+        self._down_until = 0.0
+        self._sock = None
+        self._reader = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.errors = 0
+
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = self._sock.makefile("rb")
+        if self.password:
+            self._roundtrip("AUTH", self.password)
+        if self.db:
+            self._roundtrip("SELECT", self.db)
+
+    def _close(self):
+        for closable in (self._reader, self._sock):
+            try:
+                if closable is not None:
+                    closable.close()
+            except OSError:
+                pass
+        self._sock = self._reader = None
+
+    def _roundtrip(self, *args):
+        out = io.BytesIO()
+        out.write(b"*%d\r\n" % len(args))
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode("utf-8")
+            out.write(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        self._sock.sendall(out.getvalue())
+        return self._read_reply()
+
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Connection closed by the cache server")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode("utf-8")
+        if kind == b"-":
+            raise RespError(body.decode("utf-8", "replace"))
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            count = int(body)
+            return None if count < 0 else [self._read_reply() for _ in range(count)]
+        raise ConnectionError(f"Unexpected reply from the cache server: {line[:20]!r}")
+
+    def command(self, *args):
+        """Send one command and return its reply (reconnecting once after a network error)."""
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    return self._roundtrip(*args)
+                except (OSError, ConnectionError):
+                    self._close()
+                    if attempt:
+                        raise
+
+    def _safe(self, default, *args):
+        if time.monotonic() < self._down_until:
+            return default
+        try:
+            return self.command(*args)
+        except RespError as e:
+            with self._lock:
+                self.errors += 1
+            print(f"[WARNING] Shared cache command {args[0]} failed: {e}")
+            return default
+        except (OSError, ConnectionError) as e:
+            with self._lock:
+                self.errors += 1
+                self._down_until = time.monotonic() + self.retry_after
+            print(f"[WARNING] Shared cache at {self.host}:{self.port} unavailable, "
+                  f"retrying in {self.retry_after:g}s: {e}")
+            return default
+
+    def get(self, key):
+        value = self._safe(None, "GET", self.prefix + key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def get_many(self, keys):
+        if not keys:
+            return []
+        values = self._safe(None, "MGET", *(self.prefix + key for key in keys))
+        return values if values is not None else [None] * len(keys)
+
+    def set(self, key, value, ttl=None):
+        args = ["SET", self.prefix + key, value]
+        if ttl:
+            args += ["PX", max(1, int(ttl * 1000))]
+        stored = self._safe(None, *args) == "OK"
+        if stored:
+            with self._lock:
+                self.writes += 1
+        return stored
+
+    def add(self, key, value, ttl=None):
+        args = ["SET", self.prefix + key, value, "NX"]
+        if ttl:
+            args += ["PX", max(1, int(ttl * 1000))]
+        return self._safe(None, *args) == "OK"
+
+    def delete(self, key):
+        self._safe(0, "DEL", self.prefix + key)
+
+    def clear(self):
+        """Delete every key under this backend's prefix."""
+        cursor = b"0"
+        while True:
+            reply = self._safe(None, "SCAN", cursor, "MATCH", self.prefix + "*", "COUNT", 500)
+            if not reply:
+                return
+            cursor, keys = reply
+            if keys:
+                self._safe(0, "DEL", *keys)
+            if cursor in (b"0", "0"):
+                return
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": f"resp://{self.host}:{self.port}/{self.db}",
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "evictions": 0,  # done by the server
+                "errors": self.errors,
+            }
+
+
+def encode_value(value):
+    """Serialize a cacheable value to bytes, or None if it cannot be shared.
+
+    DataFrames are written as an Arrow IPC stream (typed columns, no pickle),
+    or as compressed split-orient JSON without pyarrow or for columns Arrow
+    cannot type (e.g. mixed values); other values as zlib-compressed JSON.
+    """
+    if hasattr(value, "to_parquet") and hasattr(value, "columns"):
+        if pa is not None:
+            try:
+                table = pa.Table.from_pandas(value, preserve_index=False)
+            except pa.ArrowException:
+                table = None
+            if table is not None:
+                sink = pa.BufferOutputStream()
+                with pa.ipc.new_stream(sink, table.schema) as writer:
+                    writer.write_table(table)
+                return b"A" + sink.getvalue().to_pybytes()
+        try:
+            text = value.to_json(orient="split", index=False, date_format="iso")
+        except (TypeError, ValueError, OverflowError):
+            return None
+        return b"D" + zlib.compress(text.encode("utf-8"), 6)
+    try:
+        return b"J" + zlib.compress(json.dumps(value).encode("utf-8"), 6)
+    except (TypeError, ValueError):
+        return None
+
+
+def decode_value(blob):
+    """Inverse of encode_value; None for data it cannot read."""
+    if not blob:
+        return None
+    kind, body = blob[:1], blob[1:]
+    try:
+        if kind == b"A" and pa is not None:
+            return pa.ipc.open_stream(pa.py_buffer(body)).read_all().to_pandas()
+        if kind == b"D":
+            import pandas as pd
+            return pd.read_json(io.StringIO(zlib.decompress(body).decode("utf-8")),
+                                orient="split", dtype=False, convert_dates=False)
+        if kind == b"J":
+            return json.loads(zlib.decompress(body))
+    except _DECODE_ERRORS:
+        return None
+    return None
+
+
+def backend_from_url(url, namespace, max_bytes=None):
+    """Backend for a SHARED_CACHE_URL, with its entries kept under `namespace`.
+
+    `file:` or `file:///path` (a directory; relative paths are inside the
+    project) or `redis://[:password@]host[:port][/db]` (any RESP server).
+    """
+    parsed = urlparse(url)
+    if parsed.scheme == "file":
+        directory = unquote(parsed.path or parsed.netloc) or DEFAULT_SHARED_DIR
+        if not os.path.isabs(directory):
+            directory = os.path.join(_PROJECT_ROOT, directory)
+        return FileCacheBackend(os.path.join(directory, namespace),
+                                max_bytes or 512 * 1024 * 1024)
+    if parsed.scheme in ("redis", "resp"):
+        return RespCacheBackend(
+            host=parsed.hostname or "127.0.0.1",
+            port=parsed.port or 6379,
+            db=int((parsed.path or "/0").strip("/") or 0),
+            password=unquote(parsed.password) if parsed.password else None,
+            prefix=f"cricbuzz:{namespace}:",
+        )
+    raise ValueError(f"Unsupported SHARED_CACHE_URL scheme: {parsed.scheme!r}")
+
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_shared_backend(namespace):
+    """Process-wide backend for `namespace` from SHARED_CACHE_URL, or None when it is not set.
+
+    SHARED_CACHE_MAX_MB bounds each namespace of the file backend (default 512).
+    """
+    if namespace not in _backends:
+        with _backends_lock:
+            if namespace not in _backends:
+                load_dotenv()
+                url = os.getenv("SHARED_CACHE_URL")
+                max_bytes = float(os.getenv("SHARED_CACHE_MAX_MB") or 512) * 1024 * 1024
+                _backends[namespace] = backend_from_url(url, namespace, max_bytes) if url else None
+    return _backends[namespace]
@@ -0,0 +1,342 @@
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+from dotenv import load_dotenv
+
+from utils.response_cache import PROJECT_ROOT
+
+DEFAULT_REPORT_FILE = os.path.join(PROJECT_ROOT, ".cache", "ingest_report.json")
+DEFAULT_METRICS_FILE = os.path.join(PROJECT_ROOT, ".cache", "ingest_metrics.prom")
+
+# Upper bounds in seconds, Prometheus style; the last bucket is +Inf
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_STATEMENT = re.compile(
+    r"^\s*(?:(INSERT)\s+(?:IGNORE\s+)?INTO|(UPDATE)|(DELETE)\s+FROM|(SELECT)\b.*?\bFROM|(LOAD)\s+DATA\b.*?\bINTO\s+TABLE)"
+    r"\s+`?(\w+)`?",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+WRITE_STATEMENTS = ("insert", "update", "delete", "load")
+
+
+def statement_label(sql):
+    """('insert', 'batting_data') for an SQL statement; ('other', '') when unrecognised."""
+    match = _STATEMENT.match(sql or "")
+    if not match:
+        return "other", ""
+    verb = next(group for group in match.groups()[:-1] if group)
+    return verb.lower(), match.group(6)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (seconds)."""
+
+    __slots__ = ("buckets", "counts", "count", "sum", "max")
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th observation (max for the +Inf bucket)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+    def cumulative(self):
+        """[(le, cumulative_count)] including the +Inf bucket."""
+        result = []
+        running = 0
+        for bound, count in zip(list(self.buckets) + ["+Inf"], self.counts):
+            running += count
+            result.append((bound, running))
+        return result
+
+    def copy(self):
+        other = Histogram(self.buckets)
+        other.counts = list(self.counts)
+        other.count, other.sum, other.max = self.count, self.sum, self.max
+        return other
+
+    def since(self, earlier):
+        """Observations made after `earlier` (a copy of this histogram taken before).
+
+        `max` becomes the upper bound of the highest bucket that gained an
+        observation, capped at the overall max.
+        """
+        delta = self.copy()
+        if earlier is None:
+            return delta
+        delta.counts = [now - then for now, then in zip(self.counts, earlier.counts)]
+        delta.count = self.count - earlier.count
+        delta.sum = self.sum - earlier.sum
+        top = max((i for i, count in enumerate(delta.counts) if count), default=None)
+        if top is None:
+            delta.max = 0.0
+        elif top < len(self.buckets):
+            delta.max = min(self.max, self.buckets[top])
+        return delta
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "sum_seconds": round(self.sum, 6),
+            "avg_ms": round(1000 * self.sum / self.count, 2) if self.count else 0.0,
+            "p50_ms": round(1000 * self.quantile(0.5), 2),
+            "p95_ms": round(1000 * self.quantile(0.95), 2),
+            "p99_ms": round(1000 * self.quantile(0.99), 2),
+            "max_ms": round(1000 * self.max, 2),
+            "buckets": {str(le): n for le, n in self.cumulative()},
+        }
+
+
+class Telemetry:
+    """Process-wide latency histograms for API calls and database statements.
+
+    The transport reports every HTTP attempt, cache lookup and retry here and
+    DatabaseManager reports every statement through `TimedCursor`. The
+    ingestion script combines this with its pipeline counters into a JSON
+    report and a Prometheus text file at the end of each run.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.api = {}
+        self.api_status = {}
+        self.cache = {}
+        self.retries = {}
+        self.db = {}
+        self.db_rows = {}
+
+    def observe_api(self, endpoint, seconds, status):
+        with self._lock:
+            self.api.setdefault(endpoint, Histogram()).observe(seconds)
+            statuses = self.api_status.setdefault(endpoint, {})
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    def count_cache(self, endpoint, hit):
+        with self._lock:
+            counts = self.cache.setdefault(endpoint, {"hits": 0, "misses": 0})
+            counts["hits" if hit else "misses"] += 1
+
+    def count_retry(self, endpoint):
+        with self._lock:
+            self.retries[endpoint] = self.retries.get(endpoint, 0) + 1
+
+    def observe_db(self, sql, seconds, rows=0):
+        key = statement_label(sql)
+        with self._lock:
+            self.db.setdefault(key, Histogram()).observe(seconds)
+            if rows and rows > 0:
+                self.db_rows[key] = self.db_rows.get(key, 0) + rows
+
+    def checkpoint(self):
+        """Copy of every counter, for `snapshot(since=...)` to report what came after."""
+        with self._lock:
+            return {
+                "api": {key: h.copy() for key, h in self.api.items()},
+                "api_status": {key: dict(v) for key, v in self.api_status.items()},
+                "cache": {key: dict(v) for key, v in self.cache.items()},
+                "retries": dict(self.retries),
+                "db": {key: h.copy() for key, h in self.db.items()},
+                "db_rows": dict(self.db_rows),
+            }
+
+    def _since(self, checkpoint):
+        """checkpoint()-shaped counters minus `checkpoint`, keeping only what changed."""
+        current = self.checkpoint()
+        if checkpoint is None:
+            return current
+
+        def histograms(name):
+            deltas = {key: h.since(checkpoint[name].get(key)) for key, h in current[name].items()}
+            return {key: h for key, h in deltas.items() if h.count}
+
+        def counts(now, then):
+            deltas = {key: value - then.get(key, 0) for key, value in now.items()}
+            return {key: value for key, value in deltas.items() if value}
+
+        def nested(name):
+            deltas = {key: counts(value, checkpoint[name].get(key, {}))
+                      for key, value in current[name].items()}
+            return {key: value for key, value in deltas.items() if value}
+
+        return {
+            "api": histograms("api"),
+            "api_status": nested("api_status"),
+            "cache": nested("cache"),
+            "retries": counts(current["retries"], checkpoint["retries"]),
+            "db": histograms("db"),
+            "db_rows": counts(current["db_rows"], checkpoint["db_rows"]),
+        }
+
+    def snapshot(self, since=None):
+        """Summaries of every counter; with `since` (a checkpoint), only what came after it."""
+        state = self._since(since)
+        api, cache = state["api"], state["cache"]
+        return {
+            # Endpoints answered entirely from the cache still get an entry
+            "api": {
+                endpoint: dict(api.get(endpoint, Histogram()).summary(),
+                               statuses=dict(state["api_status"].get(endpoint, {})),
+                               retries=state["retries"].get(endpoint, 0),
+                               cache=dict({"hits": 0, "misses": 0}, **cache.get(endpoint, {})))
+                for endpoint in sorted(set(api) | set(cache))
+            },
+            "cache": {endpoint: dict({"hits": 0, "misses": 0}, **c) for endpoint, c in cache.items()},
+            "db": {
+                f"{verb} {table}".strip(): dict(h.summary(), rows=state["db_rows"].get((verb, table), 0))
+                for (verb, table), h in state["db"].items()
+            },
+        }
+
+    def prometheus_histograms(self, since=None):
+        """Prometheus text lines for the API and DB histograms (after checkpoint `since`)."""
+        lines = []
+        state = self._since(since)
+        series = [
+            ("cricbuzz_api_request_duration_seconds", "Cricbuzz API request latency",
+             [({"endpoint": endpoint}, h) for endpoint, h in state["api"].items()]),
+            ("cricbuzz_db_statement_duration_seconds", "MySQL statement latency",
+             [({"statement": verb, "table": table}, h) for (verb, table), h in state["db"].items()]),
+        ]
+        for name, help_text, items in series:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, h in items:
+                for le, count in h.cumulative():
+                    lines.append(f"{name}_bucket{_labels(labels, le=le)} {count}")
+                lines.append(f"{name}_sum{_labels(labels)} {h.sum:.6f}")
+                lines.append(f"{name}_count{_labels(labels)} {h.count}")
+        return lines
+
+
+class TimedCursor:
+    """Cursor wrapper that reports each execute/executemany to Telemetry.
+
+    `on_write(table)`, if given, is called after each successful INSERT,
+    UPDATE, DELETE or LOAD DATA.
+    """
+
+    def __init__(self, cursor, telemetry, on_write=None):
+        self._cursor = cursor
+        self._telemetry = telemetry
+        self._on_write = on_write
+
+    def execute(self, sql, params=None, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = self._cursor.execute(sql, params, *args, **kwargs)
+        finally:
+            self._telemetry.observe_db(sql, time.perf_counter() - started,
+                                       getattr(self._cursor, "rowcount", 0))
+        self._wrote(sql)
+        return result
+
+    def executemany(self, sql, seq_params, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = self._cursor.executemany(sql, seq_params, *args, **kwargs)
+        finally:
+            self._telemetry.observe_db(sql, time.perf_counter() - started,
+                                       getattr(self._cursor, "rowcount", 0))
+        self._wrote(sql)
+        return result
+
+    def _wrote(self, sql):
+        if self._on_write is not None:
+            verb, table = statement_label(sql)
+            if verb in WRITE_STATEMENTS:
+                self._on_write(table)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def _labels(labels, **extra):
+    merged = dict(labels, **extra)
+    if not merged:
+        return ""
+    body = ",".join(f'{key}="{str(value).replace(chr(34), chr(39))}"' for key, value in merged.items())
+    return "{" + body + "}"
+
+
+def prometheus_gauges(name, help_text, values, metric_type="gauge"):
+    """Prometheus text lines for `values`: a list of (labels_dict, number)."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+    lines.extend(f"{name}{_labels(labels)} {value}" for labels, value in values)
+    return lines
+
+
+def _atomic_write(path, text):
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def report_paths():
+    """(json_report_path, prometheus_path) from INGEST_REPORT_FILE / INGEST_METRICS_FILE."""
+    load_dotenv()
+    return (os.getenv("INGEST_REPORT_FILE") or DEFAULT_REPORT_FILE,
+            os.getenv("INGEST_METRICS_FILE") or DEFAULT_METRICS_FILE)
+
+
+def write_report(report, prometheus_lines):
+    """Write the JSON report and Prometheus text file; returns their paths."""
+    json_path, prom_path = report_paths()
+    _atomic_write(json_path, json.dumps(report, indent=2, default=str))
+    _atomic_write(prom_path, "\n".join(prometheus_lines) + "\n")
+    return json_path, prom_path
+
+
+def load_last_report():
+    """The most recent run report, or None if no run has written one yet."""
+    json_path, _ = report_paths()
+    try:
+        with open(json_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+_telemetry = None
+_telemetry_lock = threading.Lock()
+
+
+def get_telemetry():
+    """Return the process-wide Telemetry instance."""
+    global _telemetry
+    if _telemetry is None:
+        with _telemetry_lock:
+            if _telemetry is None:
+                _telemetry = Telemetry()
+    return _telemetry